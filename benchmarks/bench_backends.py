@@ -0,0 +1,72 @@
+"""Per-operation latency of each display backend.
+
+Runs list, get, rotate and apply against every backend that is usable here.
+The displayplacer backend drives benchmarks/fake_displayplacer.py unless
+--displayplacer points at the real binary. The CoreGraphics backend only runs
+on macOS with pyobjc's Quartz bindings, and only reads because it must not
+move real displays.
+
+    python benchmarks/bench_backends.py [--iterations 20] [--displayplacer PATH] [--json]
+"""
+import argparse
+import json
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from rotator.backends import CoreGraphicsBackend, DisplayplacerBackend, SimulatedBackend  # noqa: E402
+from rotator.command_runner import create_command_runner  # noqa: E402
+
+FAKE_DISPLAYPLACER = str(ROOT / "benchmarks" / "fake_displayplacer.py")
+
+
+def exercise(backend, iterations: int, writes: bool) -> None:
+    for index in range(iterations):
+        display_list = backend.list_displays()
+        if not display_list or not display_list.displays:
+            raise RuntimeError(f"{backend.name}: no displays")
+        target = display_list.displays[-1].persistent_id
+        backend.get_display(target)
+        if writes:
+            backend.rotate(target, 90 if index % 2 == 0 else 0)
+            backend.apply_layout(display_list.restore_command)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--displayplacer", default=FAKE_DISPLAYPLACER)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    backends = [
+        (SimulatedBackend(), True),
+        (DisplayplacerBackend(args.displayplacer, create_command_runner("pool")), args.displayplacer == FAKE_DISPLAYPLACER),
+    ]
+    try:
+        backends.append((CoreGraphicsBackend(fallback=backends[1][0]), False))
+    except ImportError:
+        pass
+
+    results = {}
+    for backend, writes in backends:
+        exercise(backend, args.iterations, writes)
+        results[backend.name] = backend.stats()
+    backends[1][0].close()
+
+    if args.json:
+        print(json.dumps({"benchmark": "backends", "timestamp": time.time(), "results": results}))
+        return 0
+
+    print(f"{'backend':>14}  {'operation':>9}  {'count':>5}  {'mean ms':>8}  {'p95 ms':>7}")
+    for name, operations in results.items():
+        for operation, summary in sorted(operations.items()):
+            print(f"{name:>14}  {operation:>9}  {summary['count']:>5}  {summary['mean_ms']:>8}  {summary['p95_ms']:>7.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""Config I/O per rotation: the old read/write-per-call helpers versus ConfigStore.
+
+Replays the config accesses one set_rotation makes (save the current layout,
+load the target layout, save the target layout) and counts file operations.
+On Linux the read/write syscall counters from /proc/self/io are reported too.
+
+    python benchmarks/bench_config.py [--rotations 20] [--json]
+"""
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from rotator.config_store import ConfigStore  # noqa: E402
+from rotator.scheduling import ManualScheduler  # noqa: E402
+
+
+def layout_for(mode: str, index: int):
+    # Vary the origin so every rotation really changes the stored layouts
+    if mode == "portrait":
+        return ["id:AAA res:1440x2560 origin:(0,0) degree:90", f"id:BBB res:1512x982 origin:(1440,{index}) degree:0"]
+    return ["id:AAA res:2560x1440 origin:(0,0) degree:0", f"id:BBB res:1512x982 origin:(2560,{index}) degree:0"]
+
+
+def proc_io():
+    try:
+        with open("/proc/self/io", encoding="ascii") as io_file:
+            fields = dict(line.split(": ") for line in io_file.read().splitlines())
+        return int(fields["syscr"]), int(fields["syscw"])
+    except OSError:
+        return None
+
+
+@contextlib.contextmanager
+def counting_file_calls(counts):
+    """Count open/stat/replace calls made through the Python layer."""
+    originals = {"open": builtins.open, "stat": os.stat, "replace": os.replace, "fdopen": os.fdopen}
+
+    def counted(name, function):
+        def wrapper(*args, **kwargs):
+            counts[name] = counts.get(name, 0) + 1
+            return function(*args, **kwargs)
+        return wrapper
+
+    builtins.open = counted("open", originals["open"])
+    os.stat = counted("stat", originals["stat"])
+    os.replace = counted("replace", originals["replace"])
+    os.fdopen = counted("open", originals["fdopen"])
+    try:
+        yield
+    finally:
+        builtins.open = originals["open"]
+        os.stat = originals["stat"]
+        os.replace = originals["replace"]
+        os.fdopen = originals["fdopen"]
+
+
+def legacy_rotation(path: str, index: int, current_mode: str, target_mode: str) -> None:
+    def read_config():
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as config_file:
+            return json.load(config_file)
+
+    def write_config(config):
+        with open(path, "w", encoding="utf-8") as config_file:
+            json.dump(config, config_file, indent=2)
+
+    def save_current_layout(mode_key, layout):
+        config = read_config()
+        config.setdefault("layouts", {})[mode_key] = layout
+        write_config(config)
+
+    save_current_layout(current_mode, layout_for(current_mode, index))
+    read_config().get("layouts", {}).get(target_mode)
+    save_current_layout(target_mode, layout_for(target_mode, index))
+
+
+def store_rotation(store: ConfigStore, scheduler: ManualScheduler, index: int, current_mode: str, target_mode: str) -> None:
+    def save_current_layout(mode_key, layout):
+        layouts = store.get("layouts", {})
+        layouts[mode_key] = layout
+        store.set("layouts", layouts)
+
+    save_current_layout(current_mode, layout_for(current_mode, index))
+    store.get("layouts", {}).get(target_mode)
+    save_current_layout(target_mode, layout_for(target_mode, index))
+    # The coalescing window closes after the rotation finishes
+    scheduler.advance(store._flusher.delay)
+
+
+def measure(rotate, rotations: int):
+    counts = {}
+    io_before = proc_io()
+    started = time.perf_counter()
+    with counting_file_calls(counts):
+        for index in range(rotations):
+            modes = ("landscape", "portrait") if index % 2 == 0 else ("portrait", "landscape")
+            rotate(index, *modes)
+    elapsed = time.perf_counter() - started
+    io_after = proc_io()
+    result = {name: round(count / rotations, 2) for name, count in sorted(counts.items())}
+    result["us_per_rotation"] = round(elapsed / rotations * 1e6, 1)
+    if io_before and io_after:
+        result["read_syscalls"] = round((io_after[0] - io_before[0]) / rotations, 2)
+        result["write_syscalls"] = round((io_after[1] - io_before[1]) / rotations, 2)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rotations", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path = os.path.join(directory, "legacy.json")
+        store_path = os.path.join(directory, "store.json")
+        legacy = measure(lambda *rotation: legacy_rotation(legacy_path, *rotation), args.rotations)
+
+        scheduler = ManualScheduler()
+        store = ConfigStore(store_path, scheduler=scheduler)
+        after = measure(lambda *rotation: store_rotation(store, scheduler, *rotation), args.rotations)
+
+    results = {"per_rotation": {"before": legacy, "after": after}}
+    if args.json:
+        print(json.dumps({"benchmark": "config_io", "timestamp": time.time(), **results}))
+        return 0
+
+    keys = sorted(set(legacy) | set(after))
+    print(f"{'per rotation':>16}  {'before':>8}  {'after':>8}")
+    for key in keys:
+        print(f"{key:>16}  {legacy.get(key, 0):>8}  {after.get(key, 0):>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Per-keystroke cost of shortcut matching: pynput-style HotKey fan-out versus HotkeyMatcher.
+
+Replays tests/fixtures/keystrokes.txt (prose typing with capitals,
+auto-repeat, copy/paste and a few rotation shortcuts) through both
+implementations with 5, 25 and 100 registered shortcuts. The legacy side
+mirrors pynput.keyboard.HotKey, which the app used to call once per
+registered shortcut for every key event, so pynput is not needed here.
+
+    python benchmarks/bench_hotkeys.py [--repeat 20] [--json]
+"""
+import argparse
+import json
+import pathlib
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from rotator.hotkeys import HotkeyMatcher  # noqa: E402
+
+KEYSTROKES = ROOT / "tests" / "fixtures" / "keystrokes.txt"
+APP_SHORTCUTS = {
+    "toggle": ("ctrl", "alt", "r"),
+    "rotate_0": ("ctrl", "alt", "0"),
+    "rotate_90": ("ctrl", "alt", "9"),
+    "rotate_270": ("ctrl", "alt", "2"),
+    "toggle_set": ("ctrl", "alt", "s"),
+}
+FILLER_KEYS = "abcdefghijklmnopqstuvwxyz1345678"
+
+KeyEvent = Tuple[bool, str]
+
+
+class LegacyHotKey:
+    """Same press/release logic as pynput.keyboard.HotKey."""
+
+    def __init__(self, keys, on_activate):
+        self._state = set()
+        self._keys = set(keys)
+        self._on_activate = on_activate
+
+    def press(self, key) -> None:
+        if key in self._keys and key not in self._state:
+            self._state.add(key)
+            if self._state == self._keys:
+                self._on_activate()
+
+    def release(self, key) -> None:
+        if key in self._state:
+            self._state.remove(key)
+
+
+def load_keystrokes(path: pathlib.Path = KEYSTROKES) -> List[KeyEvent]:
+    events = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        kind, key = line.split(" ", 1)
+        events.append((kind == "down", key))
+    return events
+
+
+def shortcut_set(count: int) -> Dict[str, Tuple[str, ...]]:
+    """The app's shortcuts plus unused two-modifier combos, `count` entries in all."""
+    shortcuts = dict(APP_SHORTCUTS)
+    modifiers = [("cmd", "shift"), ("cmd", "alt"), ("ctrl", "shift"), ("cmd", "ctrl")]
+    index = 0
+    while len(shortcuts) < count:
+        pair = modifiers[index // len(FILLER_KEYS) % len(modifiers)]
+        shortcuts[f"extra_{index}"] = (*pair, FILLER_KEYS[index % len(FILLER_KEYS)])
+        index += 1
+    return dict(list(shortcuts.items())[:count])
+
+
+def replay_legacy(events: List[KeyEvent], shortcuts: Dict[str, Tuple[str, ...]]) -> List[str]:
+    fired: List[str] = []
+    hotkeys = [LegacyHotKey(keys, lambda action=action: fired.append(action)) for action, keys in shortcuts.items()]
+    for is_press, key in events:
+        for hotkey in hotkeys:
+            if is_press:
+                hotkey.press(key)
+            else:
+                hotkey.release(key)
+    return fired
+
+
+def replay_matcher(events: List[KeyEvent], shortcuts: Dict[str, Tuple[str, ...]]) -> List[str]:
+    fired: List[str] = []
+    matcher = HotkeyMatcher(shortcuts)
+    for is_press, key in events:
+        if is_press:
+            action = matcher.press(key)
+            if action is not None:
+                fired.append(action)
+        else:
+            matcher.release(key)
+    return fired
+
+
+def time_replay(replay, events, shortcuts, repeat: int) -> float:
+    """Best ns per event over `repeat` replays."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        replay(events, shortcuts)
+        best = min(best, time.perf_counter() - started)
+    return best / len(events) * 1e9
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    events = load_keystrokes()
+    results = {}
+    for count in (5, 25, 100):
+        shortcuts = shortcut_set(count)
+        legacy_fired = replay_legacy(events, shortcuts)
+        matcher_fired = replay_matcher(events, shortcuts)
+        results[str(count)] = {
+            "legacy_ns_per_event": round(time_replay(replay_legacy, events, shortcuts, args.repeat), 1),
+            "matcher_ns_per_event": round(time_replay(replay_matcher, events, shortcuts, args.repeat), 1),
+            "legacy_activations": len(legacy_fired),
+            "matcher_activations": len(matcher_fired),
+        }
+
+    if args.json:
+        print(json.dumps({"benchmark": "hotkeys", "timestamp": time.time(), "events": len(events), "results": results}))
+        return 0
+
+    print(f"{len(events)} key events")
+    print(f"{'shortcuts':>9}  {'legacy ns/event':>15}  {'matcher ns/event':>16}  {'activations':>11}")
+    for count, result in results.items():
+        activations = f"{result['legacy_activations']}/{result['matcher_activations']}"
+        print(
+            f"{count:>9}  {result['legacy_ns_per_event']:>15.1f}  "
+            f"{result['matcher_ns_per_event']:>16.1f}  {activations:>11}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
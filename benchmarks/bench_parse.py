@@ -0,0 +1,119 @@
+"""Micro-benchmark for parsing `displayplacer list` output.
+
+Compares the single-pass parser in rotator.display_state against the previous
+split-and-search implementation on captured outputs with 1, 4 and 16 displays.
+
+    python benchmarks/bench_parse.py [--number 2000] [--json]
+"""
+import argparse
+import json
+import pathlib
+import re
+import sys
+import time
+import timeit
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from rotator.display_state import parse_displayplacer_list, parse_saved_layout_command  # noqa: E402
+
+FIXTURES = ROOT / "tests" / "fixtures"
+DISPLAY_COUNTS = (1, 4, 16)
+
+
+def legacy_parse(output: str):
+    """Previous list_displays + get_display_info + restore-command parsing, one info lookup per display."""
+    screens = output.split("Persistent screen id:")
+    results = []
+    for index, screen in enumerate(screens):
+        if not screen.strip():
+            continue
+        id_match = re.match(r"^\s*([A-Fa-f0-9-]+)", screen)
+        if not id_match:
+            continue
+        lower_screen = screen.lower()
+        is_built_in = "built in" in lower_screen or "built-in" in lower_screen
+        type_match = re.search(r"Type:\s*(.+)", screen)
+        rotation_match = re.search(r"Rotation:\s*(\d+)", screen)
+        results.append({
+            "persistent_id": id_match.group(1),
+            "name": type_match.group(1).split("\n")[0].strip() if type_match else f"Display {index}",
+            "is_external": "external" in lower_screen and not is_built_in,
+            "is_built_in": is_built_in,
+            "degree": rotation_match.group(1) if rotation_match else "?",
+        })
+
+    infos = []
+    for display in results:
+        persistent_id = display["persistent_id"]
+        for screen in output.split("Persistent screen id:"):
+            if not re.search(rf"^\s*{re.escape(persistent_id)}\b", screen):
+                continue
+            info = {}
+            resolution_match = re.search(r"Resolution:\s*(\d+x\d+)", screen)
+            if resolution_match:
+                info["res"] = resolution_match.group(1)
+            origin_match = re.search(r"Origin:\s*\(([-\d]+),\s*([-\d]+)\)", screen)
+            if origin_match:
+                info["origin"] = f"({origin_match.group(1)},{origin_match.group(2)})"
+            rotation_match = re.search(r"Rotation:\s*(\d+)", screen)
+            if rotation_match:
+                info["degree"] = int(rotation_match.group(1))
+            for key in ("Hertz", "Color Depth", "Scaling"):
+                property_match = re.search(rf"{key}:\s*([^\n]+)", screen)
+                if property_match:
+                    info[key.lower().replace(" ", "_")] = property_match.group(1).strip()
+            infos.append(info)
+            break
+
+    restore_command = None
+    for line in reversed(output.strip().splitlines()):
+        if line.strip().startswith("displayplacer"):
+            restore_command = parse_saved_layout_command(line.strip())
+            break
+    return results, infos, restore_command
+
+
+def load_fixture(display_count: int) -> str:
+    return (FIXTURES / f"displayplacer_list_{display_count}.txt").read_text(encoding="utf-8")
+
+
+def measure(function, output: str, number: int) -> float:
+    """Best-of-5 microseconds per call."""
+    timings = timeit.repeat(lambda: function(output), number=number, repeat=5)
+    return min(timings) / number * 1e6
+
+
+def run(number: int):
+    results = []
+    for display_count in DISPLAY_COUNTS:
+        output = load_fixture(display_count)
+        results.append({
+            "displays": display_count,
+            "single_pass_us": round(measure(parse_displayplacer_list, output, number), 2),
+            "legacy_us": round(measure(legacy_parse, output, number), 2),
+        })
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing run")
+    parser.add_argument("--json", action="store_true", help="emit one JSON line for trend tracking")
+    args = parser.parse_args(argv)
+
+    results = run(args.number)
+    if args.json:
+        print(json.dumps({"benchmark": "parse_displayplacer_list", "timestamp": time.time(), "results": results}))
+        return 0
+
+    print(f"{'displays':>8}  {'single-pass µs':>15}  {'legacy µs':>10}  {'speedup':>7}")
+    for row in results:
+        speedup = row["legacy_us"] / row["single_pass_us"] if row["single_pass_us"] else 0.0
+        print(f"{row['displays']:>8}  {row['single_pass_us']:>15.2f}  {row['legacy_us']:>10.2f}  {speedup:>6.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
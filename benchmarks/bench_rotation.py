@@ -0,0 +1,252 @@
+"""End-to-end rotation scenarios checked against stored baselines.
+
+Drives RotationController through toggle, rotate, saved-layout restore,
+built-in revert, stale-layout fallback and a failed-apply retry, against the
+in-process SimulatedBackend and against benchmarks/fake_displayplacer.py
+through the displayplacer backend. Each scenario reports displayplacer
+forks, backend reads and writes, config file writes and wall time.
+
+--check compares with benchmarks/baselines/rotation.json and exits 1 when a
+count goes up or wall time exceeds baseline * --wall-factor + --wall-slack-ms;
+--update-baseline rewrites the file from this run.
+
+    python benchmarks/bench_rotation.py [--mode all] [--repeat 3] [--check | --update-baseline] [--json]
+"""
+import argparse
+import json
+import os
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from rotator.backends import DisplayplacerBackend, SimulatedBackend  # noqa: E402
+from rotator.command_runner import create_command_runner  # noqa: E402
+from rotator.config_store import ConfigStore  # noqa: E402
+from rotator.controller import RotationController  # noqa: E402
+from rotator.scheduling import ManualScheduler  # noqa: E402
+from rotator.transaction import RotationTransaction  # noqa: E402
+
+FAKE_DISPLAYPLACER = str(ROOT / "benchmarks" / "fake_displayplacer.py")
+FIXTURE = ROOT / "tests" / "fixtures" / "displayplacer_list_4.txt"
+BASELINE_PATH = ROOT / "benchmarks" / "baselines" / "rotation.json"
+BUILT_IN = "6B3216FD-AEEB-9757-29FA-E923D5A4FD12"
+EXTERNAL = "ABFE228F-219E-9CB0-EB53-F16947CCF25E"
+MODES = ("simulated", "displayplacer")
+COUNTS = ("forks", "lists", "applies", "config_writes")
+VISIBILITY_DELAY = 0.05
+
+
+class BenchController(RotationController):
+    """Headless controller that keeps notifications and the unconfirmed built-in rotation for inspection."""
+
+    def __init__(self, config_path: str, backend):
+        self.init_rotation(ConfigStore(config_path, scheduler=ManualScheduler()), None, backend)
+        self.notifications: List[str] = []
+        self.pending_transaction: Optional[RotationTransaction] = None
+
+    def notify(self, title: str, subtitle: str, message: str = "") -> None:
+        self.notifications.append(f"{title}: {subtitle}")
+
+    def _start_revert_countdown(self, transaction: RotationTransaction, previous_degree: int, target_degree: int) -> None:
+        self.pending_transaction = transaction
+
+
+def rotate_external(controller: BenchController) -> bool:
+    return controller.set_rotation(90)
+
+
+def toggle_external(controller: BenchController) -> bool:
+    return controller.toggle(None)
+
+
+def prepare_saved_layout(controller: BenchController) -> None:
+    controller.set_rotation(90)
+    controller.set_rotation(0)
+
+
+def prepare_stale_layout(controller: BenchController) -> None:
+    # A "portrait" layout that leaves the target landscape must be ignored
+    controller.config_store.set("layouts", {"portrait": controller._get_full_restore_command()})
+
+
+def rotate_and_revert_built_in(controller: BenchController) -> bool:
+    controller.target_display_persistent_id = BUILT_IN
+    if not controller.set_rotation(90) or not controller.pending_transaction:
+        return False
+    return controller.pending_transaction.rollback()
+
+
+# name -> (setup, measured action, layout changes that fail before the action)
+SCENARIOS: Dict[str, tuple] = {
+    "rotate": (None, rotate_external, 0),
+    "toggle": (None, toggle_external, 0),
+    "saved_layout_restore": (prepare_saved_layout, rotate_external, 0),
+    "stale_layout_fallback": (prepare_stale_layout, rotate_external, 0),
+    "revert": (None, rotate_and_revert_built_in, 0),
+    "apply_retry": (None, rotate_external, 1),
+}
+
+
+def build_backend(mode: str, directory: str):
+    if mode == "simulated":
+        return SimulatedBackend.from_list_output(
+            FIXTURE.read_text(encoding="utf-8"), visibility_delay=VISIBILITY_DELAY
+        )
+    # The fake reads its state file on every call; seed it so each scenario starts from the fixture
+    state_path = os.path.join(directory, "displayplacer_state.json")
+    with open(state_path, "w", encoding="utf-8") as state_file:
+        json.dump({"visible": FIXTURE.read_text(encoding="utf-8"), "pending": None, "visible_at": 0.0, "fail_times": 0}, state_file)
+    os.environ["FAKE_DISPLAYPLACER_STATE"] = state_path
+    os.environ["FAKE_DISPLAYPLACER_VISIBILITY_DELAY"] = str(VISIBILITY_DELAY)
+    os.environ["FAKE_DISPLAYPLACER_DISPLAYS"] = "4"
+    return DisplayplacerBackend(FAKE_DISPLAYPLACER, create_command_runner("pool"))
+
+
+def set_pending_failures(mode: str, backend, failures: int) -> None:
+    if mode == "simulated":
+        backend.fail_next_applies = failures
+        return
+    state_path = os.environ["FAKE_DISPLAYPLACER_STATE"]
+    with open(state_path, encoding="utf-8") as state_file:
+        state = json.load(state_file)
+    state["fail_times"] = failures
+    with open(state_path, "w", encoding="utf-8") as state_file:
+        json.dump(state, state_file)
+
+
+def operation_counts(backend) -> Dict[str, int]:
+    stats = backend.stats()
+    return {operation: stats.get(operation, {}).get("count", 0) for operation in ("list", "apply")}
+
+
+def run_scenario(name: str, mode: str) -> Dict[str, object]:
+    setup, action, failures = SCENARIOS[name]
+    with tempfile.TemporaryDirectory() as directory:
+        backend = build_backend(mode, directory)
+        controller = BenchController(os.path.join(directory, "config.json"), backend)
+        controller.target_display_persistent_id = EXTERNAL
+        try:
+            if setup:
+                setup(controller)
+            controller.config_store.flush()
+            set_pending_failures(mode, backend, failures)
+            # Start every measurement from a cold display cache, like a hotkey after idle
+            controller.display_cache.invalidate()
+            before = operation_counts(backend)
+            flushes = controller.config_store.flushes
+
+            started = time.perf_counter()
+            ok = action(controller)
+            wall_ms = (time.perf_counter() - started) * 1000.0
+
+            controller.config_store.flush()
+            after = operation_counts(backend)
+        finally:
+            backend.close()
+
+    lists = after["list"] - before["list"]
+    applies = after["apply"] - before["apply"]
+    return {
+        "ok": bool(ok),
+        "forks": lists + applies if mode == "displayplacer" else 0,
+        "lists": lists,
+        "applies": applies,
+        "config_writes": controller.config_store.flushes - flushes,
+        "wall_ms": round(wall_ms, 2),
+    }
+
+
+def run_suite(modes=MODES, repeat: int = 1, scenarios=None) -> Dict[str, Dict[str, Dict[str, object]]]:
+    """Run every scenario `repeat` times per mode; counts are the worst run, wall time the median."""
+    results: Dict[str, Dict[str, Dict[str, object]]] = {}
+    for mode in modes:
+        results[mode] = {}
+        for name in scenarios or SCENARIOS:
+            runs = [run_scenario(name, mode) for _ in range(repeat)]
+            summary = {count: max(run[count] for run in runs) for count in COUNTS}
+            summary["ok"] = all(run["ok"] for run in runs)
+            summary["wall_ms"] = round(statistics.median(run["wall_ms"] for run in runs), 2)
+            results[mode][name] = summary
+    return results
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, Dict[str, object]]],
+    baseline: Dict[str, Dict[str, Dict[str, object]]],
+    wall_factor: Optional[float] = 1.5,
+    wall_slack_ms: float = 25.0,
+) -> List[str]:
+    """Human-readable regressions of `results` against `baseline`; wall time is skipped when wall_factor is None."""
+    regressions = []
+    for mode, scenarios in results.items():
+        for name, result in scenarios.items():
+            expected = baseline.get(mode, {}).get(name)
+            label = f"{mode}/{name}"
+            if not result["ok"]:
+                regressions.append(f"{label}: rotation failed")
+            if expected is None:
+                regressions.append(f"{label}: no baseline")
+                continue
+            for count in COUNTS:
+                if result[count] > expected[count]:
+                    regressions.append(f"{label}: {count} {result[count]} > baseline {expected[count]}")
+            if wall_factor is not None:
+                limit = expected["wall_ms"] * wall_factor + wall_slack_ms
+                if result["wall_ms"] > limit:
+                    regressions.append(f"{label}: wall {result['wall_ms']}ms > limit {limit:.1f}ms")
+    return regressions
+
+
+def load_baseline(path: pathlib.Path = BASELINE_PATH) -> Dict[str, Dict[str, Dict[str, object]]]:
+    with open(path, encoding="utf-8") as baseline_file:
+        return json.load(baseline_file)["results"]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=MODES + ("all",), default="all")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", type=pathlib.Path, default=BASELINE_PATH)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--wall-factor", type=float, default=1.5)
+    parser.add_argument("--wall-slack-ms", type=float, default=25.0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    modes = MODES if args.mode == "all" else (args.mode,)
+    results = run_suite(modes, args.repeat)
+
+    if args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"timestamp": time.time(), "repeat": args.repeat, "results": results}, baseline_file, indent=2)
+            baseline_file.write("\n")
+
+    if args.json:
+        print(json.dumps({"benchmark": "rotation", "timestamp": time.time(), "results": results}))
+    else:
+        print(f"{'mode':>13}  {'scenario':>21}  {'forks':>5}  {'lists':>5}  {'applies':>7}  {'writes':>6}  {'wall ms':>8}")
+        for mode, scenarios in results.items():
+            for name, result in scenarios.items():
+                print(
+                    f"{mode:>13}  {name:>21}  {result['forks']:>5}  {result['lists']:>5}  "
+                    f"{result['applies']:>7}  {result['config_writes']:>6}  {result['wall_ms']:>8.2f}"
+                )
+
+    if args.check:
+        regressions = find_regressions(results, load_baseline(args.baseline), args.wall_factor, args.wall_slack_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
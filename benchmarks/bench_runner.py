@@ -0,0 +1,81 @@
+"""Benchmark harness for the displayplacer command runners.
+
+Drives every runner in rotator.command_runner against benchmarks/fake_displayplacer.py,
+optionally inflating this process first (--ballast-mb) so fork cost resembles
+the menu bar app with AppKit loaded.
+
+    python benchmarks/bench_runner.py [--calls 50] [--threads 4] [--ballast-mb 0] [--json]
+"""
+import argparse
+import json
+import pathlib
+import sys
+import threading
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from rotator.command_runner import COMMAND_RUNNERS, create_command_runner  # noqa: E402
+
+FAKE_DISPLAYPLACER = str(ROOT / "benchmarks" / "fake_displayplacer.py")
+
+
+def drive(runner, calls: int, threads: int) -> float:
+    """Issue `calls` list commands from `threads` callers; returns wall seconds."""
+    per_thread = max(1, calls // threads)
+    command = [sys.executable, FAKE_DISPLAYPLACER, "list"]
+
+    def caller():
+        for _ in range(per_thread):
+            return_code, _, error = runner.run(command)
+            if return_code != 0:
+                raise RuntimeError(error)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=caller) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=4, help="concurrent callers (hotkeys pressed back to back)")
+    parser.add_argument("--ballast-mb", type=int, default=0, help="resident memory to allocate before spawning")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    ballast = bytearray(args.ballast_mb * 1024 * 1024)
+    for offset in range(0, len(ballast), 4096):
+        ballast[offset] = 1
+
+    results = []
+    for name in COMMAND_RUNNERS:
+        runner = create_command_runner(name)
+        try:
+            wall_seconds = drive(runner, args.calls, args.threads)
+            stats = runner.stats()
+        finally:
+            runner.close()
+        results.append({"runner": name, "wall_s": round(wall_seconds, 3), **stats})
+
+    if args.json:
+        print(json.dumps({"benchmark": "command_runner", "timestamp": time.time(), "results": results}))
+        return 0
+
+    print(f"{'runner':>10}  {'wall s':>7}  {'calls':>5}  {'p50 ms':>7}  {'p95 ms':>7}  {'max ms':>8}")
+    for row in results:
+        latency = row["latency"]
+        print(
+            f"{row['runner']:>10}  {row['wall_s']:>7.3f}  {latency['count']:>5}  "
+            f"{latency['p50_ms']:>7.1f}  {latency['p95_ms']:>7.1f}  {latency['max_ms']:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Startup cost of the headless CLI versus the menu bar app's import path.
+
+Each case runs in a fresh interpreter; the median wall time of `--runs`
+launches is reported. The GUI case only imports rotator.app (AppKit and
+rumps; pynput stays unloaded until a shortcut exists) and does not start
+NSApplication, so it is a lower bound; it is reported as unavailable where
+those packages are not installed. --importtime adds the slowest modules of
+`python -X importtime -c "import screen_rotator"`.
+
+    python benchmarks/bench_startup.py [--runs 10] [--importtime] [--json]
+"""
+import argparse
+import json
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+FAKE_DISPLAYPLACER = str(ROOT / "benchmarks" / "fake_displayplacer.py")
+
+CASES = {
+    "python_baseline": [sys.executable, "-c", "pass"],
+    "cli_import": [sys.executable, "-c", "import rotator.cli"],
+    "cli_list": [
+        sys.executable, "-m", "rotator", "--config", "/dev/null", "--displayplacer", FAKE_DISPLAYPLACER, "list", "--json",
+    ],
+    "helpers_import": [sys.executable, "-c", "import screen_rotator"],
+    "gui_import": [sys.executable, "-c", "import rotator.app"],
+}
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds per module, from `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def time_case(command, runs: int):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1:] or ["failed"]
+        samples.append(elapsed)
+    return statistics.median(samples) * 1000, None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--importtime", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, command in CASES.items():
+        median_ms, error = time_case(command, args.runs)
+        results[name] = {"median_ms": round(median_ms, 1)} if median_ms is not None else {"unavailable": error[0]}
+    if args.importtime:
+        slowest = sorted(import_times("screen_rotator").items(), key=lambda item: item[1], reverse=True)[:10]
+        results["importtime_ms"] = {name: round(cumulative / 1000, 1) for name, cumulative in slowest}
+
+    if args.json:
+        print(json.dumps({"benchmark": "startup", "timestamp": time.time(), "results": results}))
+        return 0
+
+    for name, result in results.items():
+        if name == "importtime_ms":
+            for module, cumulative_ms in result.items():
+                print(f"{'import ' + module:>32}  {cumulative_ms:>8.1f} ms")
+        elif "median_ms" in result:
+            print(f"{name:>16}  {result['median_ms']:>8.1f} ms")
+        else:
+            print(f"{name:>16}  unavailable ({result['unavailable']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
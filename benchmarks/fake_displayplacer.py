@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Stand-in for the `displayplacer` binary used by benchmarks and tests.
+
+`list` prints a captured fixture; any other invocation is accepted as a layout
+change. Environment knobs:
+
+    FAKE_DISPLAYPLACER_DISPLAYS            fixture size to print (1, 4 or 16; default 4)
+    FAKE_DISPLAYPLACER_DELAY               seconds to sleep before answering (default 0)
+    FAKE_DISPLAYPLACER_FAIL                exit with status 1 for layout changes when set
+
+With FAKE_DISPLAYPLACER_STATE pointing at a (possibly missing) JSON file the
+fake remembers layout changes between invocations, so `list` reports what the
+last change applied, starting from the fixture. Stateful runs also honour:
+
+    FAKE_DISPLAYPLACER_VISIBILITY_DELAY    seconds before a change shows up in `list`
+    FAKE_DISPLAYPLACER_FAIL_TIMES          fail this many layout changes, then succeed
+"""
+import fcntl
+import json
+import os
+import pathlib
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+FIXTURES = ROOT / "tests" / "fixtures"
+
+
+def fixture_output() -> str:
+    display_count = os.environ.get("FAKE_DISPLAYPLACER_DISPLAYS", "4")
+    return (FIXTURES / f"displayplacer_list_{display_count}.txt").read_text(encoding="utf-8")
+
+
+def run_stateful(argv, state_path: str) -> int:
+    sys.path.insert(0, str(ROOT))
+    from rotator.backends import SimulatedBackend
+
+    with open(state_path, "a+", encoding="utf-8") as state_file:
+        fcntl.flock(state_file, fcntl.LOCK_EX)
+        state_file.seek(0)
+        text = state_file.read()
+        state = json.loads(text) if text else {
+            "visible": fixture_output(),
+            "pending": None,
+            "visible_at": 0.0,
+            "fail_times": int(os.environ.get("FAKE_DISPLAYPLACER_FAIL_TIMES", "0") or 0),
+        }
+        if state["pending"] and time.time() >= state["visible_at"]:
+            state["visible"], state["pending"] = state["pending"], None
+
+        if argv[:1] == ["list"]:
+            sys.stdout.write(state["visible"])
+            exit_code = 0
+        else:
+            backend = SimulatedBackend.from_list_output(
+                state["pending"] or state["visible"],
+                fail_apply=bool(os.environ.get("FAKE_DISPLAYPLACER_FAIL")),
+                fail_next_applies=state["fail_times"],
+            )
+            exit_code, _, error = backend.apply_layout(argv)
+            state["fail_times"] = backend.fail_next_applies
+            if exit_code == 0:
+                visibility_delay = float(os.environ.get("FAKE_DISPLAYPLACER_VISIBILITY_DELAY", "0") or 0)
+                state["pending"] = backend.list_output()
+                state["visible_at"] = time.time() + visibility_delay
+                if not visibility_delay:
+                    state["visible"], state["pending"] = state["pending"], None
+            else:
+                sys.stderr.write(error + "\n")
+
+        state_file.seek(0)
+        state_file.truncate()
+        json.dump(state, state_file)
+    return exit_code
+
+
+def main(argv) -> int:
+    delay = float(os.environ.get("FAKE_DISPLAYPLACER_DELAY", "0") or 0)
+    if delay:
+        time.sleep(delay)
+
+    if not argv:
+        sys.stderr.write("usage: displayplacer list | displayplacer \"id:<id> ...\"\n")
+        return 1
+    state_path = os.environ.get("FAKE_DISPLAYPLACER_STATE")
+    if state_path:
+        return run_stateful(argv, state_path)
+
+    if argv[:1] == ["list"]:
+        sys.stdout.write(fixture_output())
+        return 0
+    if os.environ.get("FAKE_DISPLAYPLACER_FAIL"):
+        sys.stderr.write("Could not apply configuration\n")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
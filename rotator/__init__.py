@@ -0,0 +1 @@
+"""Platform-independent building blocks used by the Screen Rotator menu bar app."""
@@ -0,0 +1,160 @@
+"""Serial execution of rotation requests from hotkeys, menu clicks and the control socket.
+
+One worker thread runs requests in order. Requests that arrive while one is
+running wait in a small queue keyed by what they change; a newer request
+for the same key replaces the waiting one (last writer wins), so pressing
+90° and then 0° during a rotation applies only 0° next. The number of
+waiting keys is bounded and each action has a token bucket, so a stuck key
+or a looping script cannot pile up work.
+"""
+import collections
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional
+
+SUBMIT_QUEUED = "queued"
+SUBMIT_COALESCED = "coalesced"
+SUBMIT_RATE_LIMITED = "rate_limited"
+SUBMIT_FULL = "full"
+ACCEPTED = (SUBMIT_QUEUED, SUBMIT_COALESCED)
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`; a rate of 0 never limits."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+class ActionQueue:
+    """Runs `execute(action)` on one worker thread, coalescing requests that wait.
+
+    `coalesce_key(action)` groups actions that overwrite each other; by
+    default every action is its own group. `submit()` returns one of
+    SUBMIT_QUEUED, SUBMIT_COALESCED, SUBMIT_RATE_LIMITED or SUBMIT_FULL. The
+    worker thread starts on the first submit.
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[str], object],
+        maxsize: int = 4,
+        rate: float = 0.0,
+        burst: int = 1,
+        coalesce_key: Callable[[str], Hashable] = lambda action: action,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._execute = execute
+        self.maxsize = max(1, maxsize)
+        self.rate = rate
+        self.burst = burst
+        self._coalesce_key = coalesce_key
+        self._clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._pending: "collections.OrderedDict[Hashable, str]" = collections.OrderedDict()
+        self._running: Optional[str] = None
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+        self.submitted = 0
+        self.executed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.rate_limited = 0
+        self.queue_full = 0
+
+    @property
+    def dropped(self) -> int:
+        return self.rate_limited + self.queue_full
+
+    def submit(self, action: str) -> str:
+        with self._condition:
+            self.submitted += 1
+            bucket = self._buckets.get(action)
+            if bucket is None:
+                bucket = self._buckets[action] = TokenBucket(self.rate, self.burst, self._clock)
+            if not bucket.take():
+                self.rate_limited += 1
+                return SUBMIT_RATE_LIMITED
+            key = self._coalesce_key(action)
+            if key in self._pending:
+                # Keeps its place in line, runs the newest request
+                self._pending[key] = action
+                self.coalesced += 1
+                return SUBMIT_COALESCED
+            if len(self._pending) >= self.maxsize:
+                self.queue_full += 1
+                return SUBMIT_FULL
+            self._pending[key] = action
+            if self._worker is None and not self._closed:
+                self._worker = threading.Thread(target=self._run, name="rotation-worker", daemon=True)
+                self._worker.start()
+            self._condition.notify_all()
+            return SUBMIT_QUEUED
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                _, action = self._pending.popitem(last=False)
+                self._running = action
+            succeeded = False
+            try:
+                succeeded = self._execute(action) is not False
+            except Exception as e:
+                logging.error(f"Action {action} failed: {e}")
+            with self._condition:
+                self._running = None
+                self.executed += 1
+                if not succeeded:
+                    self.failed += 1
+                self._condition.notify_all()
+
+    def busy(self) -> bool:
+        with self._condition:
+            return self._running is not None or bool(self._pending)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is running or waiting; False if `timeout` ran out first."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._running is None and not self._pending, timeout)
+
+    def close(self) -> None:
+        """Stop the worker after the running action; waiting requests are discarded."""
+        with self._condition:
+            self._closed = True
+            self._pending.clear()
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, object]:
+        with self._condition:
+            return {
+                "running": self._running,
+                "pending": list(self._pending.values()),
+                "submitted": self.submitted,
+                "executed": self.executed,
+                "failed": self.failed,
+                "coalesced": self.coalesced,
+                "dropped": self.dropped,
+                "rate_limited": self.rate_limited,
+                "queue_full": self.queue_full,
+            }
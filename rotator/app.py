@@ -0,0 +1,674 @@
+import atexit
+import dataclasses
+import json
+import logging
+import math
+import os
+import plistlib
+import subprocess
+import sys
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Union
+
+import AppKit
+import Foundation
+import objc
+import rumps
+
+from rotator.config_store import ConfigStore
+from rotator.controller import RotationController
+from rotator.hotkeys import HotkeyRegistry
+from rotator.ipc import DEFAULT_SOCKET_PATH, ControlServer
+from rotator.logs import logging_options, setup_logging
+from rotator.menu_model import (
+    ACTION_LABELS,
+    DisplayMenuState,
+    MenuRefreshPipeline,
+    MenuRenderer,
+    MenuState,
+    build_menu_entries,
+)
+from rotator.scheduling import Debouncer, ThreadingScheduler
+from rotator.shortcuts import (
+    format_shortcut_display,
+    is_modifier_key_name,
+    key_name_map,
+    order_shortcut_keys,
+    pynput_keyboard,
+)
+from rotator.tracing import to_chrome_trace
+from rotator.transaction import TX_FAILED, RotationTransaction
+from rotator.ui_dispatch import MainThreadDispatcher
+
+if TYPE_CHECKING:
+    from pynput import keyboard
+
+# Script the launch agent runs from a source checkout
+ENTRY_POINT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "screen_rotator.py")
+# Chrome trace export of the last rotations (Settings > Export Rotation Traces)
+TRACE_EXPORT_FILE = os.path.expanduser("~/screen_rotator_traces.json")
+
+STATUS_ITEM_TITLE = "SR"
+
+
+class DisplayObserver(Foundation.NSObject):
+    """Helper class to handle native macOS notification callbacks safely."""
+    def initWithApp_(self, app):
+        self = objc.super(DisplayObserver, self).init()
+        if self:
+            self.app = app
+        return self
+
+    # Must stay visible to Objective-C: NSNotificationCenter calls it by selector
+    def displayParametersChanged_(self, notification):
+        logging.info("System display parameters changed, scheduling UI update.")
+        self.app.display_cache.invalidate()
+        self.app.display_change_signal.notify()
+        self.app.topology_reactor.notice()
+        # Dock attach and rotations emit bursts; refresh the menu once per burst
+        self.app.display_change_debouncer.trigger()
+
+
+class MainThreadWaker(Foundation.NSObject):
+    """Wakes the main run loop only when UI tasks are queued (no idle polling timer)."""
+    def initWithDispatcher_(self, dispatcher):
+        self = objc.super(MainThreadWaker, self).init()
+        if self:
+            self.dispatcher = dispatcher
+        return self
+
+    def drainUITasks_(self, _):
+        self.dispatcher.drain()
+
+    @objc.python_method
+    def wake(self):
+        self.performSelectorOnMainThread_withObject_waitUntilDone_("drainUITasks:", None, False)
+
+
+class ScreenRotatorApp(RotationController, rumps.App):
+    LAUNCH_AGENT_LABEL = "com.screenrotator.app"
+
+    def process_ui_task(self, task) -> None:
+        """Runs on the main thread, batched by MainThreadDispatcher.drain()."""
+        if task[0] == "notification":
+            rumps.notification(task[1], task[2], task[3])
+        elif task[0] == "confirm_notification":
+            # The button only shows if the user picked the Alerts style; the menu items are the main way to confirm
+            rumps.notification(
+                task[1], task[2], task[3], data={"revert_token": task[4]}, action_button="Keep Rotation"
+            )
+        elif task[0] == "alert":
+            rumps.alert(task[1], task[2])
+        elif task[0] == "render_menu":
+            self.apply_menu_state(task[1], task[2])
+        elif task[0] == "revert_tick":
+            self.apply_revert_tick(task[1])
+
+    def notify(self, title: str, subtitle: str, message: str = "") -> None:
+        self.ui_dispatcher.post(("notification", title, subtitle, message))
+
+    def alert(self, title: str, message: str) -> None:
+        self.ui_dispatcher.post(("alert", title, message))
+
+    def queue_update_menu(self) -> None:
+        self.menu_refresher.request()
+
+    def __init__(self):
+        config_store = ConfigStore(self.CONFIG_FILE)
+        # Persistent logging for production debugging; file I/O happens on the listener thread
+        self.log_pipeline = setup_logging(**logging_options(config_store.snapshot()))
+        self.log_buffer = self.log_pipeline.ring_buffer
+        atexit.register(self.log_pipeline.stop)
+        # Pending coalesced writes must reach disk when the app quits
+        atexit.register(config_store.flush)
+
+        super().__init__(STATUS_ITEM_TITLE, icon=None)
+        self.ui_dispatcher = MainThreadDispatcher(self.process_ui_task)
+        self._ui_waker = MainThreadWaker.alloc().initWithDispatcher_(self.ui_dispatcher)
+        self.ui_dispatcher.set_wake(self._ui_waker.wake)
+        self.menu_refresher = MenuRefreshPipeline(
+            gather=self.gather_menu_state,
+            post=lambda state, requested_at: self.ui_dispatcher.post(("render_menu", state, requested_at)),
+        )
+
+        self.init_rotation(config_store, self.find_displayplacer())
+        config = self.config_store.snapshot()
+        self.display_change_debouncer = Debouncer(
+            self._refresh_after_display_change,
+            ThreadingScheduler(),
+            delay=float(config.get("display_change_debounce_seconds", 0.3)),
+            max_wait=float(config.get("display_change_max_wait_seconds", 1.5)),
+        )
+
+        if self.display_backend.requires_displayplacer and not self.displayplacer_path:
+            rumps.alert(
+                "Error",
+                "displayplacer not found. Install with: brew install jakehilborn/jakehilborn/displayplacer",
+            )
+            rumps.quit_application()
+            return
+
+        self.shortcuts: Dict[str, Optional[Dict[str, Union[List[str], str]]]] = {
+            "toggle": None,
+            "rotate_90": None,
+            "rotate_0": None,
+            "rotate_270": None,
+            "toggle_set": None,
+        }
+
+        # One keyboard listener for the app's lifetime, shared by shortcuts and recording;
+        # pynput is imported only once a shortcut is configured or recording starts
+        self.hotkeys = HotkeyRegistry(self._start_key_listener, self.normalize_key_name, self.execute_shortcut_action)
+        atexit.register(self.hotkeys.stop)
+
+        # Built-in display rotation safety: the unconfirmed rotation rolls back after revert_seconds
+        self.revert_seconds = float(config.get("built_in_revert_seconds", 15))
+        self._revert_transaction: Optional[RotationTransaction] = None
+        self._revert_degree: Optional[int] = None
+        # Identifies the countdown a "Keep Rotation" notification was posted for
+        self._revert_token = 0
+        rumps.notifications(self._on_notification)
+        # launchctl answer for the menu checkmark; re-read only on toggle or Refresh Displays
+        self._launch_at_login: Optional[bool] = None
+        # Last state rendered, so countdown ticks can retitle one item without a full gather
+        self._menu_state: Optional[MenuState] = None
+
+        self.load_config()
+        if not self.target_display_persistent_id:
+            self.auto_select_target()
+        # Only a dock/undock after launch applies a profile, not the displays we start with
+        threading.Thread(target=self.topology_reactor.prime, daemon=True).start()
+
+        self.menu_renderer = MenuRenderer(
+            self.menu,
+            make_item=lambda title, callback: rumps.MenuItem(title, callback=callback),
+            make_separator=lambda: rumps.separator,
+            make_callback=self._menu_callback,
+        )
+        self.setup_control_server(config)
+        self.setup_display_observer()
+        self.queue_update_menu()
+        self.refresh_hotkeys()
+        logging.info("ScreenRotatorApp initialized successfully.")
+
+    def _refresh_after_display_change(self) -> None:
+        stats = self.display_change_debouncer.stats()
+        logging.info(
+            f"Display change refresh: {stats['triggers']} notifications received, "
+            f"{stats['calls']} refreshes performed."
+        )
+        self.queue_update_menu()
+        self.displays_changed()
+        self.publish_event({"event": "displays_changed"})
+
+    def setup_control_server(self, config: Dict[str, object]) -> None:
+        """Serve rotate/toggle/list/status over a Unix socket for scripts and hotkey tools."""
+        self.control_server: Optional[ControlServer] = None
+        if not config.get("control_socket_enabled", True):
+            return
+        try:
+            server = ControlServer(self, str(config.get("control_socket") or DEFAULT_SOCKET_PATH))
+            if server.start():
+                self.control_server = server
+                self.event_listeners.append(server.publish)
+                atexit.register(server.stop)
+        except Exception as e:
+            logging.error(f"Failed to start control socket: {e}")
+
+    def control_status(self) -> Dict[str, object]:
+        status = super().control_status()
+        status["revert_pending"] = self.revert_pending()
+        status["hotkeys"] = self.hotkeys.stats()
+        return status
+
+    def setup_display_observer(self):
+        """Listen to native macOS display changes to sync state."""
+        try:
+            self.display_observer = DisplayObserver.alloc().initWithApp_(self)
+            nc = AppKit.NSNotificationCenter.defaultCenter()
+            nc.addObserver_selector_name_object_(
+                self.display_observer,
+                "displayParametersChanged:",
+                AppKit.NSApplicationDidChangeScreenParametersNotification,
+                None
+            )
+            logging.info("Native display observer registered.")
+        except Exception as e:
+            logging.error(f"Failed to setup native display observer: {e}")
+
+    def read_config(self) -> Dict[str, object]:
+        return self.config_store.snapshot()
+
+    def write_config(self, config: Dict[str, object]) -> None:
+        self.config_store.replace(config)
+
+    def load_config(self) -> None:
+        self.load_rotation_config()
+
+        saved_shortcuts = self.config_store.get("shortcuts", {})
+        if not isinstance(saved_shortcuts, dict):
+            return
+
+        for action in self.shortcuts:
+            shortcut = saved_shortcuts.get(action)
+            if not isinstance(shortcut, dict):
+                continue
+            keys = shortcut.get("keys")
+            if not isinstance(keys, list):
+                continue
+            normalized_keys = order_shortcut_keys(keys)
+            if not normalized_keys:
+                continue
+            self.shortcuts[action] = {
+                "keys": normalized_keys,
+                "display": shortcut.get("display") or format_shortcut_display(normalized_keys),
+            }
+
+    def save_config(self) -> None:
+        self.config_store.update({
+            "shortcuts": self.shortcuts,
+            "target_display_id": self.target_display_persistent_id,
+            "display_set": self.display_set,
+        })
+
+    def gather_menu_state(self) -> MenuState:
+        """Collect menu contents on the refresh worker; may block on displayplacer/launchctl."""
+        available_displays = self.list_displays()
+        available_ids = {display["persistent_id"] for display in available_displays}
+        if not self.target_display_persistent_id or self.target_display_persistent_id not in available_ids:
+            previous_target = self.target_display_persistent_id
+            self.auto_select_target()
+            if self.target_display_persistent_id != previous_target:
+                self.save_config()
+        current_profile = self.profiles.match(available_ids)
+
+        return MenuState(
+            shortcut_displays=tuple(
+                (action_id, self.get_shortcut_display(action_id)) for action_id, _, _ in ACTION_LABELS
+            ),
+            displays=tuple(
+                DisplayMenuState(
+                    persistent_id=str(display["persistent_id"]),
+                    name=str(display["name"]),
+                    is_external=bool(display["is_external"]),
+                    degree=str(display.get("degree", "?")),
+                )
+                for display in available_displays
+            ),
+            target_display_id=self.target_display_persistent_id,
+            launch_at_login=self.launch_at_login_state(),
+            revert_pending=self.revert_pending(),
+            revert_remaining=self.revert_remaining(),
+            display_set=tuple(self.display_set),
+            profiles=tuple(self.profiles.names()),
+            current_profile=current_profile.name if current_profile else None,
+        )
+
+    def apply_menu_state(self, state: MenuState, requested_at: float) -> None:
+        """Main-thread half of a menu refresh: only touches AppKit, never spawns processes."""
+        # Don't refresh menu while recording a shortcut to avoid UI confusion
+        if self.hotkeys.recording_action:
+            return
+        self._menu_state = state
+        mutations = self.menu_renderer.render(build_menu_entries(state))
+        self.menu_refresher.rendered(requested_at)
+        logging.debug(
+            f"Menu refresh mutated {mutations} items; "
+            f"request to render p50={self.menu_refresher.render_latency.percentile(0.5)}ms"
+        )
+
+    def apply_revert_tick(self, seconds: int) -> None:
+        """Main thread: show the seconds left on Keep Rotation by re-rendering the last state."""
+        state = self._menu_state
+        if state is None or not state.revert_pending or self.hotkeys.recording_action:
+            return
+        self._menu_state = dataclasses.replace(state, revert_remaining=seconds)
+        self.menu_renderer.render(build_menu_entries(self._menu_state))
+
+    def _menu_callback(self, action):
+        if not action:
+            return None
+        kind = action[0]
+        if kind in ("toggle", "toggle_set"):
+            return lambda _: self.execute_shortcut_action(kind)
+        if kind == "toggle_set_member":
+            return lambda _: self.toggle_set_member(action[1])
+        if kind == "rotate":
+            return lambda _: self.execute_shortcut_action(action[1])
+        if kind == "select_target":
+            return lambda sender: self.select_target(sender, action[1])
+        if kind == "record":
+            return lambda _: self.start_recording(action[1])
+        if kind == "apply_profile":
+            return lambda _: self.execute_shortcut_action(f"profile:{action[1]}")
+        return {
+            "refresh": self.refresh_displays,
+            "clear_shortcuts": self.clear_all_shortcuts,
+            "export_traces": self.export_rotation_traces,
+            "save_profile": self.prompt_save_profile,
+            "launch_at_login": self.toggle_launch_at_login,
+            "confirm_rotation": self._confirm_rotation,
+            "revert_now": self._revert_now,
+        }.get(kind)
+
+    def refresh_displays(self, _) -> None:
+        self.display_cache.invalidate()
+        self._launch_at_login = None
+        self.queue_update_menu()
+        self.notify("Display List Refreshed", "", "")
+
+    def export_rotation_traces(self, _) -> None:
+        """Write the buffered rotation traces in Chrome trace format (open in ui.perfetto.dev)."""
+        traces = self.tracer.recent()
+        try:
+            with open(TRACE_EXPORT_FILE, "w", encoding="utf-8") as trace_file:
+                json.dump(to_chrome_trace(traces), trace_file)
+        except OSError as e:
+            logging.error(f"Failed to export rotation traces: {e}")
+            self.notify("Error", "Could not export rotation traces", str(e)[:180])
+            return
+        self.notify("Rotation Traces Exported", f"{len(traces)} rotations", TRACE_EXPORT_FILE)
+
+    def prompt_save_profile(self, _) -> None:
+        """Ask for a name, then save the current layout off the main thread (it may read displays)."""
+        response = rumps.Window(
+            "Name this display layout, e.g. the dock or desk it belongs to.",
+            title="Save Display Profile",
+            # From the cached snapshot only; the main thread never runs displayplacer
+            default_text=self.control_profiles()["current"] or "",
+            ok="Save",
+            cancel="Cancel",
+            dimensions=(240, 24),
+        ).run()
+        name = response.text.strip()
+        if not response.clicked or not name:
+            return
+
+        def save():
+            if self.save_profile(name):
+                self.queue_update_menu()
+
+        threading.Thread(target=save, daemon=True).start()
+
+    def select_target(self, sender, persistent_id: str) -> None:
+        self.target_display_persistent_id = persistent_id
+        self.save_config()
+        self.queue_update_menu()
+        self.notify("Display Selected", "Selection saved", persistent_id[:12] + "...")
+
+    def toggle_set_member(self, persistent_id: str) -> None:
+        if persistent_id in self.display_set:
+            del self.display_set[persistent_id]
+        else:
+            self.display_set[persistent_id] = 90
+        self.save_config()
+        self.queue_update_menu()
+
+    def revert_pending(self) -> bool:
+        transaction = self._revert_transaction
+        return bool(transaction and transaction.awaiting_confirmation)
+
+    def revert_remaining(self) -> Optional[int]:
+        transaction = self._revert_transaction
+        if not transaction or not transaction.awaiting_confirmation:
+            return None
+        return math.ceil(transaction.countdown.remaining())
+
+    def _start_revert_countdown(self, transaction: RotationTransaction, previous_degree: int, target_degree: int) -> None:
+        """Start the auto-revert countdown for built-in display rotation safety."""
+        # A countdown still running for an earlier rotation keeps that rotation
+        if self._revert_transaction:
+            self._revert_transaction.commit()
+
+        self._revert_transaction = transaction
+        self._revert_degree = previous_degree
+        self._revert_token += 1
+        seconds = self.revert_seconds
+        transaction.await_confirmation(
+            seconds,
+            on_timeout=self._auto_reverted,
+            # Only retitles Keep Rotation on the main thread; no gather, no launchctl
+            on_tick=lambda left: self.ui_dispatcher.post(("revert_tick", left)),
+        )
+        self.queue_update_menu()
+        self.ui_dispatcher.post((
+            "confirm_notification",
+            "Confirm Display Rotation",
+            f"Built-in display rotated to {target_degree}°",
+            f"Choose Keep Rotation in the SR menu within {seconds:.0f} seconds, or it reverts.",
+            self._revert_token,
+        ))
+        logging.info(f"Built-in display revert countdown started ({seconds:.0f}s). Previous: {previous_degree}°")
+
+    def _on_notification(self, notification) -> None:
+        """Runs on the main thread when a notification of ours is clicked."""
+        if getattr(notification, "activation_type", None) != "action_button_clicked":
+            return
+        try:
+            token = notification["revert_token"]
+        except (KeyError, TypeError):
+            return
+        # A button on the notification of an earlier countdown must not keep the current rotation
+        if token == self._revert_token:
+            self._confirm_rotation(None)
+
+    def _auto_reverted(self, restored: bool) -> None:
+        """Called when the countdown ran out and rolled the built-in display back."""
+        self._notify_reverted(restored, "No confirmation received")
+
+    def _notify_reverted(self, restored: bool, message: str) -> None:
+        if restored:
+            self.notify("Rotation Reverted", f"Reverted to {self._revert_degree}°", message)
+        else:
+            self.notify("Revert Failed", "Could not restore previous rotation", "")
+        self.queue_update_menu()
+
+    def _confirm_rotation(self, _) -> None:
+        """User confirmed the rotation — commit it and stop the countdown, off the main thread."""
+        transaction = self._revert_transaction
+        if not transaction or not transaction.awaiting_confirmation:
+            return
+
+        def confirm() -> None:
+            # Committing saves the layouts, which may read the displays (displayplacer list)
+            if not transaction.commit():
+                return
+            self.notify("Rotation Confirmed", "Display rotation kept", "")
+            self.queue_update_menu()
+            logging.info("User confirmed built-in display rotation.")
+
+        threading.Thread(target=confirm, daemon=True).start()
+
+    def _revert_now(self, _) -> None:
+        """User clicked Revert Now — roll back immediately, off the main thread."""
+        transaction = self._revert_transaction
+        if not transaction or not transaction.awaiting_confirmation:
+            return
+
+        def revert() -> None:
+            logging.info(f"Reverting built-in display to {self._revert_degree}°")
+            restored = transaction.rollback()
+            # False with any other end state means the countdown or a confirmation got there first
+            if restored or transaction.state == TX_FAILED:
+                self._notify_reverted(restored, "")
+
+        threading.Thread(target=revert, daemon=True).start()
+
+    def get_shortcut_display(self, action: str) -> str:
+        shortcut = self.shortcuts.get(action)
+        if isinstance(shortcut, dict) and shortcut.get("display"):
+            return str(shortcut["display"])
+        return "None"
+
+    def normalize_key_name(self, key) -> Optional[str]:
+        try:
+            if isinstance(key, pynput_keyboard().KeyCode) and key.char:
+                return key.char.lower()
+
+            if key in key_name_map():
+                return key_name_map()[key]
+
+            key_repr = str(key)
+            if key_repr.startswith("Key."):
+                return key_repr.split(".", 1)[1].lower()
+        except Exception as e:
+            logging.error(f"Error normalizing key: {e}")
+        return None
+
+    def start_recording(self, action: str) -> None:
+        if self.hotkeys.recording_action:
+            logging.info("Recording already in progress.")
+            return
+        # Use self.notify() (queue-based) — the recording finishes on the listener thread
+        # and rumps.notification() is not thread-safe
+        self.notify("Record Shortcut", f"Press keys for {action.replace('_', ' ')}", "Press Esc to cancel")
+        if not self.hotkeys.start_recording(action, self._finish_recording):
+            self.notify("Error", "Recording failed", "Keyboard listener could not start")
+            return
+        logging.info(f"Recording shortcut for {action}")
+
+    def _finish_recording(self, action: str, keys: Optional[List[str]]) -> None:
+        if keys is None:
+            self.notify("Shortcut", "Recording cancelled", "")
+            self.queue_update_menu()
+            return
+        self.save_recorded_shortcut(action, keys)
+
+    def save_recorded_shortcut(self, action: str, keys: Sequence[str]) -> None:
+        try:
+            ordered_keys = order_shortcut_keys(keys)
+            if not any(not is_modifier_key_name(key) for key in ordered_keys):
+                self.notify("Invalid Shortcut", "Use at least one non-modifier key", "")
+                return
+
+            display = format_shortcut_display(ordered_keys)
+            self.shortcuts[action] = {"keys": ordered_keys, "display": display}
+
+            self.save_config()
+            self.queue_update_menu()
+            self.refresh_hotkeys()
+
+            self.notify("Shortcut Saved", action.replace("_", " ").title(), display)
+            logging.info(f"Shortcut saved for {action}: {display}")
+        except Exception as e:
+            logging.error(f"Error saving shortcut: {e}")
+
+    def _start_key_listener(self, on_press, on_release) -> "keyboard.Listener":
+        listener = pynput_keyboard().Listener(on_press=on_press, on_release=on_release)
+        listener.start()
+        logging.info("Global key listener started.")
+        return listener
+
+    def refresh_hotkeys(self) -> None:
+        """Swap the configured shortcuts into the running listener's dispatch table."""
+        try:
+            configured = {
+                action: shortcut["keys"]
+                for action, shortcut in self.shortcuts.items()
+                if isinstance(shortcut, dict) and isinstance(shortcut.get("keys"), list)
+            }
+            self.hotkeys.update(configured)
+            logging.info(
+                f"Hotkeys updated: {len(configured)} shortcuts, "
+                f"listener started {self.hotkeys.listener_starts} times."
+            )
+        except Exception as e:
+            logging.error(f"Failed to update hotkeys: {e}")
+
+    def clear_all_shortcuts(self, _) -> None:
+        for action in self.shortcuts:
+            self.shortcuts[action] = None
+        self.save_config()
+        self.queue_update_menu()
+        self.refresh_hotkeys()
+        self.notify("Shortcuts Cleared", "", "")
+
+    def run_command(self, command: Sequence[str], timeout: float = 10.0):
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+            return result.returncode, result.stdout, result.stderr
+        except subprocess.TimeoutExpired as error:
+            logging.error(f"Command timed out after {timeout}s: {command}")
+            return -1, "", f"Command timed out: {error}"
+        except Exception as error:
+            logging.error(f"Error running command {command}: {error}")
+            return -1, "", str(error)
+
+    def get_launch_agent_path(self) -> str:
+        return os.path.expanduser(f"~/Library/LaunchAgents/{self.LAUNCH_AGENT_LABEL}.plist")
+
+    def launch_at_login_state(self) -> bool:
+        """Cached is_launch_at_login_enabled(), so menu refreshes do not fork launchctl."""
+        enabled = self._launch_at_login
+        if enabled is None:
+            enabled = self._launch_at_login = self.is_launch_at_login_enabled()
+        return enabled
+
+    def is_launch_at_login_enabled(self) -> bool:
+        return_code, _, _ = self.run_command(["launchctl", "list", self.LAUNCH_AGENT_LABEL], timeout=5.0)
+        if return_code == 0: return True
+        return os.path.exists(self.get_launch_agent_path())
+
+    def get_launch_program_arguments(self) -> List[str]:
+        if getattr(sys, "frozen", False):
+            app_bundle_path = os.path.abspath(os.path.join(os.path.dirname(sys.executable), "..", "..", ".."))
+            return ["/usr/bin/open", "-a", app_bundle_path]
+        return [sys.executable, ENTRY_POINT]
+
+    def write_launch_agent_plist(self) -> None:
+        launch_agent_path = self.get_launch_agent_path()
+        os.makedirs(os.path.dirname(launch_agent_path), exist_ok=True)
+        plist_data = {
+            "Label": self.LAUNCH_AGENT_LABEL,
+            "ProgramArguments": self.get_launch_program_arguments(),
+            "RunAtLoad": True,
+            "KeepAlive": False,
+        }
+        with open(launch_agent_path, "wb") as plist_file:
+            plistlib.dump(plist_data, plist_file)
+
+    def load_launch_agent(self):
+        launch_agent_path = self.get_launch_agent_path()
+        return self.run_command(["launchctl", "bootstrap", f"gui/{os.getuid()}", launch_agent_path], timeout=5.0)
+
+    def unload_launch_agent(self):
+        launch_agent_path = self.get_launch_agent_path()
+        return self.run_command(["launchctl", "bootout", f"gui/{os.getuid()}", launch_agent_path], timeout=5.0)
+
+    def toggle_launch_at_login(self, sender) -> None:
+        launch_agent_path = self.get_launch_agent_path()
+        enabled = self.is_launch_at_login_enabled()
+
+        if enabled:
+            self.unload_launch_agent()
+            if os.path.exists(launch_agent_path):
+                os.remove(launch_agent_path)
+            sender.state = 0
+            self._launch_at_login = False
+            self.notify("Launch at Login", "Disabled", "")
+            return
+
+        try:
+            self.write_launch_agent_plist()
+            return_code, _, error = self.load_launch_agent()
+            if return_code != 0 and "already loaded" not in error.lower():
+                raise RuntimeError(error.strip() or "launchctl bootstrap failed")
+            sender.state = 1
+            self._launch_at_login = True
+            self.notify("Launch at Login", "Enabled", "")
+        except Exception as error:
+            sender.state = 0
+            self._launch_at_login = None
+            logging.error(f"Failed to enable launch at login: {error}")
+            self.notify("Launch at Login", "Failed to enable", str(error)[:180])
+
+
+def main() -> None:
+    try:
+        ScreenRotatorApp().run()
+    except Exception as e:
+        logging.critical(f"Application main loop crashed: {e}")
+
+
+if __name__ == "__main__":
+    main()
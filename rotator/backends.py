@@ -0,0 +1,423 @@
+import abc
+import contextlib
+import dataclasses
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from rotator.command_runner import LatencyHistogram, create_command_runner
+from rotator.display_state import (
+    DisplayList,
+    DisplayRecord,
+    DisplaySnapshot,
+    format_displayplacer_list,
+    parse_displayplacer_list,
+)
+from rotator.layout import build_batch_rotation_args, parse_layout_argument, parse_origin, record_layout_argument
+
+# Same shape as the command runners: (return code, stdout, stderr)
+CommandOutput = Tuple[int, str, str]
+
+# In-process reads finish in well under a millisecond, so start finer than the runner buckets
+BACKEND_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class DisplayBackend(abc.ABC):
+    """Reads and changes the display arrangement.
+
+    Layout arguments use displayplacer's syntax ("id:<persistent id>
+    res:WxH origin:(x,y) degree:90"), which is also how saved layouts are
+    stored, so every backend can apply every saved layout. Each public
+    operation is timed into `timings[<operation>]`.
+    """
+
+    name = ""
+    requires_displayplacer = True
+
+    def __init__(self):
+        self.timings: Dict[str, LatencyHistogram] = {}
+        self._timings_lock = threading.Lock()
+        self._change_listeners: List[Callable[[], None]] = []
+
+    @contextlib.contextmanager
+    def timed(self, operation: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._timings_lock:
+                histogram = self.timings.setdefault(operation, LatencyHistogram(BACKEND_BUCKETS_MS))
+            histogram.record(time.perf_counter() - started)
+
+    @abc.abstractmethod
+    def list_displays(self) -> Optional[DisplayList]:
+        """Current displays plus the arguments that recreate them, or None if the read failed."""
+
+    def get_display(self, persistent_id: str) -> Optional[DisplayRecord]:
+        with self.timed("get"):
+            display_list = self.list_displays()
+            return display_list.by_id().get(persistent_id) if display_list else None
+
+    @abc.abstractmethod
+    def apply_layout(self, layout_args: Sequence[str]) -> CommandOutput:
+        """Apply displayplacer layout arguments in one change."""
+
+    def rotate(self, persistent_id: str, degree: int) -> CommandOutput:
+        """Rotate one display, moving its neighbours so nothing overlaps."""
+        with self.timed("rotate"):
+            display_list = self.list_displays()
+            if display_list is None:
+                return -1, "", "Could not read the current display layout"
+            layout_args = build_batch_rotation_args(DisplaySnapshot.from_display_list(display_list), {persistent_id: degree})
+            if not layout_args:
+                return -1, "", f"Display not found: {persistent_id}"
+            return self.apply_layout(layout_args)
+
+    def add_change_listener(self, listener: Callable[[], None]) -> None:
+        self._change_listeners.append(listener)
+
+    def _notify_change(self) -> None:
+        for listener in list(self._change_listeners):
+            listener()
+
+    def subprocess_calls(self) -> int:
+        """Processes this backend has started so far."""
+        return 0
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        with self._timings_lock:
+            timings = dict(self.timings)
+        return {operation: histogram.snapshot() for operation, histogram in timings.items()}
+
+    def timing_summary(self) -> str:
+        with self._timings_lock:
+            timings = sorted(self.timings.items())
+        return ", ".join(
+            f"{operation} p50={histogram.percentile(0.5)}ms p95={histogram.percentile(0.95)}ms"
+            for operation, histogram in timings
+        ) or "no operations"
+
+    def close(self) -> None:
+        pass
+
+
+class DisplayplacerBackend(DisplayBackend):
+    """Runs the displayplacer binary for every read and write."""
+
+    name = "displayplacer"
+
+    def __init__(self, displayplacer_path: Optional[str], runner=None):
+        super().__init__()
+        self.displayplacer_path = displayplacer_path
+        self.runner = runner or create_command_runner()
+
+    def list_displays(self) -> Optional[DisplayList]:
+        with self.timed("list"):
+            return_code, output, error = self.runner.run([self.displayplacer_path, "list"])
+            if return_code != 0:
+                logging.error(f"displayplacer list failed: {error}")
+                return None
+            return parse_displayplacer_list(output)
+
+    def apply_layout(self, layout_args: Sequence[str]) -> CommandOutput:
+        with self.timed("apply"):
+            return self.runner.run([self.displayplacer_path, *layout_args])
+
+    def subprocess_calls(self) -> int:
+        # Every list and apply is one displayplacer run
+        with self._timings_lock:
+            return sum(self.timings[operation].count for operation in ("list", "apply") if operation in self.timings)
+
+    def close(self) -> None:
+        self.runner.close()
+
+
+class CoreGraphicsBackend(DisplayBackend):
+    """Reads and moves displays in-process through the Quartz (CoreGraphics) bridge.
+
+    Listing and origin-only changes never spawn a process. macOS has no
+    public API for rotation (displayplacer itself uses a private one), so
+    layouts that change a display's degree or mode are handed to `fallback`.
+    """
+
+    name = "coregraphics"
+    MAX_DISPLAYS = 32
+
+    def __init__(self, fallback: DisplayBackend):
+        super().__init__()
+        import Quartz
+
+        self._quartz = Quartz
+        self.fallback = fallback
+        self._display_ids: Dict[str, int] = {}
+
+    def _persistent_id(self, display_id: int) -> str:
+        quartz = self._quartz
+        create_uuid = getattr(quartz, "CGDisplayCreateUUIDFromDisplayID", None)
+        if create_uuid is None:
+            from ColorSync import CGDisplayCreateUUIDFromDisplayID as create_uuid
+        from CoreFoundation import CFUUIDCreateString
+
+        return str(CFUUIDCreateString(None, create_uuid(display_id)))
+
+    def _read_record(self, display_id: int) -> DisplayRecord:
+        quartz = self._quartz
+        bounds = quartz.CGDisplayBounds(display_id)
+        mode = quartz.CGDisplayCopyDisplayMode(display_id)
+        is_built_in = bool(quartz.CGDisplayIsBuiltin(display_id))
+        if is_built_in:
+            display_type = "MacBook built in screen"
+        else:
+            size_mm = quartz.CGDisplayScreenSize(display_id)
+            diagonal_inches = math.hypot(size_mm.width, size_mm.height) / 25.4
+            display_type = f"{round(diagonal_inches)} inch external screen"
+        refresh_rate = quartz.CGDisplayModeGetRefreshRate(mode) if mode else 0
+        scaling = None
+        if mode:
+            scaling = "on" if quartz.CGDisplayModeGetPixelWidth(mode) > quartz.CGDisplayModeGetWidth(mode) else "off"
+        return DisplayRecord(
+            persistent_id=self._persistent_id(display_id),
+            name=display_type,
+            type=display_type,
+            resolution=f"{int(bounds.size.width)}x{int(bounds.size.height)}",
+            origin=(int(bounds.origin.x), int(bounds.origin.y)),
+            rotation=int(quartz.CGDisplayRotation(display_id)),
+            hertz=str(int(round(refresh_rate))) if refresh_rate else None,
+            scaling=scaling,
+            is_built_in=is_built_in,
+            is_external=not is_built_in,
+            is_main=bool(quartz.CGDisplayIsMain(display_id)),
+        )
+
+    def list_displays(self) -> Optional[DisplayList]:
+        with self.timed("list"):
+            error, display_ids, _ = self._quartz.CGGetActiveDisplayList(self.MAX_DISPLAYS, None, None)
+            if error:
+                logging.error(f"CGGetActiveDisplayList failed: {error}")
+                return None
+            records = []
+            display_id_map = {}
+            for display_id in display_ids:
+                record = self._read_record(display_id)
+                records.append(record)
+                display_id_map[record.persistent_id] = display_id
+            self._display_ids = display_id_map
+            return DisplayList(
+                displays=tuple(records),
+                restore_command=tuple(record_layout_argument(record) for record in records),
+            )
+
+    def _origin_changes(self, layout_args: Sequence[str]) -> Optional[Dict[int, Tuple[int, int]]]:
+        """Origins to set when `layout_args` only moves displays; None if anything else changes."""
+        display_list = self.list_displays()
+        if display_list is None:
+            return None
+        current = display_list.by_id()
+        changes: Dict[int, Tuple[int, int]] = {}
+        for argument in layout_args:
+            fields = parse_layout_argument(argument)
+            record = current.get(fields.get("id", ""))
+            if record is None or fields.get("enabled", "true") != "true":
+                return None
+            if fields.get("res", record.resolution) != record.resolution:
+                return None
+            if int(fields.get("degree", record.rotation or 0)) != (record.rotation or 0):
+                return None
+            origin = parse_origin(fields.get("origin", ""))
+            if origin is not None and origin != record.origin:
+                changes[self._display_ids[record.persistent_id]] = origin
+        return changes
+
+    def apply_layout(self, layout_args: Sequence[str]) -> CommandOutput:
+        with self.timed("apply"):
+            changes = self._origin_changes(layout_args)
+            if changes is None:
+                return self.fallback.apply_layout(layout_args)
+            if not changes:
+                return 0, "", ""
+
+            quartz = self._quartz
+            error, config = quartz.CGBeginDisplayConfiguration(None)
+            if error:
+                return -1, "", f"CGBeginDisplayConfiguration failed: {error}"
+            for display_id, (x, y) in changes.items():
+                quartz.CGConfigureDisplayOrigin(config, display_id, x, y)
+            error = quartz.CGCompleteDisplayConfiguration(config, quartz.kCGConfigurePermanently)
+            if error:
+                return -1, "", f"CGCompleteDisplayConfiguration failed: {error}"
+            return 0, "", ""
+
+    def subprocess_calls(self) -> int:
+        return self.fallback.subprocess_calls()
+
+    def close(self) -> None:
+        self.fallback.close()
+
+
+def simulated_displays(count: int) -> Tuple[DisplayRecord, ...]:
+    """A built-in screen plus `count - 1` external screens in a row to its right."""
+    displays = [DisplayRecord(
+        persistent_id="5157A7ED-0000-0000-0000-000000000001",
+        name="MacBook built in screen",
+        type="MacBook built in screen",
+        resolution="1512x982",
+        origin=(0, 0),
+        rotation=0,
+        hertz="120",
+        color_depth="8",
+        scaling="on",
+        is_built_in=True,
+        is_main=True,
+    )]
+    for index in range(2, count + 1):
+        displays.append(DisplayRecord(
+            persistent_id=f"5157A7ED-0000-0000-0000-{index:012d}",
+            name="27 inch external screen",
+            type="27 inch external screen",
+            resolution="2560x1440",
+            origin=(1512 + (index - 2) * 2560, 0),
+            rotation=0,
+            hertz="60",
+            color_depth="8",
+            scaling="off",
+            is_external=True,
+        ))
+    return tuple(displays[:count])
+
+
+SIMULATED_DISPLAYS = simulated_displays(2)
+
+
+class SimulatedBackend(DisplayBackend):
+    """In-memory displays for tests, benchmarks and trying the CLI on any OS.
+
+    `latency` delays every operation, `fail_apply` makes every layout change
+    fail like displayplacer does (`fail_next_applies` only the next few), and
+    `visibility_delay` keeps reads returning the old arrangement for a while
+    after a change, as macOS does while it reconfigures.
+    """
+
+    name = "simulated"
+    requires_displayplacer = False
+
+    def __init__(
+        self,
+        displays: Sequence[DisplayRecord] = SIMULATED_DISPLAYS,
+        latency: float = 0.0,
+        fail_apply: bool = False,
+        fail_next_applies: int = 0,
+        visibility_delay: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.latency = latency
+        self.fail_apply = fail_apply
+        self.fail_next_applies = fail_next_applies
+        self.visibility_delay = visibility_delay
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._displays: Tuple[DisplayRecord, ...] = tuple(displays)
+        self._pending: Optional[Tuple[float, Tuple[DisplayRecord, ...]]] = None
+        self.applied: List[List[str]] = []
+
+    @classmethod
+    def from_list_output(cls, output: str, **options) -> "SimulatedBackend":
+        return cls(parse_displayplacer_list(output).displays, **options)
+
+    def _visible_displays(self) -> Tuple[DisplayRecord, ...]:
+        became_visible = False
+        with self._lock:
+            if self._pending and self._clock() >= self._pending[0]:
+                self._displays = self._pending[1]
+                self._pending = None
+                became_visible = True
+            displays = self._displays
+        if became_visible:
+            self._notify_change()
+        return displays
+
+    def list_displays(self) -> Optional[DisplayList]:
+        with self.timed("list"):
+            if self.latency:
+                time.sleep(self.latency)
+            displays = self._visible_displays()
+            return DisplayList(
+                displays=displays,
+                restore_command=tuple(record_layout_argument(record) for record in displays),
+            )
+
+    def list_output(self) -> str:
+        """Current state as `displayplacer list` would print it."""
+        return format_displayplacer_list(self.list_displays())
+
+    def set_displays(self, displays: Sequence[DisplayRecord]) -> None:
+        """Replace the connected displays at once, like plugging into or out of a dock."""
+        with self._lock:
+            self._displays = tuple(displays)
+            self._pending = None
+        self._notify_change()
+
+    def apply_layout(self, layout_args: Sequence[str]) -> CommandOutput:
+        with self.timed("apply"):
+            if self.latency:
+                time.sleep(self.latency)
+            if self.fail_apply or self.fail_next_applies > 0:
+                self.fail_next_applies = max(0, self.fail_next_applies - 1)
+                return 1, "", "Could not apply configuration"
+
+            with self._lock:
+                base = self._pending[1] if self._pending else self._displays
+                displays = {record.persistent_id: record for record in base}
+                for argument in layout_args:
+                    fields = parse_layout_argument(argument)
+                    record = displays.get(fields.get("id", ""))
+                    if record is None:
+                        return 1, "", f"Unable to find screen {fields.get('id')}"
+                    displays[record.persistent_id] = dataclasses.replace(
+                        record,
+                        resolution=fields.get("res", record.resolution),
+                        origin=parse_origin(fields.get("origin", "")) or record.origin,
+                        rotation=int(fields.get("degree", record.rotation or 0)),
+                        hertz=fields.get("hz", record.hertz),
+                        scaling=fields.get("scaling", record.scaling),
+                    )
+                updated = tuple(displays[record.persistent_id] for record in base)
+                self.applied.append(list(layout_args))
+                if self.visibility_delay:
+                    self._pending = (self._clock() + self.visibility_delay, updated)
+                else:
+                    self._displays = updated
+
+            if self.visibility_delay:
+                timer = threading.Timer(self.visibility_delay, self._visible_displays)
+                timer.daemon = True
+                timer.start()
+            else:
+                self._notify_change()
+            return 0, "", ""
+
+
+DISPLAY_BACKENDS = ("displayplacer", "coregraphics", "simulated")
+
+
+def create_display_backend(
+    name: Optional[str] = None,
+    displayplacer_path: Optional[str] = None,
+    runner_name: Optional[str] = None,
+    **options,
+) -> DisplayBackend:
+    """Build a backend by config name, falling back to displayplacer when unknown or unavailable."""
+    if name == SimulatedBackend.name:
+        return SimulatedBackend(**options)
+
+    displayplacer = DisplayplacerBackend(displayplacer_path, create_command_runner(runner_name))
+    if name == CoreGraphicsBackend.name:
+        try:
+            return CoreGraphicsBackend(fallback=displayplacer)
+        except ImportError as error:
+            logging.warning(f"CoreGraphics backend unavailable ({error}), using displayplacer")
+    elif name not in (None, DisplayplacerBackend.name):
+        logging.warning(f"Unknown display backend '{name}', using '{DisplayplacerBackend.name}'")
+    return displayplacer
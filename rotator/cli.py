@@ -0,0 +1,222 @@
+"""Headless entry point: rotate displays from scripts and launchd jobs.
+
+    screen_rotator rotate [--display ID] --degree 90
+    screen_rotator toggle [--display ID | --set]
+    screen_rotator list [--json]
+    screen_rotator profile {list | save NAME | apply [NAME] | delete NAME}
+    screen_rotator trace [--last N] [--format jsonl|chrome] [--output PATH]
+    screen_rotator logs [--last N]
+
+Shares RotationController and the config file with the menu bar app but never
+imports AppKit, rumps or pynput. `trace` and `logs` ask the running app,
+over its control socket, for the phase timings of its last rotations and
+its in-memory log lines.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from typing import Dict, List, Optional, Sequence
+
+from rotator.backends import DISPLAY_BACKENDS, create_display_backend
+from rotator.config_store import ConfigStore
+from rotator.controller import RotationController
+from rotator.ipc import DEFAULT_SOCKET_PATH, ControlClient
+from rotator.tracing import to_chrome_trace, to_jsonl
+
+COMMANDS = ("rotate", "toggle", "list", "profile", "trace", "logs")
+
+
+class HeadlessRotator(RotationController):
+    """RotationController that reports to stderr instead of notifications and menus."""
+
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        displayplacer_path: Optional[str] = None,
+        backend_name: Optional[str] = None,
+    ):
+        config_store = ConfigStore(config_path or self.CONFIG_FILE)
+        displayplacer_path = displayplacer_path or self.find_displayplacer()
+        display_backend = None
+        if backend_name:
+            display_backend = create_display_backend(
+                backend_name,
+                displayplacer_path=displayplacer_path,
+                runner_name=config_store.get("displayplacer_runner"),
+            )
+        self.init_rotation(config_store, displayplacer_path, display_backend)
+        self.load_rotation_config()
+        self.messages: List[str] = []
+
+    def notify(self, title: str, subtitle: str, message: str = "") -> None:
+        text = " - ".join(part for part in (title, subtitle, message) if part)
+        self.messages.append(text)
+        print(text, file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="screen_rotator", description="Rotate displays without the menu bar app.")
+    parser.add_argument("--config", help="config file (default: ~/.screen_rotator_config.json)")
+    parser.add_argument("--displayplacer", help="path to the displayplacer binary")
+    parser.add_argument("--backend", choices=DISPLAY_BACKENDS, help="display backend (default: from config)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log rotation details to stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rotate = commands.add_parser("rotate", help="rotate one display to a degree")
+    rotate.add_argument("--display", help="persistent screen id (default: the app's target display)")
+    rotate.add_argument("--degree", type=int, choices=(0, 90, 270), required=True)
+
+    toggle = commands.add_parser("toggle", help="switch between landscape and portrait")
+    toggle_target = toggle.add_mutually_exclusive_group()
+    toggle_target.add_argument("--display", help="persistent screen id (default: the app's target display)")
+    toggle_target.add_argument("--set", action="store_true", help="toggle the saved display set together")
+
+    list_command = commands.add_parser("list", help="show connected displays")
+    list_command.add_argument("--json", action="store_true", help="print machine-readable output")
+
+    profile = commands.add_parser("profile", help="save and apply named layouts of all connected displays")
+    profile.add_argument("operation", choices=("list", "save", "apply", "delete"))
+    profile.add_argument("name", nargs="?", help="profile name (apply: default is the one saved for these displays)")
+
+    trace = commands.add_parser("trace", help="dump phase timings of the running app's last rotations")
+    trace.add_argument("--last", type=int, help="number of rotations (default: all buffered)")
+    trace.add_argument("--format", choices=("jsonl", "chrome"), default="jsonl")
+    trace.add_argument("--output", help="write to a file instead of stdout")
+    trace.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="control socket of the running app")
+
+    logs = commands.add_parser("logs", help="print the running app's buffered log lines")
+    logs.add_argument("--last", type=int, help="number of lines (default: all buffered)")
+    logs.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="control socket of the running app")
+    return parser
+
+
+def print_displays(rotator: HeadlessRotator, as_json: bool) -> int:
+    displays = rotator.list_displays()
+    if as_json:
+        print(json.dumps({"target_display_id": rotator.target_display_persistent_id, "displays": displays}, indent=2))
+        return 0 if displays else 1
+
+    if not displays:
+        print("No displays detected", file=sys.stderr)
+        return 1
+    for display in displays:
+        marker = "*" if display["persistent_id"] == rotator.target_display_persistent_id else " "
+        kind = "External" if display["is_external"] else "Built-in"
+        print(f"{marker} {display['persistent_id']}  {display['name']} ({kind}) [{display['degree']}°]")
+    return 0
+
+
+def run_profile_command(rotator: HeadlessRotator, operation: str, name: Optional[str]) -> int:
+    if operation == "list":
+        current = rotator.profile_for_connected_displays()
+        for profile_name in rotator.profiles.names():
+            profile = rotator.profiles.get(profile_name)
+            marker = "*" if current and current.name == profile_name else " "
+            print(f"{marker} {profile_name}  {', '.join(profile.display_ids)}")
+        return 0
+    if operation == "apply" and not name:
+        current = rotator.profile_for_connected_displays()
+        if current is None:
+            print("No profile saved for the connected displays", file=sys.stderr)
+            return 1
+        name = current.name
+    if not name:
+        print(f"profile {operation} needs a name", file=sys.stderr)
+        return 2
+    if operation == "save":
+        return 0 if rotator.save_profile(name) else 1
+    if operation == "delete":
+        if not rotator.delete_profile(name):
+            print(f"Unknown profile: {name}", file=sys.stderr)
+            return 1
+        return 0
+    return 0 if rotator.apply_profile(name) else 1
+
+
+def request_app(socket_path: str, command: str, **params) -> Optional[Dict[str, object]]:
+    """Send one request to the running app; prints the problem and returns None on failure."""
+    async def fetch():
+        client = await ControlClient.connect(socket_path)
+        try:
+            return await client.request(command, **params)
+        finally:
+            await client.close()
+
+    try:
+        response = asyncio.run(fetch())
+    except (OSError, asyncio.TimeoutError) as error:
+        print(f"Could not reach the menu bar app at {socket_path}: {error}", file=sys.stderr)
+        return None
+    if not response.get("ok"):
+        print(f"{command} request failed: {response.get('error')}", file=sys.stderr)
+        return None
+    return response
+
+
+def dump_traces(args: argparse.Namespace) -> int:
+    response = request_app(args.socket, "traces", last=args.last)
+    if response is None:
+        return 1
+
+    traces = response["traces"]
+    text = to_jsonl(traces) if args.format == "jsonl" else json.dumps(to_chrome_trace(traces))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(text)
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+    )
+
+    if args.command == "trace":
+        return dump_traces(args)
+    if args.command == "logs":
+        response = request_app(args.socket, "logs", last=args.last)
+        if response is None:
+            return 1
+        for line in response["lines"]:
+            print(line)
+        return 0
+
+    rotator = HeadlessRotator(args.config, args.displayplacer, args.backend)
+    if rotator.display_backend.requires_displayplacer and not rotator.displayplacer_path:
+        print("displayplacer not found. Install with: brew install jakehilborn/jakehilborn/displayplacer", file=sys.stderr)
+        return 1
+
+    try:
+        if args.command == "list":
+            return print_displays(rotator, args.json)
+        if args.command == "profile":
+            return run_profile_command(rotator, args.operation, args.name)
+        if getattr(args, "display", None):
+            # An explicit display must not silently fall back to another one
+            if not rotator.get_display_info(args.display):
+                print(f"Display not found: {args.display}", file=sys.stderr)
+                return 1
+            rotator.target_display_persistent_id = args.display
+        if args.command == "rotate":
+            succeeded = rotator.set_rotation(args.degree)
+        elif args.set:
+            succeeded = rotator.toggle_display_set()
+        else:
+            succeeded = rotator.toggle(None)
+        return 0 if succeeded else 1
+    finally:
+        # Pending layout writes must reach disk before the process exits
+        rotator.config_store.flush()
+        rotator.display_backend.close()
+        logging.info(f"{rotator.display_backend.name} backend: {rotator.display_backend.timing_summary()}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+import bisect
+import logging
+import queue
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+CommandResult = Tuple[int, str, str]
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket latency histogram."""
+
+    def __init__(self, bounds_ms: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float) -> None:
+        milliseconds = seconds * 1000.0
+        index = bisect.bisect_left(self.bounds_ms, milliseconds)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total_ms += milliseconds
+            self.min_ms = milliseconds if self.count == 1 else min(self.min_ms, milliseconds)
+            self.max_ms = max(self.max_ms, milliseconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Estimated latency (ms) below which the given fraction of samples falls.
+
+        Interpolates linearly inside the bucket holding that sample, between
+        the bucket's bounds narrowed to the smallest and largest latency seen,
+        so samples that all land in one bucket still give distinct p50 and p95.
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            threshold = fraction * self.count
+            seen = 0
+            for index, bucket_count in enumerate(self._counts):
+                if bucket_count and seen + bucket_count >= threshold:
+                    lower = max(self.bounds_ms[index - 1] if index else 0.0, self.min_ms)
+                    upper = min(self.bounds_ms[index], self.max_ms) if index < len(self.bounds_ms) else self.max_ms
+                    position = max(0.0, threshold - seen) / bucket_count
+                    return round(lower + (upper - lower) * position, 3)
+                seen += bucket_count
+            return round(self.max_ms, 3)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            buckets = {f"<={bound}ms": count for bound, count in zip(self.bounds_ms, self._counts)}
+            buckets[f">{self.bounds_ms[-1]}ms"] = self._counts[-1]
+            mean_ms = self.total_ms / self.count if self.count else 0.0
+            summary = {
+                "count": self.count,
+                "mean_ms": round(mean_ms, 3),
+                "max_ms": round(self.max_ms, 3),
+                "buckets": buckets,
+            }
+        summary["p50_ms"] = self.percentile(0.5)
+        summary["p95_ms"] = self.percentile(0.95)
+        return summary
+
+
+class SubprocessRunner:
+    """Runs every command with a fresh `subprocess.run` (the original behaviour)."""
+
+    name = "subprocess"
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+
+    def run(self, command: Sequence[str], timeout: float = 10.0) -> CommandResult:
+        started = time.perf_counter()
+        try:
+            result = subprocess.run(list(command), capture_output=True, text=True, timeout=timeout)
+            return result.returncode, result.stdout, result.stderr
+        except subprocess.TimeoutExpired as error:
+            logging.error(f"Command timed out after {timeout}s: {command}")
+            return -1, "", f"Command timed out: {error}"
+        except Exception as error:
+            logging.error(f"Error running command {command}: {error}")
+            return -1, "", str(error)
+        finally:
+            self.latency.record(time.perf_counter() - started)
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, object]:
+        return {"runner": self.name, "latency": self.latency.snapshot()}
+
+
+class SpawnRunner(SubprocessRunner):
+    """Launches through CPython's posix_spawn fast path instead of fork/exec.
+
+    Popen only takes that path when the executable is an absolute path and
+    close_fds is off; our descriptors are non-inheritable (PEP 446), so
+    leaving close_fds off does not leak them into the child. Spawning avoids
+    copying the page tables of the (large, AppKit-laden) app process.
+    """
+
+    name = "spawn"
+
+    def run(self, command: Sequence[str], timeout: float = 10.0) -> CommandResult:
+        started = time.perf_counter()
+        try:
+            process = subprocess.Popen(
+                list(command),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                close_fds=False,
+            )
+            try:
+                output, error = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired as timeout_error:
+                process.kill()
+                process.communicate()
+                logging.error(f"Command timed out after {timeout}s: {command}")
+                return -1, "", f"Command timed out: {timeout_error}"
+            return process.returncode, output, error
+        except Exception as error:
+            logging.error(f"Error running command {command}: {error}")
+            return -1, "", str(error)
+        finally:
+            self.latency.record(time.perf_counter() - started)
+
+
+class WorkerPoolRunner:
+    """Pre-started worker threads draining a bounded queue of commands.
+
+    At most `max_concurrency` commands run at once; callers beyond
+    `max_queue` pending requests are rejected immediately rather than piling
+    up behind a wedged displayplacer. `queue_latency` measures time spent
+    waiting for a worker, `latency` the full call as seen by the caller.
+    """
+
+    name = "pool"
+
+    def __init__(self, launcher: Optional[SubprocessRunner] = None, max_concurrency: int = 1, max_queue: int = 8):
+        self.launcher = launcher or SpawnRunner()
+        self.max_concurrency = max(1, max_concurrency)
+        self.latency = LatencyHistogram()
+        self.queue_latency = LatencyHistogram()
+        self.rejected = 0
+        self._rejected_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(1, max_queue))
+        self._closed = False
+        self._workers: List[threading.Thread] = []
+        for index in range(self.max_concurrency):
+            worker = threading.Thread(target=self._work, name=f"displayplacer-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            command, timeout, enqueued_at, done, result_box = job
+            self.queue_latency.record(time.perf_counter() - enqueued_at)
+            try:
+                result_box.append(self.launcher.run(command, timeout))
+            except Exception as error:
+                result_box.append((-1, "", str(error)))
+            finally:
+                done.set()
+
+    def run(self, command: Sequence[str], timeout: float = 10.0) -> CommandResult:
+        started = time.perf_counter()
+        if self._closed:
+            return -1, "", "Command runner is closed"
+        done = threading.Event()
+        result_box: List[CommandResult] = []
+        try:
+            self._queue.put_nowait((list(command), timeout, started, done, result_box))
+        except queue.Full:
+            with self._rejected_lock:
+                self.rejected += 1
+            logging.warning(f"displayplacer queue full, rejecting command: {command}")
+            return -1, "", "Too many pending displayplacer commands"
+        # The launcher enforces `timeout` on the process itself, which bounds this wait
+        done.wait()
+        self.latency.record(time.perf_counter() - started)
+        return result_box[0]
+
+    def close(self) -> None:
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put(None)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "runner": self.name,
+            "max_concurrency": self.max_concurrency,
+            "rejected": self.rejected,
+            "latency": self.latency.snapshot(),
+            "queue_latency": self.queue_latency.snapshot(),
+            "launch_latency": self.launcher.latency.snapshot(),
+        }
+
+
+COMMAND_RUNNERS = {
+    SubprocessRunner.name: SubprocessRunner,
+    SpawnRunner.name: SpawnRunner,
+    WorkerPoolRunner.name: WorkerPoolRunner,
+}
+
+
+def create_command_runner(name: Optional[str] = None, **options):
+    """Build a runner by name, falling back to the worker pool for unknown names."""
+    runner_class = COMMAND_RUNNERS.get(name or WorkerPoolRunner.name)
+    if runner_class is None:
+        logging.warning(f"Unknown displayplacer runner '{name}', using '{WorkerPoolRunner.name}'")
+        runner_class = WorkerPoolRunner
+    return runner_class(**options)
@@ -0,0 +1,181 @@
+import copy
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from rotator.scheduling import Debouncer, ThreadingScheduler
+
+FileSignature = Tuple[int, int]
+
+
+class ConfigStore:
+    """In-memory view of the JSON config file with coalesced, atomic writes.
+
+    Reads are served from memory; the file is re-read only when its mtime or
+    size changes, and that check runs at most once per `check_interval`
+    seconds. Writes mark keys dirty and are flushed together `flush_delay`
+    seconds after the last change (write to a temp file in the same
+    directory, then rename over the original), so a crash mid-write never
+    leaves a torn config. Keys changed on disk by someone else survive a
+    flush unless we changed the same key.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_delay: float = 0.5,
+        check_interval: float = 1.0,
+        scheduler=None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = path
+        self.check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._data: Dict[str, object] = {}
+        self._dirty: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._signature: Optional[FileSignature] = None
+        self._last_check: Optional[float] = None
+        self._flusher = Debouncer(
+            self.flush, scheduler or ThreadingScheduler(), delay=flush_delay, max_wait=flush_delay * 4
+        )
+        self.reloads = 0
+        self.flushes = 0
+        self._load()
+
+    def _file_signature(self) -> Optional[FileSignature]:
+        try:
+            info = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        except OSError as error:
+            logging.error(f"Error checking config: {error}")
+            return self._signature
+        return info.st_mtime_ns, info.st_size
+
+    def _file_mode(self) -> Optional[int]:
+        try:
+            return stat.S_IMODE(os.stat(self.path).st_mode)
+        except FileNotFoundError:
+            return None
+
+    def _read_file(self) -> Dict[str, object]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as config_file:
+                config = json.load(config_file)
+                if isinstance(config, dict):
+                    return config
+        except FileNotFoundError:
+            pass
+        except Exception as error:
+            logging.error(f"Error reading config: {error}")
+        return {}
+
+    def _load(self) -> None:
+        self._signature = self._file_signature()
+        self._last_check = self._clock()
+        disk = self._read_file() if self._signature is not None else {}
+        # Unflushed local changes win over whatever is on disk
+        for key in self._dirty:
+            disk[key] = self._data[key]
+        for key in self._deleted:
+            disk.pop(key, None)
+        self._data = disk
+        self.reloads += 1
+
+    def _refresh_if_changed(self, force: bool = False) -> None:
+        now = self._clock()
+        if not force and self._last_check is not None and now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        if self._file_signature() != self._signature:
+            self._load()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            self._refresh_if_changed()
+            if key not in self._data:
+                return default
+            return copy.deepcopy(self._data[key])
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            self._refresh_if_changed()
+            return copy.deepcopy(self._data)
+
+    def set(self, key: str, value) -> None:
+        self.update({key: value})
+
+    def update(self, values: Dict[str, object]) -> None:
+        with self._lock:
+            changed = False
+            for key, value in values.items():
+                if key in self._data and self._data[key] == value:
+                    continue
+                self._data[key] = copy.deepcopy(value)
+                self._dirty.add(key)
+                self._deleted.discard(key)
+                changed = True
+        if changed:
+            self._flusher.trigger()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key not in self._data:
+                return
+            del self._data[key]
+            self._dirty.discard(key)
+            self._deleted.add(key)
+        self._flusher.trigger()
+
+    def replace(self, config: Dict[str, object]) -> None:
+        """Make the stored config equal to `config`, marking only the keys that differ."""
+        with self._lock:
+            for key in list(self._data):
+                if key not in config:
+                    self.delete(key)
+        self.update(config)
+
+    def is_dirty(self) -> bool:
+        with self._lock:
+            return bool(self._dirty or self._deleted)
+
+    def flush(self) -> None:
+        self._flusher.cancel()
+        with self._lock:
+            if not (self._dirty or self._deleted):
+                return
+            # Merge with external edits made since we last looked
+            self._refresh_if_changed(force=True)
+            directory = os.path.dirname(self.path) or "."
+            try:
+                descriptor, temp_path = tempfile.mkstemp(prefix=".screen_rotator_config.", dir=directory)
+                try:
+                    with os.fdopen(descriptor, "w", encoding="utf-8") as config_file:
+                        # mkstemp creates the file 0600; keep whatever mode the config already had
+                        mode = self._file_mode()
+                        if mode is not None:
+                            os.fchmod(config_file.fileno(), mode)
+                        json.dump(self._data, config_file, indent=2)
+                        config_file.flush()
+                        os.fsync(config_file.fileno())
+                    os.replace(temp_path, self.path)
+                except BaseException:
+                    os.unlink(temp_path)
+                    raise
+            except Exception as error:
+                logging.error(f"Error writing config: {error}")
+                # The pending flush was cancelled above; try again later
+                self._flusher.trigger()
+                return
+            self._dirty.clear()
+            self._deleted.clear()
+            self._signature = self._file_signature()
+            self._last_check = self._clock()
+            self.flushes += 1
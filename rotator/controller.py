@@ -0,0 +1,655 @@
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from rotator.action_queue import ACCEPTED, SUBMIT_QUEUED, ActionQueue
+from rotator.backends import DisplayBackend, create_display_backend
+from rotator.config_store import ConfigStore
+from rotator.display_state import (
+    DisplayChangeSignal,
+    DisplaySnapshot,
+    DisplaySnapshotCache,
+    parse_saved_layout_command,
+)
+from rotator.layout import (
+    build_batch_rotation_args,
+    degree_matches_target_rotation,
+    extract_display_degree_from_layout_args,
+    is_portrait_degree,
+)
+from rotator.latency_model import DisplayLatencyModel, VerifyTiming
+from rotator.profiles import DisplayProfile, ProfileStore
+from rotator.topology import REACT_FAILED, TopologyReactor
+from rotator.tracing import RotationTrace, Tracer
+from rotator.transaction import Plan, RetryPolicy, RotationTransaction
+
+ACTION_ROTATIONS = {
+    "toggle": None,
+    "rotate_90": 90,
+    "rotate_0": 0,
+    "rotate_270": 270,
+    "toggle_set": None,
+}
+# "profile:<name>" applies a saved display profile
+PROFILE_ACTION_PREFIX = "profile:"
+# Applies the profile for newly connected displays, if any (queued after display changes)
+AUTO_PROFILE_ACTION = "auto_profile"
+
+
+def action_to_rotation(action: str) -> Optional[int]:
+    return ACTION_ROTATIONS.get(action)
+
+
+def is_known_action(action: str) -> bool:
+    if action in ACTION_ROTATIONS or action == AUTO_PROFILE_ACTION:
+        return True
+    return action.startswith(PROFILE_ACTION_PREFIX) and len(action) > len(PROFILE_ACTION_PREFIX)
+
+
+def action_coalesce_key(action: str) -> str:
+    """Actions that rewrite the same displays; a waiting one is replaced by the newest.
+
+    A hot-plug check keeps its own key, so it never replaces a profile the
+    user picked while it was waiting.
+    """
+    if action == AUTO_PROFILE_ACTION:
+        return AUTO_PROFILE_ACTION
+    if action.startswith(PROFILE_ACTION_PREFIX):
+        return "profile"
+    return "display_set" if action == "toggle_set" else "target_display"
+
+
+class RotationController:
+    """Display rotation logic shared by the menu bar app and the headless CLI.
+
+    Uses only the standard library and a DisplayBackend, so scripts and
+    launchd jobs can rotate without loading AppKit, rumps or pynput. Front
+    ends call `init_rotation()` and may override the `notify`,
+    `queue_update_menu` and `_start_revert_countdown` hooks.
+    """
+
+    CONFIG_FILE = os.path.expanduser("~/.screen_rotator_config.json")
+    # rotator.logs.RingBufferHandler with the latest log lines, when the front end keeps one
+    log_buffer = None
+
+    def init_rotation(
+        self,
+        config_store: ConfigStore,
+        displayplacer_path: Optional[str],
+        display_backend: Optional[DisplayBackend] = None,
+    ) -> None:
+        self.config_store = config_store
+        self.displayplacer_path = displayplacer_path
+        self.action_lock = threading.Lock()
+        self.target_display_persistent_id: Optional[str] = None
+        # Displays rotated together by "toggle_set": persistent id -> portrait degree
+        self.display_set: Dict[str, int] = {}
+        config = config_store.snapshot()
+        self.display_backend = display_backend or create_display_backend(
+            config.get("display_backend"),
+            displayplacer_path=displayplacer_path,
+            runner_name=config.get("displayplacer_runner"),
+        )
+        self.display_cache = DisplaySnapshotCache(self._fetch_display_list)
+        self.display_change_signal = DisplayChangeSignal()
+        self.display_backend.add_change_listener(self._on_backend_change)
+        self.profiles = ProfileStore.from_config(config.get("profiles"))
+        known_topologies = config.get("profile_topologies")
+        self.topology_reactor = TopologyReactor(
+            self,
+            guard_seconds=float(config.get("auto_profile_guard_seconds", 5.0)),
+            enabled=bool(config.get("auto_apply_profiles", True)),
+            index=known_topologies if isinstance(known_topologies, dict) else None,
+            on_learn=lambda index: self.config_store.set("profile_topologies", index),
+            recheck=lambda: self.queue_action(AUTO_PROFILE_ACTION),
+        )
+        # Attempts, backoff and deadline for layout changes (see rotator.transaction)
+        self.retry_policy = RetryPolicy.from_config(config.get("rotation_retry"))
+        # How long each display takes to show a new layout; sets verification timeouts and polling
+        self.latency_model = DisplayLatencyModel.from_config(
+            config.get("display_latency"),
+            on_change=lambda estimates: self.config_store.set("display_latency", estimates),
+        )
+        # Phase timings of the last few rotations; a capacity of 0 turns tracing off
+        trace_capacity = int(config.get("rotation_trace_capacity", 20) or 0)
+        self.tracer = Tracer(
+            capacity=trace_capacity,
+            enabled=trace_capacity > 0,
+            subprocess_calls=self.display_backend.subprocess_calls,
+        )
+        # Called with event dicts ("action_started", "action_finished", ...), e.g. by the control socket
+        self.event_listeners: List[Callable[[Dict[str, object]], None]] = []
+        # Hotkeys, menu clicks and socket requests all run on one worker, newest request wins
+        self.action_queue = ActionQueue(
+            self.run_action,
+            maxsize=int(config.get("action_queue_size", 4) or 1),
+            rate=float(config.get("action_rate_per_second", 4.0) or 0.0),
+            burst=int(config.get("action_burst", 3) or 1),
+            coalesce_key=action_coalesce_key,
+        )
+
+    def load_rotation_config(self) -> None:
+        self.target_display_persistent_id = self.config_store.get("target_display_id")
+
+        saved_display_set = self.config_store.get("display_set", {})
+        if isinstance(saved_display_set, dict):
+            self.display_set = {
+                str(persistent_id): int(degree)
+                for persistent_id, degree in saved_display_set.items()
+                if degree in (90, 270)
+            }
+
+    def notify(self, title: str, subtitle: str, message: str = "") -> None:
+        logging.info(" - ".join(part for part in (title, subtitle, message) if part))
+
+    def queue_update_menu(self) -> None:
+        pass
+
+    def publish_event(self, event: Dict[str, object]) -> None:
+        for listener in list(self.event_listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logging.error(f"Error publishing {event.get('event')} event: {e}")
+
+    def is_busy(self) -> bool:
+        return self.action_lock.locked() or self.action_queue.busy()
+
+    def control_status(self) -> Dict[str, object]:
+        """Current state for the control socket, served from the snapshot cache only."""
+        snapshot = self.display_cache.peek()
+        return {
+            "target_display_id": self.target_display_persistent_id,
+            "busy": self.is_busy(),
+            "display_set": sorted(self.display_set),
+            "displays": snapshot.displays() if snapshot else None,
+            "snapshot_age": round(snapshot.age(), 3) if snapshot else None,
+            "actions": self.action_queue.stats(),
+            "auto_profile": self.topology_reactor.stats(),
+            "display_latency": self.latency_model.stats(),
+        }
+
+    def control_traces(self, count: Optional[int] = None) -> List[Dict[str, object]]:
+        """The last `count` rotation traces, oldest first."""
+        return self.tracer.recent(count)
+
+    def control_logs(self, count: Optional[int] = None) -> Optional[List[str]]:
+        """The last `count` buffered log lines, or None when no ring buffer is configured."""
+        return self.log_buffer.lines(count) if self.log_buffer else None
+
+    def control_profiles(self) -> Dict[str, object]:
+        """Saved profiles and the one matching the cached display set (None on a cold cache)."""
+        snapshot = self.display_cache.peek()
+        current = self.profiles.match(record.persistent_id for record in snapshot.records()) if snapshot else None
+        return {
+            "profiles": [
+                {"name": name, "displays": list(self.profiles.get(name).display_ids)}
+                for name in self.profiles.names()
+            ],
+            "current": current.name if current else None,
+        }
+
+    def control_displays(self) -> List[Dict[str, Union[str, bool]]]:
+        # Only a cold cache costs a displayplacer call
+        snapshot = self.display_cache.peek() or self.display_cache.get()
+        return snapshot.displays()
+
+    def execute_shortcut_action(self, action: str) -> bool:
+        """Queue a named action (hotkey, menu item or control socket) for the rotation worker."""
+        return self.queue_action(action) in ACCEPTED
+
+    def queue_action(self, action: str) -> str:
+        """Like execute_shortcut_action, but returns the queue's verdict ("unknown" for bad names)."""
+        if not is_known_action(action):
+            logging.warning(f"Unknown action: {action}")
+            return "unknown"
+        outcome = self.action_queue.submit(action)
+        if outcome in ACCEPTED:
+            logging.info(f"Executing shortcut action: {action}" + ("" if outcome == SUBMIT_QUEUED else f" ({outcome})"))
+        else:
+            logging.warning(f"Shortcut action {action} dropped: {outcome}")
+        return outcome
+
+    def run_action(self, action: str) -> bool:
+        self.publish_event({"event": "action_started", "action": action})
+        if action == "toggle":
+            succeeded = self.toggle(None)
+        elif action == "toggle_set":
+            succeeded = self.toggle_display_set()
+        elif action == AUTO_PROFILE_ACTION:
+            succeeded = self.topology_reactor.react() != REACT_FAILED
+        elif action.startswith(PROFILE_ACTION_PREFIX):
+            succeeded = self.apply_profile(action[len(PROFILE_ACTION_PREFIX):])
+        else:
+            succeeded = self.set_rotation(action_to_rotation(action))
+        self.publish_event({"event": "action_finished", "action": action, "ok": bool(succeeded)})
+        return succeeded
+
+    def _start_revert_countdown(self, transaction: RotationTransaction, previous_degree: int, target_degree: int) -> None:
+        """Hook for front ends that can ask the user to confirm a built-in display rotation.
+
+        `transaction` is applied but not committed; front ends call its
+        `await_confirmation()` and then `commit()` or `rollback()`. Without
+        a way to ask, the rotation is kept.
+        """
+        transaction.commit()
+        self.notify("Success", f"Built-in display rotated to {target_degree}°", "")
+
+    def find_displayplacer(self) -> Optional[str]:
+        displayplacer_path = shutil.which("displayplacer")
+        if displayplacer_path:
+            return displayplacer_path
+
+        for path in ("/opt/homebrew/bin/displayplacer", "/usr/local/bin/displayplacer"):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def auto_select_target(self) -> None:
+        displays = self.list_displays()
+        for display in displays:
+            if display["is_external"]:
+                self.target_display_persistent_id = display["persistent_id"]
+                return
+        if displays:
+            self.target_display_persistent_id = displays[0]["persistent_id"]
+
+    def _is_target_built_in(self) -> bool:
+        """Check if the current target display is the MacBook built-in screen."""
+        if not self.target_display_persistent_id:
+            return False
+        for display in self.list_displays():
+            if display["persistent_id"] == self.target_display_persistent_id:
+                return bool(display.get("is_built_in", False))
+        return False
+
+    def _fetch_display_list(self) -> Optional[DisplaySnapshot]:
+        display_list = self.display_backend.list_displays()
+        if display_list is None:
+            return None
+        return DisplaySnapshot.from_display_list(display_list)
+
+    def _on_backend_change(self) -> None:
+        self.display_cache.invalidate()
+        self.display_change_signal.notify()
+        self.topology_reactor.notice()
+
+    def displays_changed(self) -> None:
+        """A burst of display changes has settled: queue the profile check for the new display set."""
+        if self.topology_reactor.enabled and len(self.profiles):
+            self.queue_action(AUTO_PROFILE_ACTION)
+
+    def list_displays(self) -> List[Dict[str, Union[str, bool]]]:
+        return self.display_cache.get().displays()
+
+    def get_display_info(self, persistent_id: str, max_age: Optional[float] = None) -> Optional[Dict[str, Union[int, str]]]:
+        return self.display_cache.get(max_age).display_info(persistent_id)
+
+    def save_current_layout(self, mode_key: str) -> None:
+        self.save_layout(mode_key, self.display_cache.get().restore_command())
+
+    def save_layout(self, mode_key: str, layout_args: Optional[Sequence[str]]) -> None:
+        if not layout_args:
+            return
+
+        layouts = self.config_store.get("layouts", {})
+        if isinstance(layouts, dict):
+            layouts[mode_key] = list(layout_args)
+            self.config_store.set("layouts", layouts)
+
+    def load_saved_layout(self, mode_key: str) -> Optional[List[str]]:
+        layouts = self.config_store.get("layouts", {})
+        if not isinstance(layouts, dict):
+            return None
+        return parse_saved_layout_command(layouts.get(mode_key))
+
+    def begin_transaction(
+        self, snapshot: DisplaySnapshot, on_commit: Optional[Callable[[], None]] = None
+    ) -> RotationTransaction:
+        """A layout change that rolls back to `snapshot` if it cannot be applied."""
+        return RotationTransaction(self, snapshot, self.retry_policy, on_commit=on_commit)
+
+    def wait_for_rotation(self, target_degree: int, timeout_seconds: float = 3.0, timing: Optional[VerifyTiming] = None) -> bool:
+        persistent_id = self.target_display_persistent_id
+        if not persistent_id:
+            return False
+
+        def rotation_applied(refresh: bool) -> bool:
+            info = self.get_display_info(persistent_id, max_age=0.0 if refresh else None)
+            current_degree = int(info.get("degree", -1)) if info else None
+            return degree_matches_target_rotation(current_degree, target_degree)
+
+        # Woken by DisplayObserver notifications; backoff polling only covers missed ones
+        return (timing or VerifyTiming(timeout_seconds)).wait(rotation_applied, self.display_change_signal)
+
+    def _get_full_restore_command(self) -> Optional[List[str]]:
+        """Capture the current full displayplacer restore command."""
+        return self.display_cache.get().restore_command()
+
+    def set_rotation(self, target_degree: int) -> bool:
+        with self.tracer.rotation("set_rotation", target_degree=target_degree) as trace:
+            succeeded = self._set_rotation(target_degree)
+            trace.set(outcome="ok" if succeeded else "failed")
+        if isinstance(trace, RotationTrace):
+            logging.info(f"Rotation trace: {trace.summary()}")
+        return succeeded
+
+    def _finish_rotation(
+        self,
+        transaction: RotationTransaction,
+        needs_confirmation: bool,
+        current_rotation: int,
+        target_degree: int,
+        message: str,
+    ) -> None:
+        if not needs_confirmation:
+            transaction.commit()
+        with self.tracer.span("notify"):
+            if needs_confirmation:
+                self._start_revert_countdown(transaction, current_rotation, target_degree)
+            else:
+                self.notify("Success", message, "")
+
+    def _set_rotation(self, target_degree: int) -> bool:
+        if not self.action_lock.acquire(blocking=False):
+            logging.info("Rotation action already in progress, ignoring duplicate request.")
+            return False
+
+        cache_stats = self.display_cache.stats()
+        try:
+            logging.info(f"Initiating rotation to {target_degree}°")
+            if target_degree not in (0, 90, 270):
+                self.notify("Invalid Rotation", str(target_degree), "")
+                return False
+
+            with self.tracer.span("snapshot"):
+                if not self.target_display_persistent_id:
+                    self.auto_select_target()
+                    if not self.target_display_persistent_id:
+                        self.notify("Error", "No external display found", "")
+                        return False
+                    self.queue_update_menu()
+
+                display_info = self.get_display_info(self.target_display_persistent_id)
+                if not display_info:
+                    self.auto_select_target()
+                    if self.target_display_persistent_id:
+                        display_info = self.get_display_info(self.target_display_persistent_id)
+                        self.queue_update_menu()
+                    if not display_info:
+                        self.notify("Error", "Selected display not found", "")
+                        return False
+                snapshot = self.display_cache.get()
+
+            current_rotation = int(display_info.get("degree", 0))
+            if current_rotation == target_degree:
+                logging.info(f"Display is already at target degree {target_degree}")
+                return True
+
+            # A built-in display turned away from 0° is only kept once the user confirms it
+            with self.tracer.span("built_in_check"):
+                needs_confirmation = target_degree != 0 and self._is_target_built_in()
+
+            current_mode = "portrait" if current_rotation in (90, 270) else "landscape"
+            target_mode = "portrait" if target_degree in (90, 270) else "landscape"
+
+            plans: List[Plan] = []
+            with self.tracer.span("layout_load"):
+                saved_layout = self.load_saved_layout(target_mode)
+            if saved_layout:
+                saved_target_degree = extract_display_degree_from_layout_args(
+                    saved_layout,
+                    self.target_display_persistent_id,
+                )
+                if degree_matches_target_rotation(saved_target_degree, target_degree):
+                    plans.append(("saved_layout_apply", saved_layout))
+                else:
+                    logging.info(f"Ignoring stale saved layout '{target_mode}'")
+
+            current_resolution = display_info.get("res")
+            if current_resolution:
+                current_resolution = str(current_resolution)
+                current_is_portrait = current_rotation in (90, 270)
+                target_is_portrait = target_degree in (90, 270)
+                target_resolution = current_resolution
+
+                if current_is_portrait != target_is_portrait and "x" in current_resolution:
+                    width, height = current_resolution.split("x", 1)
+                    target_resolution = f"{height}x{width}"
+
+                current_origin = display_info.get("origin", "(0,0)")
+
+                command_arg = (
+                    f"id:{self.target_display_persistent_id} "
+                    f"res:{target_resolution} origin:{current_origin} degree:{target_degree}"
+                )
+                plans.append(("apply", [command_arg]))
+            elif not plans:
+                self.notify("Error", "Could not determine display resolution", "")
+                return False
+
+            def persist_layouts() -> None:
+                # Only a kept rotation updates the saved layouts of both modes
+                self.save_layout(current_mode, transaction.pre_state)
+                self.save_current_layout(target_mode)
+
+            transaction = self.begin_transaction(snapshot, on_commit=persist_layouts)
+            def verify(timing: VerifyTiming) -> bool:
+                return self.wait_for_rotation(target_degree, timing=timing)
+
+            if transaction.execute(plans, verify, [self.target_display_persistent_id]):
+                if transaction.applied_phase == "saved_layout_apply":
+                    message = f"Restored {target_mode} layout"
+                else:
+                    message = f"Target rotated to {target_degree}°"
+                self._finish_rotation(transaction, needs_confirmation, current_rotation, target_degree, message)
+                return True
+
+            with self.tracer.span("notify"):
+                error = transaction.error
+                self.notify("Failed", "Rotation failed after retries", error[:180] if error else "")
+            return False
+        except Exception as e:
+            logging.error(f"Critical error during rotation: {e}")
+            self.notify("Error", "Critical rotation failure", str(e)[:180])
+            return False
+        finally:
+            self.action_lock.release()
+            final_stats = self.display_cache.stats()
+            logging.info(
+                "Display snapshot cache for rotation: "
+                f"{final_stats['hits'] - cache_stats['hits']} hits, "
+                f"{final_stats['misses'] - cache_stats['misses']} misses; "
+                f"{self.display_backend.name} backend: {self.display_backend.timing_summary()}"
+            )
+
+    def toggle(self, _) -> bool:
+        display_info = self.get_display_info(self.target_display_persistent_id) if self.target_display_persistent_id else None
+        if not display_info:
+            self.auto_select_target()
+            if self.target_display_persistent_id:
+                display_info = self.get_display_info(self.target_display_persistent_id)
+
+        if not display_info:
+            self.notify("Error", "Target display not found", "")
+            return False
+
+        target = 0 if int(display_info.get("degree", 0)) in (90, 270) else 90
+        return self.set_rotation(target)
+
+    def rotate_displays(self, targets: Dict[str, int]) -> bool:
+        """Rotate several displays to per-display degrees with a single displayplacer call."""
+        with self.tracer.rotation("rotate_displays", targets=dict(targets)) as trace:
+            succeeded = self._rotate_displays(targets)
+            trace.set(outcome="ok" if succeeded else "failed")
+        if isinstance(trace, RotationTrace):
+            logging.info(f"Rotation trace: {trace.summary()}")
+        return succeeded
+
+    def _rotate_displays(self, targets: Dict[str, int]) -> bool:
+        if not self.action_lock.acquire(blocking=False):
+            logging.info("Rotation action already in progress, ignoring duplicate request.")
+            return False
+
+        try:
+            logging.info(f"Initiating batch rotation: {targets}")
+            if any(degree not in (0, 90, 270) for degree in targets.values()):
+                self.notify("Invalid Rotation", str(sorted(set(targets.values()))), "")
+                return False
+
+            with self.tracer.span("snapshot"):
+                snapshot = self.display_cache.get()
+            pending = {
+                persistent_id: degree
+                for persistent_id, degree in targets.items()
+                if snapshot.record(persistent_id) is None or snapshot.record(persistent_id).rotation != degree
+            }
+            if not pending:
+                logging.info("All displays are already at their target degrees")
+                return True
+
+            layout_args = build_batch_rotation_args(snapshot, pending)
+            if not layout_args:
+                self.notify("Error", "Display set not connected", "")
+                return False
+
+            built_in_targets = [
+                (snapshot.record(persistent_id), degree)
+                for persistent_id, degree in pending.items()
+                if snapshot.record(persistent_id).is_built_in and degree != 0
+            ]
+
+            def all_applied(refresh: bool) -> bool:
+                current = self.display_cache.get(0.0 if refresh else None)
+                for persistent_id, degree in pending.items():
+                    record = current.record(persistent_id)
+                    if not record or not degree_matches_target_rotation(record.rotation, degree):
+                        return False
+                return True
+
+            def verify(timing: VerifyTiming) -> bool:
+                return timing.wait(all_applied, self.display_change_signal)
+
+            transaction = self.begin_transaction(snapshot)
+            if transaction.execute([("apply", layout_args)], verify, list(pending)):
+                with self.tracer.span("notify"):
+                    if built_in_targets:
+                        record, degree = built_in_targets[0]
+                        self._start_revert_countdown(transaction, record.rotation or 0, degree)
+                    else:
+                        transaction.commit()
+                        self.notify("Success", f"Rotated {len(pending)} displays", "")
+                return True
+
+            error = transaction.error
+            self.notify("Failed", "Batch rotation failed after retries", error[:180] if error else "")
+            return False
+        except Exception as e:
+            logging.error(f"Critical error during batch rotation: {e}")
+            self.notify("Error", "Critical rotation failure", str(e)[:180])
+            return False
+        finally:
+            self.action_lock.release()
+
+    def toggle_display_set(self) -> bool:
+        """Flip every display in the set: all portrait goes back to 0°, anything else goes portrait."""
+        snapshot = self.display_cache.get()
+        members = {
+            persistent_id: degree
+            for persistent_id, degree in self.display_set.items()
+            if snapshot.record(persistent_id) is not None
+        }
+        if not members:
+            self.notify("Error", "No connected displays in the display set", "")
+            return False
+
+        all_portrait = all(is_portrait_degree(snapshot.record(persistent_id).rotation) for persistent_id in members)
+        if all_portrait:
+            targets = {persistent_id: 0 for persistent_id in members}
+        else:
+            targets = dict(members)
+        return self.rotate_displays(targets)
+
+    def save_profile(self, name: str) -> Optional[DisplayProfile]:
+        """Store the current arrangement of all connected displays as profile `name`."""
+        restore_command = self.display_cache.get().restore_command()
+        profile = DisplayProfile.from_layout(name, restore_command or [])
+        if profile is None:
+            self.notify("Error", "Could not save profile", "Display layout unavailable or incomplete")
+            return None
+        self.profiles.add(profile)
+        self.config_store.set("profiles", self.profiles.to_config())
+        self.notify("Profile Saved", name, f"{len(profile.display_ids)} displays")
+        return profile
+
+    def delete_profile(self, name: str) -> bool:
+        if not self.profiles.remove(name):
+            return False
+        self.config_store.set("profiles", self.profiles.to_config())
+        return True
+
+    def profile_for_connected_displays(self) -> Optional[DisplayProfile]:
+        snapshot = self.display_cache.get()
+        return self.profiles.match(record.persistent_id for record in snapshot.records())
+
+    def apply_profile(self, name: str) -> bool:
+        """Apply a saved profile as one transaction: its stored arguments run as-is, retried or rolled back like a rotation."""
+        with self.tracer.rotation("apply_profile", profile=name) as trace:
+            succeeded = self._apply_profile(name)
+            trace.set(outcome="ok" if succeeded else "failed")
+        if isinstance(trace, RotationTrace):
+            logging.info(f"Rotation trace: {trace.summary()}")
+        return succeeded
+
+    def _apply_profile(self, name: str) -> bool:
+        profile = self.profiles.get(name)
+        if profile is None:
+            self.notify("Error", "Unknown profile", name)
+            return False
+        if not self.action_lock.acquire(blocking=False):
+            logging.info("Rotation action already in progress, ignoring duplicate request.")
+            return False
+
+        try:
+            logging.info(f"Applying profile '{name}' to {len(profile.display_ids)} displays")
+            degrees = profile.degrees()
+
+            def profile_applied(refresh: bool) -> bool:
+                current = self.display_cache.get(0.0 if refresh else None)
+                for persistent_id, degree in degrees.items():
+                    record = current.record(persistent_id)
+                    if record is None or record.rotation != degree:
+                        return False
+                return True
+
+            with self.tracer.span("snapshot"):
+                snapshot = self.display_cache.get()
+            transaction = self.begin_transaction(snapshot)
+
+            def verify(timing: VerifyTiming) -> bool:
+                return timing.wait(profile_applied, self.display_change_signal)
+
+            if not transaction.execute([("apply", list(profile.layout))], verify, list(degrees)):
+                error = transaction.error
+                self.notify("Failed", f"Could not apply profile {name}", error[:180] if error else "")
+                return False
+            transaction.commit()
+            with self.tracer.span("notify"):
+                self.notify("Profile Applied", name, "")
+            return True
+        except Exception as e:
+            logging.error(f"Critical error applying profile {name}: {e}")
+            self.notify("Error", "Critical rotation failure", str(e)[:180])
+            return False
+        finally:
+            self.action_lock.release()
+
+    def apply_layout(self, layout_args: Sequence[str]):
+        """Apply displayplacer-style layout arguments through the configured backend."""
+        return_code, output, error = self.display_backend.apply_layout(layout_args)
+        if return_code == 0:
+            self.display_cache.invalidate()
+        return return_code, output, error
@@ -0,0 +1,106 @@
+"""A confirmation countdown with exactly one outcome.
+
+The built-in display safety revert waits for the user to keep a rotation
+and reverts it otherwise. Confirming, cancelling ("Revert Now") and the
+timeout can arrive at the same moment from a notification button, a menu
+click and a timer thread. ConfirmationCountdown lets the first of them win
+under a lock, and the others become no-ops. The timer and the per-second
+ticks that refresh the remaining time in the menu run on an injected
+scheduler, so tests drive the whole thing with ManualScheduler.
+"""
+import math
+import threading
+from typing import Callable, Optional
+
+from rotator.scheduling import ScheduledCall
+
+COUNTDOWN_IDLE = "idle"
+COUNTDOWN_RUNNING = "running"
+COUNTDOWN_CONFIRMED = "confirmed"
+COUNTDOWN_CANCELLED = "cancelled"
+COUNTDOWN_EXPIRED = "expired"
+
+
+class ConfirmationCountdown:
+    """IDLE -> RUNNING -> CONFIRMED | CANCELLED | EXPIRED, each transition at most once.
+
+    `on_expire()` runs when the countdown runs out. `on_tick(seconds)` runs
+    with the whole seconds left every `tick` seconds while it is running.
+    Both are called outside the lock, by whichever thread made the
+    transition.
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        duration: float,
+        on_expire: Callable[[], None],
+        on_tick: Optional[Callable[[int], None]] = None,
+        tick: float = 1.0,
+    ):
+        self._scheduler = scheduler
+        self.duration = duration
+        self._on_expire = on_expire
+        self._on_tick = on_tick
+        self.tick = tick
+        self._lock = threading.Lock()
+        self._expiry: Optional[ScheduledCall] = None
+        self._next: Optional[ScheduledCall] = None
+        self._ends_at = 0.0
+        self.state = COUNTDOWN_IDLE
+
+    @property
+    def running(self) -> bool:
+        with self._lock:
+            return self.state == COUNTDOWN_RUNNING
+
+    def remaining(self) -> float:
+        with self._lock:
+            if self.state != COUNTDOWN_RUNNING:
+                return 0.0
+            return max(0.0, self._ends_at - self._scheduler.now())
+
+    def start(self) -> bool:
+        with self._lock:
+            if self.state != COUNTDOWN_IDLE:
+                return False
+            self.state = COUNTDOWN_RUNNING
+            self._ends_at = self._scheduler.now() + self.duration
+            self._expiry = self._scheduler.call_later(self.duration, self._expire)
+            if self._on_tick:
+                self._next = self._scheduler.call_later(min(self.tick, self.duration), self._next_tick)
+        return True
+
+    def confirm(self) -> bool:
+        """Keep the change; False if the countdown already ended or never started."""
+        return self._finish(COUNTDOWN_CONFIRMED)
+
+    def cancel(self) -> bool:
+        """End the countdown without waiting for the timeout; the caller reverts."""
+        return self._finish(COUNTDOWN_CANCELLED)
+
+    def _finish(self, state: str) -> bool:
+        with self._lock:
+            if self.state != COUNTDOWN_RUNNING:
+                return False
+            self.state = state
+            calls = (self._expiry, self._next)
+            self._expiry = self._next = None
+        for call in calls:
+            if call:
+                call.cancel()
+        return True
+
+    def _expire(self) -> None:
+        if self._finish(COUNTDOWN_EXPIRED):
+            self._on_expire()
+
+    def _next_tick(self) -> None:
+        with self._lock:
+            if self.state != COUNTDOWN_RUNNING:
+                return
+            remaining = self._ends_at - self._scheduler.now()
+            if remaining <= 0:
+                return
+            self._next = self._scheduler.call_later(min(self.tick, remaining), self._next_tick)
+        self._on_tick(math.ceil(remaining - 1e-9))
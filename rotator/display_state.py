@@ -0,0 +1,417 @@
+import os
+import re
+import shlex
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+
+def parse_saved_layout_command(command: Union[str, Sequence[str], None]) -> Optional[List[str]]:
+    if command is None:
+        return None
+
+    if isinstance(command, (list, tuple)):
+        parsed = [str(token).strip() for token in command if str(token).strip()]
+        return parsed or None
+
+    if not isinstance(command, str):
+        return None
+
+    tokens = shlex.split(command)
+    if not tokens:
+        return None
+
+    if os.path.basename(tokens[0]) == "displayplacer":
+        tokens = tokens[1:]
+
+    parsed = [token.strip() for token in tokens if token.strip()]
+    return parsed or None
+
+
+_ID_VALUE_PATTERN = re.compile(r"[A-Fa-f0-9-]+")
+_RESOLUTION_VALUE_PATTERN = re.compile(r"\d+x\d+")
+_ORIGIN_VALUE_PATTERN = re.compile(r"\(\s*(-?\d+)\s*,\s*(-?\d+)\s*\)")
+_INTEGER_VALUE_PATTERN = re.compile(r"\d+")
+_QUOTED_ARGUMENT_PATTERN = re.compile(r'"([^"\\]*)"')
+
+SCREEN_ID_FIELD = "Persistent screen id"
+# `displayplacer list` field name -> DisplayRecord attribute
+_LIST_FIELDS = {
+    "Type": "type",
+    "Resolution": "resolution",
+    "Hertz": "hertz",
+    "Color Depth": "color_depth",
+    "Scaling": "scaling",
+    "Origin": "origin",
+    "Rotation": "rotation",
+}
+# One scan over the whole output: known field lines plus the trailing restore command
+_LIST_LINE_PATTERN = re.compile(
+    r"^(?:(%s):[ \t]*([^\r\n]*)|(displayplacer [^\r\n]*))"
+    % "|".join(re.escape(field) for field in (SCREEN_ID_FIELD, *_LIST_FIELDS)),
+    re.MULTILINE,
+)
+
+
+@dataclass(frozen=True)
+class DisplayRecord:
+    persistent_id: str
+    name: str
+    type: Optional[str] = None
+    resolution: Optional[str] = None
+    origin: Optional[Tuple[int, int]] = None
+    rotation: Optional[int] = None
+    hertz: Optional[str] = None
+    color_depth: Optional[str] = None
+    scaling: Optional[str] = None
+    is_built_in: bool = False
+    is_external: bool = False
+    is_main: bool = False
+
+    def as_display_dict(self) -> Dict[str, Union[str, bool]]:
+        """Shape returned by `list_displays`."""
+        return {
+            "persistent_id": self.persistent_id,
+            "name": self.name,
+            "is_external": self.is_external,
+            "is_built_in": self.is_built_in,
+            "degree": "?" if self.rotation is None else str(self.rotation),
+        }
+
+    def as_info_dict(self) -> Dict[str, Union[int, str]]:
+        """Shape returned by `get_display_info`."""
+        info: Dict[str, Union[int, str]] = {}
+        if self.resolution:
+            info["res"] = self.resolution
+        if self.origin is not None:
+            info["origin"] = f"({self.origin[0]},{self.origin[1]})"
+        if self.rotation is not None:
+            info["degree"] = self.rotation
+        for key in ("hertz", "color_depth", "scaling"):
+            value = getattr(self, key)
+            if value is not None:
+                info[key] = value
+        return info
+
+
+@dataclass(frozen=True)
+class DisplayList:
+    displays: Tuple[DisplayRecord, ...]
+    restore_command: Optional[Tuple[str, ...]] = None
+
+    def by_id(self) -> Dict[str, DisplayRecord]:
+        return {record.persistent_id: record for record in self.displays}
+
+
+def _build_display_record(index: int, fields: Dict[str, str]) -> Optional[DisplayRecord]:
+    id_match = _ID_VALUE_PATTERN.match(fields.get(SCREEN_ID_FIELD, ""))
+    if not id_match:
+        return None
+
+    display_type = fields.get("type")
+    lower_type = (display_type or "").lower()
+    is_built_in = "built in" in lower_type or "built-in" in lower_type
+
+    resolution = None
+    resolution_match = _RESOLUTION_VALUE_PATTERN.match(fields.get("resolution", ""))
+    if resolution_match:
+        resolution = resolution_match.group(0)
+
+    origin = None
+    is_main = False
+    origin_value = fields.get("origin")
+    if origin_value is not None:
+        origin_match = _ORIGIN_VALUE_PATTERN.match(origin_value)
+        if origin_match:
+            origin = (int(origin_match.group(1)), int(origin_match.group(2)))
+        is_main = "main display" in origin_value
+
+    rotation = None
+    rotation_match = _INTEGER_VALUE_PATTERN.match(fields.get("rotation", ""))
+    if rotation_match:
+        rotation = int(rotation_match.group(0))
+
+    return DisplayRecord(
+        persistent_id=id_match.group(0),
+        name=display_type or f"Display {index}",
+        type=display_type,
+        resolution=resolution,
+        origin=origin,
+        rotation=rotation,
+        hertz=fields.get("hertz"),
+        color_depth=fields.get("color_depth"),
+        scaling=fields.get("scaling"),
+        is_built_in=is_built_in,
+        is_external="external" in lower_type and not is_built_in,
+        is_main=is_main,
+    )
+
+
+def _parse_restore_line(line: str) -> Optional[List[str]]:
+    # displayplacer prints every argument double-quoted without escapes; skip shlex for that shape
+    line = line.rstrip()
+    arguments = _QUOTED_ARGUMENT_PATTERN.findall(line)
+    if arguments and _QUOTED_ARGUMENT_PATTERN.sub("", line[len("displayplacer"):]).strip() == "":
+        return [argument.strip() for argument in arguments if argument.strip()] or None
+    return parse_saved_layout_command(line)
+
+
+def parse_displayplacer_list(output: str) -> DisplayList:
+    """Parse `displayplacer list` output in a single pass over its lines."""
+    records: List[DisplayRecord] = []
+    fields: Optional[Dict[str, str]] = None
+    restore_line: Optional[str] = None
+
+    for match in _LIST_LINE_PATTERN.finditer(output or ""):
+        key, value, command = match.groups()
+        if command is not None:
+            restore_line = command
+        elif key == SCREEN_ID_FIELD:
+            if fields is not None:
+                record = _build_display_record(len(records) + 1, fields)
+                if record:
+                    records.append(record)
+            fields = {SCREEN_ID_FIELD: value.rstrip()}
+        elif fields is not None:
+            fields.setdefault(_LIST_FIELDS[key], value.rstrip())
+
+    if fields is not None:
+        record = _build_display_record(len(records) + 1, fields)
+        if record:
+            records.append(record)
+
+    restore_command = _parse_restore_line(restore_line) if restore_line else None
+    return DisplayList(
+        displays=tuple(records),
+        restore_command=tuple(restore_command) if restore_command else None,
+    )
+
+
+def format_displayplacer_list(display_list: DisplayList) -> str:
+    """Render displays the way `displayplacer list` prints them, minus the mode tables."""
+    blocks = []
+    for index, record in enumerate(display_list.displays, 1):
+        lines = [f"{SCREEN_ID_FIELD}: {record.persistent_id}", f"Contextual screen id: {index}"]
+        if record.type:
+            lines.append(f"Type: {record.type}")
+        for label, value in (
+            ("Resolution", record.resolution),
+            ("Hertz", record.hertz),
+            ("Color Depth", record.color_depth),
+            ("Scaling", record.scaling),
+        ):
+            if value:
+                lines.append(f"{label}: {value}")
+        if record.origin is not None:
+            main_suffix = " - main display" if record.is_main else ""
+            lines.append(f"Origin: ({record.origin[0]},{record.origin[1]}){main_suffix}")
+        if record.rotation is not None:
+            lines.append(f"Rotation: {record.rotation}")
+        lines.append("Enabled: true")
+        blocks.append("\n".join(lines))
+
+    output = "\n\n".join(blocks)
+    if display_list.restore_command:
+        arguments = " ".join(f'"{argument}"' for argument in display_list.restore_command)
+        output += (
+            "\n\nExecute the command below to set your screens to the current arrangement.\n\n"
+            f"displayplacer {arguments}"
+        )
+    return output + "\n"
+
+
+class DisplaySnapshot:
+    """Parsed view of one `displayplacer list` run, shared by every reader until invalidated."""
+
+    def __init__(self, output: str, captured_at: Optional[float] = None):
+        self.output = output or ""
+        self.captured_at = time.monotonic() if captured_at is None else captured_at
+        self._parsed: Optional[DisplayList] = None
+        self._records_by_id: Optional[Dict[str, DisplayRecord]] = None
+
+    @classmethod
+    def from_display_list(cls, display_list: DisplayList, captured_at: Optional[float] = None) -> "DisplaySnapshot":
+        """Snapshot of state read without `displayplacer list` (in-process or simulated backends)."""
+        snapshot = cls("", captured_at)
+        snapshot._parsed = display_list
+        snapshot._records_by_id = display_list.by_id()
+        return snapshot
+
+    def age(self) -> float:
+        return time.monotonic() - self.captured_at
+
+    def parsed(self) -> DisplayList:
+        if self._parsed is None:
+            self._parsed = parse_displayplacer_list(self.output)
+            self._records_by_id = self._parsed.by_id()
+        return self._parsed
+
+    def records(self) -> Tuple[DisplayRecord, ...]:
+        return self.parsed().displays
+
+    def record(self, persistent_id: str) -> Optional[DisplayRecord]:
+        self.parsed()
+        return self._records_by_id.get(persistent_id)
+
+    def displays(self) -> List[Dict[str, Union[str, bool]]]:
+        return [record.as_display_dict() for record in self.records()]
+
+    def display_info(self, persistent_id: str) -> Optional[Dict[str, Union[int, str]]]:
+        record = self.record(persistent_id)
+        return record.as_info_dict() if record else None
+
+    def restore_command(self) -> Optional[List[str]]:
+        """Trailing `displayplacer "id:..."` line that recreates the captured arrangement."""
+        restore_command = self.parsed().restore_command
+        return list(restore_command) if restore_command else None
+
+
+class DisplaySnapshotCache:
+    """Holds the latest DisplaySnapshot so one `displayplacer list` serves every reader.
+
+    `fetch` returns the raw list output or a ready DisplaySnapshot, or None when
+    the read failed; failed fetches are never cached. Call `invalidate` whenever the display state may have
+    changed (screen-parameter notifications, successful layout mutations).
+
+    Only one fetch runs at a time. Callers that miss while it runs wait for
+    it and share its result when that is fresh enough for them; a caller
+    asking for max_age=0 only shares a fetch that started after its call.
+    """
+
+    def __init__(self, fetch: Callable[[], Union[str, DisplaySnapshot, None]]):
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._snapshot: Optional[DisplaySnapshot] = None
+        # When the fetch behind the cached snapshot started
+        self._fetch_started = 0.0
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.invalidations = 0
+
+    def _usable(self, max_age: Optional[float], requested_at: Optional[float] = None) -> Optional[DisplaySnapshot]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+        if max_age is None or snapshot.age() <= max_age:
+            return snapshot
+        if requested_at is not None and self._fetch_started >= requested_at:
+            return snapshot
+        return None
+
+    def get(self, max_age: Optional[float] = None) -> DisplaySnapshot:
+        requested_at = time.monotonic()
+        with self._lock:
+            snapshot = self._usable(max_age)
+            if snapshot is not None:
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+
+        with self._fetch_lock:
+            with self._lock:
+                # Another caller's fetch may have finished while this one waited for the lock
+                snapshot = self._usable(max_age, requested_at)
+                if snapshot is not None:
+                    self.shared += 1
+                    return snapshot
+                generation = self._generation
+            started = time.monotonic()
+            output = self._fetch()
+            if output is None:
+                return DisplaySnapshot("")
+            snapshot = output if isinstance(output, DisplaySnapshot) else DisplaySnapshot(output)
+
+            with self._lock:
+                # Drop the result if the state was invalidated while we were fetching it
+                if generation == self._generation:
+                    self._snapshot = snapshot
+                    self._fetch_started = started
+        return snapshot
+
+    def peek(self) -> Optional[DisplaySnapshot]:
+        """The cached snapshot, if any, without ever running displayplacer."""
+        with self._lock:
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared": self.shared,
+                "invalidations": self.invalidations,
+            }
+
+
+class DisplayChangeSignal:
+    """Generation counter bumped by every screen-parameter change notification."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        with self._condition:
+            return self._generation
+
+    def notify(self) -> None:
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def wait_for_change(self, since_generation: int, timeout: float) -> bool:
+        """Block until the generation moves past `since_generation`; False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._generation != since_generation, timeout)
+
+
+def wait_for_display_state(
+    check: Callable[[bool], bool],
+    signal: DisplayChangeSignal,
+    timeout: float,
+    initial_interval: float = 0.1,
+    max_interval: float = 1.0,
+    backoff: float = 2.0,
+    clock: Callable[[], float] = time.monotonic,
+    initial_delay: float = 0.0,
+    since_generation: Optional[int] = None,
+) -> bool:
+    """Wait until `check` passes, re-checking on change notifications.
+
+    `check(refresh)` is called with refresh=False after a notification (the
+    observer has already invalidated cached state) and refresh=True when the
+    exponential-backoff poll fires without one, so a missed notification
+    still converges. With `initial_delay` the first check waits that long
+    for a notification, for changes known to take a while to show; pass the
+    signal generation read before making the change as `since_generation`
+    so a notification that already arrived is not waited for again.
+    """
+    deadline = clock() + timeout
+    interval = initial_interval
+    refresh = False
+    if initial_delay > 0:
+        generation = signal.generation if since_generation is None else since_generation
+        refresh = not signal.wait_for_change(generation, min(initial_delay, timeout))
+    while True:
+        generation = signal.generation
+        if check(refresh):
+            return True
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return False
+        if signal.wait_for_change(generation, min(interval, remaining)):
+            refresh = False
+        else:
+            refresh = True
+            interval = min(interval * backoff, max_interval)
@@ -0,0 +1,249 @@
+"""Global shortcut matching with constant work per key event.
+
+The keyboard listener reports every keystroke on the system, so the
+per-event path must not grow with the number of shortcuts. HotkeyMatcher
+gives each key that appears in any shortcut one bit, keeps the held keys as
+an integer mask and looks the mask up in a dict of compiled combos. Keys are
+any hashable value; the app matches stored key names ("ctrl", "r").
+
+HotkeyRegistry owns the one keyboard listener the app runs and routes its
+events to the current matcher, or to a shortcut recording in progress.
+"""
+import logging
+import threading
+from typing import Callable, Dict, Hashable, Iterable, List, Mapping, Optional
+
+from rotator.shortcuts import is_modifier_key_name, order_shortcut_keys
+
+
+def key_identity(key: object, key_name: str) -> Hashable:
+    """The physical key behind a listener event: its virtual keycode, else its name."""
+    vk = getattr(key, "vk", None)
+    return key_name if vk is None else vk
+
+
+class HotkeyMatcher:
+    """Fires an action when the set of held keys becomes exactly a registered combo.
+
+    `press()` returns the action for the press that completes a combo, once;
+    auto-repeat presses of a held key are ignored, so holding a shortcut
+    does not fire it again. Keys that are in no combo are ignored, as
+    pynput's HotKey does: Caps Lock reads as held for as long as it is on,
+    and a lost release would otherwise block every shortcut. Among combo
+    keys the match is exact, so ctrl+alt+shift+r does not also fire
+    ctrl+alt+r when both are registered.
+
+    `identity` names the physical key (pynput's virtual keycode) when the
+    name can change between press and release: "1" pressed and then
+    released with shift held arrives as "!". Releases are matched to presses
+    by identity, so such a key does not stay held forever. It defaults to
+    the key itself.
+    """
+
+    def __init__(self, shortcuts: Optional[Mapping[str, Iterable[Hashable]]] = None):
+        self._bits: Dict[Hashable, int] = {}
+        self._actions: Dict[int, str] = {}
+        for action, keys in (shortcuts or {}).items():
+            mask = 0
+            for key in keys:
+                mask |= self._bits.setdefault(key, 1 << len(self._bits))
+            if mask:
+                self._actions[mask] = action
+        self._mask = 0
+        # Combo keys currently held, by physical key
+        self._held: Dict[Hashable, int] = {}
+        self.events = 0
+        self.matches = 0
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def press(self, key: Hashable, identity: Optional[Hashable] = None) -> Optional[str]:
+        self.events += 1
+        if identity is None:
+            identity = key
+        bit = self._bits.get(key)
+        if bit is None or self._mask & bit:
+            return None
+        self._mask |= bit
+        self._held[identity] = bit
+        action = self._actions.get(self._mask)
+        if action is not None:
+            self.matches += 1
+        return action
+
+    def release(self, key: Hashable, identity: Optional[Hashable] = None) -> None:
+        self.events += 1
+        if identity is None:
+            identity = key
+        bit = self._held.pop(identity, None) or self._bits.get(key)
+        if bit is not None:
+            self._mask &= ~bit
+
+    def reset(self) -> None:
+        """Forget held keys, e.g. after the event tap was disabled and releases were lost."""
+        self._mask = 0
+        self._held.clear()
+
+
+class _Recording:
+    __slots__ = ("action", "on_finished", "keys", "has_non_modifier")
+
+    def __init__(self, action: str, on_finished: Callable[[str, Optional[List[str]]], None]):
+        self.action = action
+        self.on_finished = on_finished
+        self.keys: List[str] = []
+        self.has_non_modifier = False
+
+    def add(self, key_name: str) -> None:
+        if key_name not in self.keys:
+            self.keys.append(key_name)
+            if not is_modifier_key_name(key_name):
+                self.has_non_modifier = True
+
+
+class HotkeyRegistry:
+    """One long-lived key listener shared by the global shortcuts and shortcut recording.
+
+    `start_listener(on_press, on_release)` returns a started listener with
+    `is_alive()` and `stop()` (a pynput keyboard.Listener in the app). It is
+    called the first time there is something to listen for, and again only
+    if that listener has died. `update()` compiles a new matcher and swaps it
+    in by rebinding one attribute, so the event thread sees the old table or
+    the new one, never a half-built one. While a recording is in progress,
+    key events feed the recording instead of the matcher.
+
+    `normalize(key)` turns listener keys into stored key names, so what is
+    recorded is exactly what is matched.
+    """
+
+    def __init__(
+        self,
+        start_listener: Callable[[Callable, Callable], object],
+        normalize: Callable[[object], Optional[str]],
+        on_action: Callable[[str], None],
+    ):
+        self._start_listener = start_listener
+        self._normalize = normalize
+        self._on_action = on_action
+        self._matcher = HotkeyMatcher()
+        self._recording: Optional[_Recording] = None
+        self._listener = None
+        self._lock = threading.Lock()
+        self.listener_starts = 0
+        self.events = 0
+        self.dispatched = 0
+        self.swaps = 0
+        self.recordings = 0
+
+    @property
+    def recording_action(self) -> Optional[str]:
+        recording = self._recording
+        return recording.action if recording else None
+
+    def update(self, shortcuts: Mapping[str, Iterable[str]]) -> None:
+        """Replace the dispatch table; starts the listener if there is a shortcut to listen for."""
+        matcher = HotkeyMatcher(shortcuts)
+        self._matcher = matcher
+        self.swaps += 1
+        if len(matcher):
+            self.ensure_listener()
+
+    def ensure_listener(self) -> bool:
+        with self._lock:
+            listener = self._listener
+            if listener is not None and listener.is_alive():
+                return True
+            try:
+                self._listener = self._start_listener(self._on_press, self._on_release)
+            except Exception as e:
+                self._listener = None
+                logging.error(f"Failed to start key listener: {e}")
+                return False
+            self.listener_starts += 1
+            # Releases that happened while no listener was running are lost
+            self._matcher.reset()
+            return True
+
+    def start_recording(self, action: str, on_finished: Callable[[str, Optional[List[str]]], None]) -> bool:
+        """Capture the next shortcut for `action`.
+
+        `on_finished(action, keys)` runs on the listener thread once a combo
+        with a non-modifier key is released; keys is None when Esc cancels.
+        Returns False if a recording is already running or no listener could
+        be started.
+        """
+        with self._lock:
+            if self._recording is not None:
+                return False
+            self._recording = _Recording(action, on_finished)
+        if not self.ensure_listener():
+            self._recording = None
+            return False
+        return True
+
+    def _finish_recording(self, recording: _Recording, keys: Optional[List[str]]) -> None:
+        with self._lock:
+            if self._recording is not recording:
+                return
+            self._recording = None
+            self.recordings += 1
+        # The matcher missed every event while recording
+        self._matcher.reset()
+        recording.on_finished(recording.action, keys)
+
+    def _on_press(self, key) -> None:
+        self.events += 1
+        try:
+            key_name = self._normalize(key)
+            if key_name is None:
+                return
+            recording = self._recording
+            if recording is not None:
+                if key_name == "esc":
+                    self._finish_recording(recording, None)
+                else:
+                    recording.add(key_name)
+                return
+            action = self._matcher.press(key_name, key_identity(key, key_name))
+            if action is not None:
+                self.dispatched += 1
+                self._on_action(action)
+        except Exception as e:
+            logging.error(f"Error in hotkey press handler: {e}")
+
+    def _on_release(self, key) -> None:
+        self.events += 1
+        try:
+            key_name = self._normalize(key)
+            if key_name is None:
+                return
+            recording = self._recording
+            if recording is not None:
+                if recording.has_non_modifier:
+                    self._finish_recording(recording, order_shortcut_keys(recording.keys))
+                return
+            self._matcher.release(key_name, key_identity(key, key_name))
+        except Exception as e:
+            logging.error(f"Error in hotkey release handler: {e}")
+
+    def stop(self) -> None:
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            try:
+                listener.stop()
+            except Exception as e:
+                logging.error(f"Failed to stop key listener: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "shortcuts": len(self._matcher),
+            "listener_starts": self.listener_starts,
+            "listener_restarts": max(0, self.listener_starts - 1),
+            "events": self.events,
+            "dispatched": self.dispatched,
+            "swaps": self.swaps,
+            "recordings": self.recordings,
+            "recording": self.recording_action,
+        }
@@ -0,0 +1,363 @@
+"""Unix domain socket control surface for the running app.
+
+Newline-delimited JSON. Each request is an object with a "command" and an
+optional "id" that is echoed back in the response:
+
+    {"id": 1, "command": "rotate", "degree": 90}    -> {"id": 1, "ok": true, "action": "rotate_90"}
+    {"id": 2, "command": "toggle", "set": false}    -> {"id": 2, "ok": true, "action": "toggle"}
+    {"id": 3, "command": "list"}                    -> {"id": 3, "ok": true, "displays": [...]}
+    {"id": 4, "command": "status"}                  -> {"id": 4, "ok": true, "target_display_id": ...}
+    {"id": 5, "command": "subscribe"}               -> {"id": 5, "ok": true, "subscribed": true}
+    {"id": 6, "command": "traces", "last": 5}       -> {"id": 6, "ok": true, "traces": [...]}
+    {"id": 7, "command": "logs", "last": 50}        -> {"id": 7, "ok": true, "lines": [...]}
+    {"id": 8, "command": "profiles"}                -> {"id": 8, "ok": true, "profiles": [...], "current": "desk"}
+    {"id": 9, "command": "profile", "name": "desk"} -> {"id": 9, "ok": true, "action": "profile:desk"}
+
+Rotations are queued through the controller's `queue_action`, so they
+serialize and coalesce with hotkeys and menu clicks ("coalesced": true when
+the request replaced one that was still waiting); completion is reported as
+{"event": "action_finished", ...} to subscribed connections; a subscriber
+that falls more than MAX_PENDING_EVENTS behind is disconnected. Errors come back
+as {"ok": false, "error": "..."}.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from rotator.action_queue import ACCEPTED, SUBMIT_COALESCED, SUBMIT_FULL, SUBMIT_RATE_LIMITED
+from rotator.command_runner import LatencyHistogram
+
+DEFAULT_SOCKET_PATH = os.path.expanduser("~/.screen_rotator.sock")
+MAX_REQUEST_BYTES = 64 * 1024
+# Events a subscriber may fall behind by before it is disconnected
+MAX_PENDING_EVENTS = 64
+QUEUE_ERRORS = {
+    SUBMIT_RATE_LIMITED: "Too many requests for this action",
+    SUBMIT_FULL: "Rotation queue is full",
+}
+
+
+class _Connection:
+    """One client connection; subscribed ones get events from their own writer thread.
+
+    Publishing only puts the event on a bounded queue, so a client that
+    stops reading cannot stall the rotation worker that publishes.
+    """
+
+    def __init__(self, wfile, sock: Optional[socket.socket] = None):
+        self._wfile = wfile
+        self._socket = sock
+        self._lock = threading.Lock()
+        self._events: "Optional[queue.Queue[Optional[Dict[str, object]]]]" = None
+
+    def send(self, message: Dict[str, object]) -> None:
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self._lock:
+            self._wfile.write(data)
+            self._wfile.flush()
+
+    def start_events(self, on_sent: Callable[[], None]) -> None:
+        if self._events is not None:
+            return
+        self._events = queue.Queue(MAX_PENDING_EVENTS)
+        threading.Thread(target=self._write_events, args=(self._events, on_sent), name="control-events", daemon=True).start()
+
+    def offer(self, event: Dict[str, object]) -> bool:
+        """Queue an event for the writer thread; False when the client has fallen too far behind."""
+        if self._events is None:
+            return False
+        try:
+            self._events.put_nowait(event)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self) -> None:
+        """Stop the writer and disconnect, which also ends the request handler."""
+        if self._events is not None:
+            try:
+                self._events.put_nowait(None)
+            except queue.Full:
+                pass
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _write_events(self, events: "queue.Queue[Optional[Dict[str, object]]]", on_sent: Callable[[], None]) -> None:
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            try:
+                self.send(event)
+            except (OSError, ValueError):
+                return
+            on_sent()
+
+
+class _ControlRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        control: "ControlServer" = self.server.control
+        connection = _Connection(self.wfile, self.connection)
+        try:
+            while True:
+                line = self.rfile.readline(MAX_REQUEST_BYTES)
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                connection.send(control.dispatch(line, connection))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            control.unsubscribe(connection)
+            connection.close()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ControlServer:
+    """Serves the control protocol on a Unix socket from background threads.
+
+    `backend` is a RotationController; status and list answers come from its
+    display snapshot cache, so they never wait on displayplacer once the
+    cache is warm.
+    """
+
+    def __init__(self, backend, path: str = DEFAULT_SOCKET_PATH):
+        self.backend = backend
+        self.path = path
+        self._server: Optional[_UnixServer] = None
+        self._subscribers: List[_Connection] = []
+        self._lock = threading.Lock()
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self.events_sent = 0
+        self.subscribers_dropped = 0
+
+    def start(self) -> bool:
+        if os.path.exists(self.path):
+            if _socket_is_live(self.path):
+                logging.error(f"Control socket {self.path} is already served by another process")
+                return False
+            os.unlink(self.path)
+        # Created owner-only from the start; a chmod after bind would leave a window for other users
+        previous_umask = os.umask(0o177)
+        try:
+            self._server = _UnixServer(self.path, _ControlRequestHandler)
+        finally:
+            os.umask(previous_umask)
+        self._server.control = self
+        threading.Thread(target=self._server.serve_forever, name="control-socket", daemon=True).start()
+        logging.info(f"Control socket listening on {self.path}")
+        return True
+
+    def stop(self) -> None:
+        if not self._server:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def dispatch(self, line: bytes, connection: Optional[_Connection] = None) -> Dict[str, object]:
+        started = time.perf_counter()
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = request.get("id")
+            response = self._handle(request, connection)
+        except Exception as e:
+            self.errors += 1
+            response = {"ok": False, "error": str(e)}
+        self.requests += 1
+        self.latency.record(time.perf_counter() - started)
+        if request_id is not None:
+            response["id"] = request_id
+        return response
+
+    def _handle(self, request: Dict[str, object], connection: Optional[_Connection]) -> Dict[str, object]:
+        command = request.get("command")
+        if command == "rotate":
+            degree = request.get("degree")
+            if degree not in (0, 90, 270):
+                raise ValueError("degree must be 0, 90 or 270")
+            return self._queue_action(f"rotate_{degree}")
+        if command == "toggle":
+            return self._queue_action("toggle_set" if request.get("set") else "toggle")
+        if command == "profile":
+            name = request.get("name")
+            if not isinstance(name, str) or self.backend.profiles.get(name) is None:
+                raise ValueError(f"unknown profile: {name}")
+            return self._queue_action(f"profile:{name}")
+        if command == "profiles":
+            return {"ok": True, **self.backend.control_profiles()}
+        if command == "list":
+            return {"ok": True, "displays": self.backend.control_displays()}
+        if command == "status":
+            return {"ok": True, **self.backend.control_status()}
+        if command == "traces":
+            return {"ok": True, "traces": self.backend.control_traces(_last(request))}
+        if command == "logs":
+            lines = self.backend.control_logs(_last(request))
+            if lines is None:
+                raise ValueError("log ring buffer is disabled (set log_ring_buffer in the config)")
+            return {"ok": True, "lines": lines}
+        if command == "subscribe":
+            if connection is None:
+                raise ValueError("subscribe needs a connection")
+            with self._lock:
+                if connection not in self._subscribers:
+                    self._subscribers.append(connection)
+            connection.start_events(self._event_sent)
+            return {"ok": True, "subscribed": True}
+        raise ValueError(f"unknown command: {command}")
+
+    def _queue_action(self, action: str) -> Dict[str, object]:
+        outcome = self.backend.queue_action(action)
+        if outcome not in ACCEPTED:
+            return {"ok": False, "error": QUEUE_ERRORS.get(outcome, f"unknown action: {action}"), "action": action}
+        return {"ok": True, "action": action, "coalesced": outcome == SUBMIT_COALESCED}
+
+    def publish(self, event: Dict[str, object]) -> None:
+        """Hand the event to every subscriber's writer; never blocks on a client."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for connection in subscribers:
+            if not connection.offer(event):
+                logging.warning("Control socket subscriber stopped reading events, disconnecting it")
+                with self._lock:
+                    self.subscribers_dropped += 1
+                self.unsubscribe(connection)
+                connection.close()
+
+    def _event_sent(self) -> None:
+        with self._lock:
+            self.events_sent += 1
+
+    def unsubscribe(self, connection: _Connection) -> None:
+        with self._lock:
+            if connection in self._subscribers:
+                self._subscribers.remove(connection)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            subscribers = len(self._subscribers)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "subscribers": subscribers,
+            "events_sent": self.events_sent,
+            "subscribers_dropped": self.subscribers_dropped,
+            "latency": self.latency.snapshot(),
+        }
+
+
+def _last(request: Dict[str, object]) -> Optional[int]:
+    last = request.get("last")
+    if last is not None and (not isinstance(last, int) or last < 0):
+        raise ValueError("last must be a non-negative integer")
+    return last
+
+
+def _socket_is_live(path: str) -> bool:
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+class ControlClient:
+    """asyncio client for the control socket.
+
+        client = await ControlClient.connect()
+        await client.request("rotate", degree=90)
+        await client.request("subscribe")
+        async for event in client.events():
+            ...
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    @classmethod
+    async def connect(cls, path: str = DEFAULT_SOCKET_PATH) -> "ControlClient":
+        reader, writer = await asyncio.open_unix_connection(path, limit=MAX_REQUEST_BYTES * 16)
+        return cls(reader, writer)
+
+    async def request(self, command: str, timeout: Optional[float] = 5.0, **params) -> Dict[str, object]:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write((json.dumps({"id": request_id, "command": command, **params}) + "\n").encode("utf-8"))
+        await self._writer.drain()
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def next_event(self, timeout: Optional[float] = None) -> Dict[str, object]:
+        event = await asyncio.wait_for(self._events.get(), timeout)
+        if event is None:
+            raise ConnectionError("control socket closed")
+        return event
+
+    async def events(self) -> AsyncIterator[Dict[str, object]]:
+        while True:
+            event = await self._events.get()
+            if event is None:
+                return
+            yield event
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                future = self._pending.get(message.get("id")) if "id" in message else None
+                if future is not None and not future.done():
+                    future.set_result(message)
+                elif "event" in message:
+                    self._events.put_nowait(message)
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("control socket closed"))
+            self._events.put_nowait(None)
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+        self._reader_task.cancel()
@@ -0,0 +1,187 @@
+"""How long each display takes to show a new layout, learned from past rotations.
+
+Monitors differ a lot: a built-in panel reports a rotation within ~100 ms,
+some external displays need seconds. DisplayLatencyModel keeps, per
+persistent screen id, an exponentially weighted moving average of the time
+from the layout call returning to the new rotation being visible, and of
+its deviation, the way TCP estimates round-trip times (RFC 6298). From that
+it derives
+
+- the verification timeout, mean + 4 * deviation, so a slow display is not
+  declared failed and re-applied while it is still switching;
+- when to look first, three quarters of the mean, unless a change
+  notification comes earlier: reading the displays right after the apply
+  only costs a `displayplacer list` that cannot succeed yet;
+- the poll interval after that, a quarter of the mean, so a fast display is
+  confirmed soon after it is done and a slow one is not polled needlessly.
+
+Stored in the config as
+
+    "display_latency": {"<persistent id>": {"mean": 0.42, "deviation": 0.05, "samples": 12}}
+
+and only rewritten when an estimate moves noticeably, so steady rotations do
+not touch the config file.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from rotator.display_state import DisplayChangeSignal, wait_for_display_state
+
+ALPHA = 0.25
+BETA = 0.25
+DEVIATION_FACTOR = 4.0
+MIN_TIMEOUT = 0.5
+MAX_TIMEOUT = 8.0
+MIN_POLL_INTERVAL = 0.01
+MAX_POLL_INTERVAL = 0.25
+DEFAULT_POLL_INTERVAL = 0.1
+FIRST_CHECK_FRACTION = 0.75
+# Relative change of the mean or the timeout that is worth a config write
+PERSIST_THRESHOLD = 0.1
+
+LatencyConfig = Dict[str, Dict[str, float]]
+
+
+class VerifyTiming(NamedTuple):
+    """How to wait for a layout change to show; see wait_for_display_state."""
+
+    timeout: float
+    first_check: float = 0.0
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+    # Change-signal generation from before the layout was applied
+    since_generation: Optional[int] = None
+    # When given, the `clock` time each check starts is appended here
+    check_times: Optional[List[float]] = None
+    # The caller's clock, so check times compare with its own timestamps
+    clock: Callable[[], float] = time.monotonic
+
+    def wait(self, check: Callable[[bool], bool], signal: DisplayChangeSignal) -> bool:
+        def timed_check(refresh: bool) -> bool:
+            if self.check_times is not None:
+                self.check_times.append(self.clock())
+            return check(refresh)
+
+        return wait_for_display_state(
+            timed_check,
+            signal,
+            self.timeout,
+            initial_interval=self.poll_interval,
+            initial_delay=self.first_check,
+            since_generation=self.since_generation,
+        )
+
+
+@dataclass
+class LatencyEstimate:
+    mean: float
+    deviation: float
+    samples: int = 1
+
+    def timeout(self) -> float:
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, self.mean + DEVIATION_FACTOR * self.deviation))
+
+
+class DisplayLatencyModel:
+    """Per-display apply-to-confirmed latency estimates.
+
+    `on_change` receives the config form whenever an estimate is new or has
+    moved by more than PERSIST_THRESHOLD since it was last reported.
+    """
+
+    def __init__(
+        self,
+        estimates: Optional[Dict[str, LatencyEstimate]] = None,
+        on_change: Optional[Callable[[LatencyConfig], None]] = None,
+    ):
+        self._lock = threading.Lock()
+        self._estimates: Dict[str, LatencyEstimate] = dict(estimates or {})
+        # Estimate as last handed to on_change, per display
+        self._reported = {
+            persistent_id: (estimate.mean, estimate.timeout()) for persistent_id, estimate in self._estimates.items()
+        }
+        self._on_change = on_change
+
+    @classmethod
+    def from_config(cls, value: object, on_change: Optional[Callable[[LatencyConfig], None]] = None) -> "DisplayLatencyModel":
+        """Model from the config's "display_latency" dict; malformed entries are skipped."""
+        estimates = {}
+        if isinstance(value, dict):
+            for persistent_id, entry in value.items():
+                try:
+                    estimate = LatencyEstimate(
+                        float(entry["mean"]), float(entry["deviation"]), int(entry.get("samples", 1))
+                    )
+                except (TypeError, KeyError, ValueError, AttributeError):
+                    continue
+                if estimate.mean >= 0 and estimate.deviation >= 0:
+                    estimates[str(persistent_id)] = estimate
+        return cls(estimates, on_change)
+
+    def to_config(self) -> LatencyConfig:
+        with self._lock:
+            return {
+                persistent_id: {
+                    "mean": round(estimate.mean, 4),
+                    "deviation": round(estimate.deviation, 4),
+                    "samples": estimate.samples,
+                }
+                for persistent_id, estimate in self._estimates.items()
+            }
+
+    def get(self, persistent_id: str) -> Optional[LatencyEstimate]:
+        with self._lock:
+            return self._estimates.get(persistent_id)
+
+    def observe(self, persistent_ids: Iterable[str], seconds: float) -> None:
+        """Record that the displays showed a new layout `seconds` after it was applied."""
+        changed = False
+        with self._lock:
+            for persistent_id in persistent_ids:
+                estimate = self._estimates.get(persistent_id)
+                if estimate is None:
+                    estimate = self._estimates[persistent_id] = LatencyEstimate(seconds, seconds / 2.0)
+                else:
+                    estimate.deviation += BETA * (abs(seconds - estimate.mean) - estimate.deviation)
+                    estimate.mean += ALPHA * (seconds - estimate.mean)
+                    estimate.samples += 1
+                reported = self._reported.get(persistent_id)
+                current = (estimate.mean, estimate.timeout())
+                if reported is None or any(
+                    abs(new - old) > PERSIST_THRESHOLD * max(old, MIN_POLL_INTERVAL) for new, old in zip(current, reported)
+                ):
+                    self._reported[persistent_id] = current
+                    changed = True
+        if changed and self._on_change:
+            self._on_change(self.to_config())
+
+    def timing(self, persistent_ids: Iterable[str], default_timeout: float) -> VerifyTiming:
+        """Timing for a change to all of these displays, paced by the slowest; `default_timeout` for unknown ones.
+
+        A display without history keeps the plain behaviour: look at once,
+        poll every DEFAULT_POLL_INTERVAL.
+        """
+        with self._lock:
+            estimates = [self._estimates.get(persistent_id) for persistent_id in persistent_ids]
+        known = [estimate for estimate in estimates if estimate is not None]
+        timeout = max([estimate.timeout() if estimate else default_timeout for estimate in estimates] or [default_timeout])
+        if not known or len(known) < len(estimates):
+            return VerifyTiming(timeout)
+        slowest = max(estimate.mean for estimate in known)
+        return VerifyTiming(
+            timeout,
+            first_check=min(slowest * FIRST_CHECK_FRACTION, timeout),
+            poll_interval=min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, slowest / 4.0)),
+        )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                persistent_id: {
+                    "mean_ms": round(estimate.mean * 1000.0, 1),
+                    "timeout_ms": round(estimate.timeout() * 1000.0, 1),
+                    "samples": estimate.samples,
+                }
+                for persistent_id, estimate in self._estimates.items()
+            }
@@ -0,0 +1,196 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from rotator.display_state import DisplayRecord, DisplaySnapshot
+
+_DEGREE_ARG_PATTERN = re.compile(r"\bdegree:(\d+)\b")
+_ORIGIN_FIELD_PATTERN = re.compile(r"\(\s*(-?\d+)\s*,\s*(-?\d+)\s*\)")
+
+
+def is_portrait_degree(degree: Optional[int]) -> bool:
+    if degree is None:
+        return False
+    return degree in (90, 270)
+
+
+def is_landscape_degree(degree: Optional[int]) -> bool:
+    if degree is None:
+        return False
+    return degree in (0, 180)
+
+
+def degree_matches_target_rotation(actual_degree: Optional[int], target_degree: int) -> bool:
+    if target_degree in (90, 270):
+        return is_portrait_degree(actual_degree)
+    return is_landscape_degree(actual_degree)
+
+
+def extract_display_degree_from_layout_args(
+    layout_args: Sequence[str],
+    persistent_id: str,
+) -> Optional[int]:
+    id_pattern = f"id:{persistent_id}"
+    for arg in layout_args:
+        if id_pattern not in arg:
+            continue
+        degree_match = _DEGREE_ARG_PATTERN.search(arg)
+        if degree_match:
+            return int(degree_match.group(1))
+    return None
+
+
+def parse_layout_argument(argument: str) -> Dict[str, str]:
+    """Split one displayplacer argument ("id:X res:WxH origin:(0,0) degree:90") into fields."""
+    fields: Dict[str, str] = {}
+    for token in argument.split():
+        key, separator, value = token.partition(":")
+        if separator:
+            fields[key] = value
+    return fields
+
+
+def format_layout_argument(fields: Mapping[str, str]) -> str:
+    return " ".join(f"{key}:{value}" for key, value in fields.items())
+
+
+def record_layout_argument(record: DisplayRecord) -> str:
+    """displayplacer argument that recreates one display's current mode and position."""
+    fields = {"id": record.persistent_id}
+    if record.resolution:
+        fields["res"] = record.resolution
+    if record.hertz:
+        fields["hz"] = record.hertz
+    if record.color_depth:
+        fields["color_depth"] = record.color_depth
+    fields["enabled"] = "true"
+    if record.scaling:
+        fields["scaling"] = record.scaling
+    if record.origin is not None:
+        fields["origin"] = f"({record.origin[0]},{record.origin[1]})"
+    fields["degree"] = str(record.rotation or 0)
+    return format_layout_argument(fields)
+
+
+def parse_origin(value: str) -> Optional[Tuple[int, int]]:
+    origin_match = _ORIGIN_FIELD_PATTERN.match(value)
+    if not origin_match:
+        return None
+    return int(origin_match.group(1)), int(origin_match.group(2))
+
+
+def swap_resolution(resolution: str) -> str:
+    if "x" not in resolution:
+        return resolution
+    width, height = resolution.split("x", 1)
+    return f"{height}x{width}"
+
+
+@dataclass
+class DisplayRect:
+    persistent_id: str
+    x: int
+    y: int
+    width: int
+    height: int
+    is_main: bool = False
+
+
+def recalculate_origins(
+    rects: Sequence[DisplayRect],
+    new_sizes: Mapping[str, Tuple[int, int]],
+) -> Dict[str, Tuple[int, int]]:
+    """New origins after some displays change size, keeping the arrangement non-overlapping.
+
+    Edges facing the main display stay put. A resized display right of (or
+    below) the main display pushes everything beyond its far edge by the
+    size difference; one left of (or above) the main display keeps its near
+    edge, so it and everything further out move instead. Shifts from several
+    resized displays accumulate, and the main display stays at (0, 0) as
+    displayplacer requires.
+    """
+    main = next((rect for rect in rects if rect.is_main), None)
+    if main is None:
+        main = next((rect for rect in rects if (rect.x, rect.y) == (0, 0)), None)
+    anchor_x = main.x if main else min((rect.x for rect in rects), default=0)
+    anchor_y = main.y if main else min((rect.y for rect in rects), default=0)
+
+    shifts = {rect.persistent_id: [0, 0] for rect in rects}
+    for rect in rects:
+        new_width, new_height = new_sizes.get(rect.persistent_id, (rect.width, rect.height))
+        delta_width = new_width - rect.width
+        delta_height = new_height - rect.height
+        if delta_width:
+            if rect.x + rect.width <= anchor_x:
+                shifts[rect.persistent_id][0] -= delta_width
+                for other in rects:
+                    if other is not rect and other.x + other.width <= rect.x:
+                        shifts[other.persistent_id][0] -= delta_width
+            else:
+                for other in rects:
+                    if other is not rect and other.x >= rect.x + rect.width:
+                        shifts[other.persistent_id][0] += delta_width
+        if delta_height:
+            if rect.y + rect.height <= anchor_y:
+                shifts[rect.persistent_id][1] -= delta_height
+                for other in rects:
+                    if other is not rect and other.y + other.height <= rect.y:
+                        shifts[other.persistent_id][1] -= delta_height
+            else:
+                for other in rects:
+                    if other is not rect and other.y >= rect.y + rect.height:
+                        shifts[other.persistent_id][1] += delta_height
+
+    origins = {
+        rect.persistent_id: (rect.x + shifts[rect.persistent_id][0], rect.y + shifts[rect.persistent_id][1])
+        for rect in rects
+    }
+    if main is not None:
+        offset_x, offset_y = origins[main.persistent_id]
+        origins = {persistent_id: (x - offset_x, y - offset_y) for persistent_id, (x, y) in origins.items()}
+    return origins
+
+
+def build_batch_rotation_args(snapshot: DisplaySnapshot, targets: Mapping[str, int]) -> Optional[List[str]]:
+    """One displayplacer argument list that rotates every display in `targets` at once.
+
+    Starts from the snapshot's restore command so untouched displays keep
+    their exact mode, swaps width/height for displays whose orientation
+    flips and recomputes origins for all displays so nothing overlaps.
+    Returns None if the snapshot has no restore command or a target is not
+    connected.
+    """
+    restore_command = snapshot.restore_command()
+    if not restore_command:
+        return None
+    records = {record.persistent_id: record for record in snapshot.records()}
+    if any(persistent_id not in records for persistent_id in targets):
+        return None
+
+    arguments = [parse_layout_argument(argument) for argument in restore_command]
+    rects: List[DisplayRect] = []
+    new_sizes: Dict[str, Tuple[int, int]] = {}
+    for fields in arguments:
+        persistent_id = fields.get("id", "")
+        record = records.get(persistent_id)
+        resolution = fields.get("res", "")
+        origin = parse_origin(fields.get("origin", ""))
+        # Mirrored sets ("id:A+B") and entries without geometry are passed through unchanged
+        if record is None or origin is None or "x" not in resolution:
+            continue
+        width, height = (int(value) for value in resolution.split("x", 1))
+        rects.append(DisplayRect(persistent_id, origin[0], origin[1], width, height, record.is_main))
+        if persistent_id in targets:
+            current_degree = int(fields.get("degree", record.rotation or 0))
+            target_degree = targets[persistent_id]
+            fields["degree"] = str(target_degree)
+            if is_portrait_degree(current_degree) != is_portrait_degree(target_degree):
+                new_sizes[persistent_id] = (height, width)
+                fields["res"] = swap_resolution(resolution)
+
+    origins = recalculate_origins(rects, new_sizes)
+    for fields in arguments:
+        origin = origins.get(fields.get("id", ""))
+        if origin is not None:
+            fields["origin"] = f"({origin[0]},{origin[1]})"
+    return [format_layout_argument(fields) for fields in arguments]
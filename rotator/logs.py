@@ -0,0 +1,139 @@
+"""Non-blocking logging for the menu bar app.
+
+Callers (hotkey listener, main thread, rotation workers) only put records on
+a queue; a QueueListener thread formats them and does the file I/O. The log
+file is size-rotated, and an optional ring buffer keeps the last N formatted
+lines in memory for the control socket's `logs` command.
+"""
+import collections
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import Dict, List, Optional, TextIO
+
+DEFAULT_LOG_FILE = os.path.expanduser("~/screen_rotator_debug.log")
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+DEFAULT_MAX_BYTES = 1_000_000
+DEFAULT_BACKUP_COUNT = 3
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` formatted records in memory."""
+
+    def __init__(self, capacity: int):
+        super().__init__()
+        self._lines = collections.deque(maxlen=capacity)
+        self._lines_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._lines_lock:
+            self._lines.append(line)
+
+    def lines(self, count: Optional[int] = None) -> List[str]:
+        """The last `count` lines (all buffered ones by default), oldest first."""
+        with self._lines_lock:
+            lines = list(self._lines)
+        if count is not None:
+            lines = lines[-count:] if count > 0 else []
+        return lines
+
+
+class LoggingPipeline:
+    """A started QueueListener plus the handlers it feeds; `stop()` drains the queue."""
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        queue_handler: logging.handlers.QueueHandler,
+        listener: logging.handlers.QueueListener,
+        ring_buffer: Optional[RingBufferHandler],
+    ):
+        self.logger = logger
+        self.queue_handler = queue_handler
+        self.listener = listener
+        self.ring_buffer = ring_buffer
+        self._stopped = False
+
+    def stop(self) -> None:
+        if self._stopped:
+            return
+        self._stopped = True
+        self.logger.removeHandler(self.queue_handler)
+        # Processes everything already queued before returning
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+def setup_logging(
+    log_file: Optional[str] = DEFAULT_LOG_FILE,
+    level: str = "INFO",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+    ring_buffer_size: int = 0,
+    stream: Optional[TextIO] = sys.stdout,
+    logger: Optional[logging.Logger] = None,
+) -> LoggingPipeline:
+    """Route `logger` (the root logger by default) through a queue to a rotated file and `stream`.
+
+    Handlers installed by an earlier call on the same logger are replaced.
+    Call `stop()` on the result at exit so queued records reach the file.
+    """
+    logger = logger or logging.getLogger()
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = []
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        ))
+    if stream is not None:
+        handlers.append(logging.StreamHandler(stream))
+    ring_buffer = RingBufferHandler(ring_buffer_size) if ring_buffer_size > 0 else None
+    if ring_buffer:
+        handlers.append(ring_buffer)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    for handler in list(logger.handlers):
+        pipeline = getattr(handler, "pipeline", None)
+        if isinstance(pipeline, LoggingPipeline):
+            pipeline.stop()
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(records)
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    pipeline = LoggingPipeline(logger, queue_handler, listener, ring_buffer)
+    queue_handler.pipeline = pipeline
+    listener.start()
+    logger.addHandler(queue_handler)
+    logger.setLevel(level)
+    return pipeline
+
+
+def logging_options(config: Dict[str, object]) -> Dict[str, object]:
+    """setup_logging() keyword arguments from the app config (log_level, log_max_bytes, ...)."""
+    level = str(config.get("log_level") or "INFO").upper()
+    if not isinstance(logging.getLevelName(level), int):
+        level = "INFO"
+    return {
+        "log_file": os.path.expanduser(str(config.get("log_file") or DEFAULT_LOG_FILE)),
+        "level": level,
+        "max_bytes": _int_option(config, "log_max_bytes", DEFAULT_MAX_BYTES),
+        "backup_count": _int_option(config, "log_backup_count", DEFAULT_BACKUP_COUNT),
+        "ring_buffer_size": _int_option(config, "log_ring_buffer", 0),
+    }
+
+
+def _int_option(config: Dict[str, object], key: str, default: int) -> int:
+    try:
+        return max(0, int(config.get(key, default)))
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,307 @@
+import collections
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from rotator.command_runner import LatencyHistogram
+
+# Menu actions are plain tuples, e.g. ("rotate", "rotate_90") or ("select_target", "<persistent id>"),
+# so two renders of the same state compare equal without comparing callback objects.
+MenuAction = Tuple[object, ...]
+
+# Single source of truth for action display names
+ACTION_LABELS = [
+    ("toggle", "Toggle Screen", "Toggle"),
+    ("rotate_0", "Rotate Standard (0°)", "0°"),
+    ("rotate_90", "Rotate Vertical (90°)", "90°"),
+    ("rotate_270", "Rotate Vertical (270°)", "270°"),
+    ("toggle_set", "Toggle Display Set", "Set"),
+]
+
+
+@dataclass(frozen=True)
+class MenuEntry:
+    key: str
+    title: str = ""
+    state: Optional[int] = None
+    action: Optional[MenuAction] = None
+    children: Optional[Tuple["MenuEntry", ...]] = None
+    separator: bool = False
+
+
+def separator(key: str) -> MenuEntry:
+    return MenuEntry(key=key, separator=True)
+
+
+@dataclass(frozen=True)
+class DisplayMenuState:
+    persistent_id: str
+    name: str
+    is_external: bool
+    degree: str
+
+
+@dataclass(frozen=True)
+class MenuState:
+    """Everything the status menu shows, captured at one point in time."""
+
+    shortcut_displays: Tuple[Tuple[str, str], ...]
+    displays: Tuple[DisplayMenuState, ...]
+    target_display_id: Optional[str]
+    launch_at_login: bool
+    revert_pending: bool = False
+    # Whole seconds left before the pending revert, shown on "Keep Rotation"
+    revert_remaining: Optional[int] = None
+    # Persistent ids rotated together by the "toggle_set" action
+    display_set: Tuple[str, ...] = ()
+    # Saved profile names, and the one saved for the connected displays
+    profiles: Tuple[str, ...] = ()
+    current_profile: Optional[str] = None
+
+
+def display_names(displays: Sequence[DisplayMenuState]) -> Dict[str, str]:
+    """Menu name per persistent id; identical monitors get the end of their id appended.
+
+    rumps keys menu items by title, so two "27 inch external screen" items
+    would replace each other.
+    """
+    counts = collections.Counter(display.name for display in displays)
+    return {
+        display.persistent_id: display.name if counts[display.name] == 1 else f"{display.name} #{display.persistent_id[-4:]}"
+        for display in displays
+    }
+
+
+def build_menu_entries(state: MenuState) -> Tuple[MenuEntry, ...]:
+    shortcuts = dict(state.shortcut_displays)
+    entries: List[MenuEntry] = []
+
+    # Show confirmation controls when a built-in display revert is pending
+    if state.revert_pending:
+        keep_title = "Keep Rotation" if state.revert_remaining is None else f"Keep Rotation ({state.revert_remaining}s)"
+        entries.append(MenuEntry("revert:keep", keep_title, action=("confirm_rotation",)))
+        entries.append(MenuEntry("revert:now", "Revert Now", action=("revert_now",)))
+        entries.append(separator("separator:revert"))
+
+    for action_id, menu_label, _ in ACTION_LABELS:
+        if action_id in ("toggle", "toggle_set"):
+            action: MenuAction = (action_id,)
+        else:
+            action = ("rotate", action_id)
+        entries.append(MenuEntry(
+            f"action:{action_id}",
+            f"{menu_label}  [{shortcuts.get(action_id, 'None')}]",
+            action=action,
+        ))
+        if action_id == "toggle":
+            entries.append(separator("separator:toggle"))
+    entries.append(separator("separator:actions"))
+
+    names = display_names(state.displays)
+    if not state.displays:
+        display_entries: Tuple[MenuEntry, ...] = (MenuEntry("display:none", "No displays detected"),)
+    else:
+        display_entries = tuple(
+            MenuEntry(
+                f"display:{display.persistent_id}",
+                f"{names[display.persistent_id]} ({'External' if display.is_external else 'Built-in'}) [{display.degree}°]",
+                state=int(display.persistent_id == state.target_display_id),
+                action=("select_target", display.persistent_id),
+            )
+            for display in state.displays
+        )
+    entries.append(MenuEntry("displays", "Target Display", children=display_entries))
+    if state.displays:
+        display_set = set(state.display_set)
+        entries.append(MenuEntry("display_set", "Display Set", children=tuple(
+            MenuEntry(
+                f"set:{display.persistent_id}",
+                names[display.persistent_id],
+                state=int(display.persistent_id in display_set),
+                action=("toggle_set_member", display.persistent_id),
+            )
+            for display in state.displays
+        )))
+    profile_entries = [
+        MenuEntry(
+            f"profile:{name}",
+            name,
+            state=int(name == state.current_profile),
+            action=("apply_profile", name),
+        )
+        for name in state.profiles
+    ]
+    if profile_entries:
+        profile_entries.append(separator("separator:profiles"))
+    profile_entries.append(MenuEntry("save_profile", "Save Current Layout as Profile...", action=("save_profile",)))
+    entries.append(MenuEntry("profiles", "Profiles", children=tuple(profile_entries)))
+    entries.append(MenuEntry("refresh", "Refresh Displays", action=("refresh",)))
+    entries.append(separator("separator:displays"))
+
+    # Menu-based settings avoids AppKit NSWindow threading crashes (see commit 0c970d8)
+    settings_entries = [
+        MenuEntry(f"record:{action_id}", f"Record {short_label}...", action=("record", action_id))
+        for action_id, _, short_label in ACTION_LABELS
+    ]
+    settings_entries.append(separator("separator:settings"))
+    settings_entries.append(MenuEntry("clear_shortcuts", "Clear All Shortcuts", action=("clear_shortcuts",)))
+    settings_entries.append(MenuEntry("export_traces", "Export Rotation Traces", action=("export_traces",)))
+    entries.append(MenuEntry("settings", "Settings...", children=tuple(settings_entries)))
+
+    entries.append(separator("separator:settings_menu"))
+    entries.append(MenuEntry(
+        "launch_at_login",
+        "Launch at Login",
+        state=int(state.launch_at_login),
+        action=("launch_at_login",),
+    ))
+    return tuple(entries)
+
+
+class MenuRenderer:
+    """Applies MenuEntry trees to a rumps-style menu, touching only what changed.
+
+    When a level keeps the same ordered keys, existing items are patched in
+    place (title, state, callback) and unchanged items are left alone. A
+    level whose keys changed (displays plugged in, revert controls shown) is
+    cleared and rebuilt. `last_mutations` counts the items created or
+    modified by the most recent render.
+    """
+
+    def __init__(
+        self,
+        menu,
+        make_item: Callable[[str, Optional[Callable]], object],
+        make_separator: Callable[[], object],
+        make_callback: Callable[[Optional[MenuAction]], Optional[Callable]],
+    ):
+        self.menu = menu
+        self.make_item = make_item
+        self.make_separator = make_separator
+        self.make_callback = make_callback
+        self.rendered: Tuple[MenuEntry, ...] = ()
+        self._items: Dict[str, object] = {}
+        self.renders = 0
+        self.last_mutations = 0
+        self.total_mutations = 0
+
+    def render(self, entries: Sequence[MenuEntry]) -> int:
+        entries = tuple(entries)
+        mutations = self._render_level(self.menu, "", self.rendered, entries)
+        self.rendered = entries
+        self.renders += 1
+        self.last_mutations = mutations
+        self.total_mutations += mutations
+        return mutations
+
+    def _render_level(self, container, path: str, old: Sequence[MenuEntry], new: Sequence[MenuEntry]) -> int:
+        if [entry.key for entry in old] != [entry.key for entry in new]:
+            return self._rebuild_level(container, path, old, new)
+
+        mutations = 0
+        for old_entry, new_entry in zip(old, new):
+            if old_entry == new_entry or new_entry.separator:
+                continue
+            item = self._items[path + new_entry.key]
+            changed = False
+            if old_entry.title != new_entry.title:
+                item.title = new_entry.title
+                changed = True
+            if old_entry.state != new_entry.state:
+                item.state = new_entry.state or 0
+                changed = True
+            if old_entry.action != new_entry.action:
+                item.set_callback(self.make_callback(new_entry.action))
+                changed = True
+            if changed:
+                mutations += 1
+            if old_entry.children != new_entry.children:
+                mutations += self._render_level(
+                    item,
+                    f"{path}{new_entry.key}/",
+                    old_entry.children or (),
+                    new_entry.children or (),
+                )
+        return mutations
+
+    def _rebuild_level(self, container, path: str, old: Sequence[MenuEntry], new: Sequence[MenuEntry]) -> int:
+        self._forget(path, old)
+        container.clear()
+        mutations = 0
+        for entry in new:
+            if entry.separator:
+                container.add(self.make_separator())
+                continue
+            item = self.make_item(entry.title, self.make_callback(entry.action))
+            if entry.state is not None:
+                item.state = entry.state
+            container.add(item)
+            self._items[path + entry.key] = item
+            mutations += 1
+            if entry.children:
+                mutations += self._rebuild_level(item, f"{path}{entry.key}/", (), entry.children)
+        return mutations
+
+    def _forget(self, path: str, entries: Sequence[MenuEntry]) -> None:
+        for entry in entries:
+            self._items.pop(path + entry.key, None)
+            if entry.children:
+                self._forget(f"{path}{entry.key}/", entry.children)
+
+
+class MenuRefreshPipeline:
+    """Builds MenuState off the main thread and hands it back for rendering.
+
+    `request()` may be called from any thread. A single background worker
+    runs `gather` (which is free to block on displayplacer or launchctl) and
+    passes the resulting state to `post`, which should queue it for the main
+    thread. Requests arriving while a gather is running collapse into one
+    follow-up gather. The main thread calls `rendered(requested_at)` after
+    applying a state so `render_latency` covers request -> menu rendered.
+    """
+
+    def __init__(
+        self,
+        gather: Callable[[], MenuState],
+        post: Callable[[MenuState, float], None],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._gather = gather
+        self._post = post
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._pending_since: Optional[float] = None
+        self._worker: Optional[threading.Thread] = None
+        self.render_latency = LatencyHistogram()
+        self.requests = 0
+        self.gathers = 0
+
+    def request(self) -> None:
+        with self._condition:
+            self.requests += 1
+            if self._pending_since is None:
+                self._pending_since = self._clock()
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, name="menu-refresh", daemon=True)
+                self._worker.start()
+            self._condition.notify()
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending_since is None:
+                    self._condition.wait()
+                requested_at = self._pending_since
+                self._pending_since = None
+            try:
+                state = self._gather()
+            except Exception as e:
+                logging.error(f"Error gathering menu state: {e}")
+                continue
+            self.gathers += 1
+            self._post(state, requested_at)
+
+    def rendered(self, requested_at: float) -> None:
+        self.render_latency.record(self._clock() - requested_at)
@@ -0,0 +1,143 @@
+"""Named display layouts, one per dock or monitor set.
+
+A profile stores a complete displayplacer argument list, validated when it
+is saved, so applying it is a single layout call with no `displayplacer
+list` first. Profiles are indexed by the sorted set of persistent screen ids
+they cover, so finding the one for the connected displays is one dict
+lookup. Stored in the config as
+
+    "profiles": {"desk": {"displays": ["AAA", "BBB"], "layout": ["id:AAA res:... degree:0", ...]}}
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from rotator.layout import parse_layout_argument, parse_origin
+
+ProfileConfig = Dict[str, List[str]]
+
+
+def display_set_key(persistent_ids: Iterable[str]) -> str:
+    """Order-independent fingerprint of a set of persistent screen ids."""
+    return "+".join(sorted(set(persistent_ids)))
+
+
+def validate_profile_layout(layout_args: Sequence[str]) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    """(display ids, layout) if every argument is complete enough to apply blind, else None.
+
+    Each argument needs an id, a WxH resolution, an origin and a degree of
+    0/90/180/270; ids may not repeat and one display must sit at (0,0), as
+    displayplacer requires. Mirrored sets ("id:A+B") count every member.
+    """
+    display_ids: List[str] = []
+    has_main = False
+    for argument in layout_args:
+        fields = parse_layout_argument(argument)
+        resolution = fields.get("res", "")
+        origin = parse_origin(fields.get("origin", ""))
+        if not fields.get("id") or "x" not in resolution or origin is None:
+            return None
+        if fields.get("degree") not in ("0", "90", "180", "270"):
+            return None
+        display_ids.extend(fields["id"].split("+"))
+        has_main = has_main or origin == (0, 0)
+    if not display_ids or len(set(display_ids)) != len(display_ids) or not has_main:
+        return None
+    return tuple(sorted(display_ids)), tuple(layout_args)
+
+
+@dataclass(frozen=True)
+class DisplayProfile:
+    name: str
+    # Sorted persistent ids the layout covers
+    display_ids: Tuple[str, ...]
+    layout: Tuple[str, ...]
+
+    @property
+    def key(self) -> str:
+        return display_set_key(self.display_ids)
+
+    @classmethod
+    def from_layout(cls, name: str, layout_args: Sequence[str]) -> Optional["DisplayProfile"]:
+        validated = validate_profile_layout(layout_args)
+        if not name or validated is None:
+            return None
+        display_ids, layout = validated
+        return cls(name, display_ids, layout)
+
+    def degrees(self) -> Dict[str, int]:
+        """Persistent id -> degree the layout sets."""
+        degrees = {}
+        for argument in self.layout:
+            fields = parse_layout_argument(argument)
+            for persistent_id in fields["id"].split("+"):
+                degrees[persistent_id] = int(fields["degree"])
+        return degrees
+
+    def to_config(self) -> ProfileConfig:
+        return {"displays": list(self.display_ids), "layout": list(self.layout)}
+
+
+class ProfileStore:
+    """Profiles by name plus an index from display-set fingerprint to profile.
+
+    When several profiles cover the same displays, the most recently saved
+    one is the match for that set.
+    """
+
+    def __init__(self, profiles: Iterable[DisplayProfile] = ()):
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, DisplayProfile] = {}
+        self._by_key: Dict[str, str] = {}
+        for profile in profiles:
+            self.add(profile)
+
+    @classmethod
+    def from_config(cls, value: object) -> "ProfileStore":
+        """Profiles from the config's "profiles" dict; entries that no longer validate are skipped."""
+        profiles = []
+        if isinstance(value, dict):
+            for name, entry in value.items():
+                layout = entry.get("layout") if isinstance(entry, dict) else None
+                if isinstance(layout, list):
+                    profile = DisplayProfile.from_layout(str(name), [str(argument) for argument in layout])
+                    if profile:
+                        profiles.append(profile)
+        return cls(profiles)
+
+    def to_config(self) -> Dict[str, ProfileConfig]:
+        with self._lock:
+            return {name: profile.to_config() for name, profile in self._profiles.items()}
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._profiles)
+
+    def get(self, name: str) -> Optional[DisplayProfile]:
+        return self._profiles.get(name)
+
+    def match(self, persistent_ids: Iterable[str]) -> Optional[DisplayProfile]:
+        """The profile for exactly this set of displays, if one was saved."""
+        with self._lock:
+            name = self._by_key.get(display_set_key(persistent_ids))
+            return self._profiles.get(name) if name else None
+
+    def add(self, profile: DisplayProfile) -> None:
+        with self._lock:
+            # Re-inserting moves the profile to the end, which is what "most recent" means below
+            self._profiles.pop(profile.name, None)
+            self._profiles[profile.name] = profile
+            self._reindex()
+
+    def remove(self, name: str) -> bool:
+        with self._lock:
+            if self._profiles.pop(name, None) is None:
+                return False
+            self._reindex()
+            return True
+
+    def _reindex(self) -> None:
+        self._by_key = {profile.key: name for name, profile in self._profiles.items()}
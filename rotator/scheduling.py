@@ -0,0 +1,131 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+
+class ScheduledCall:
+    def __init__(self, cancel: Callable[[], None]):
+        self._cancel = cancel
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        if not self.cancelled:
+            self.cancelled = True
+            self._cancel()
+
+
+class ThreadingScheduler:
+    """Runs callbacks on `threading.Timer` threads against the monotonic clock."""
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> ScheduledCall:
+        timer = threading.Timer(max(0.0, delay), callback)
+        timer.daemon = True
+        timer.start()
+        return ScheduledCall(timer.cancel)
+
+
+class ManualScheduler:
+    """Deterministic scheduler for tests: time only moves when `advance` is called."""
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._counter = itertools.count()
+        self._queue: List[Tuple[float, int, Callable[[], None], ScheduledCall]] = []
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        return self._now
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> ScheduledCall:
+        handle = ScheduledCall(lambda: None)
+        with self._lock:
+            heapq.heappush(self._queue, (self._now + max(0.0, delay), next(self._counter), callback, handle))
+        return handle
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for _, _, _, handle in self._queue if not handle.cancelled)
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward, running every callback that falls due in order."""
+        target = self._now + seconds
+        while True:
+            with self._lock:
+                if not self._queue or self._queue[0][0] > target:
+                    break
+                due, _, callback, handle = heapq.heappop(self._queue)
+            self._now = max(self._now, due)
+            if not handle.cancelled:
+                callback()
+        self._now = target
+
+
+class Debouncer:
+    """Trailing-edge debounce with an upper bound on how long a burst can defer the call.
+
+    Each `trigger()` pushes the call back to `delay` seconds after the latest
+    trigger, but never later than `max_wait` seconds after the first trigger
+    of the burst, so a continuous stream of events still refreshes
+    periodically.
+    """
+
+    def __init__(self, callback: Callable[[], None], scheduler, delay: float, max_wait: Optional[float] = None):
+        self._callback = callback
+        self._scheduler = scheduler
+        self.delay = delay
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._burst_started: Optional[float] = None
+        self._pending: Optional[ScheduledCall] = None
+        self._generation = 0
+        self.triggers = 0
+        self.calls = 0
+
+    def trigger(self) -> None:
+        with self._lock:
+            self.triggers += 1
+            now = self._scheduler.now()
+            if self._burst_started is None:
+                self._burst_started = now
+            fire_at = now + self.delay
+            if self.max_wait is not None:
+                fire_at = min(fire_at, self._burst_started + self.max_wait)
+            if self._pending:
+                self._pending.cancel()
+            # A timer thread may already be past cancel(); the generation makes it a no-op
+            self._generation += 1
+            generation = self._generation
+            self._pending = self._scheduler.call_later(fire_at - now, lambda: self._fire(generation))
+
+    def _fire(self, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if self._burst_started is None or (generation is not None and generation != self._generation):
+                return
+            self._burst_started = None
+            self._pending = None
+            self.calls += 1
+        self._callback()
+
+    def cancel(self) -> None:
+        """Drop a pending call without running it."""
+        with self._lock:
+            if self._pending:
+                self._pending.cancel()
+            self._pending = None
+            self._burst_started = None
+
+    def flush(self) -> None:
+        """Run a pending call immediately."""
+        with self._lock:
+            if self._pending:
+                self._pending.cancel()
+        self._fire()
+
+    def stats(self):
+        with self._lock:
+            return {"triggers": self.triggers, "calls": self.calls}
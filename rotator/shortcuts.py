@@ -0,0 +1,78 @@
+"""Shortcut key names: ordering, display strings and the lazy pynput bridge.
+
+Key names are plain lowercase strings ("ctrl", "shift", "r"), which is how
+shortcuts are stored in the config. pynput is only imported by
+`pynput_keyboard()`, so ordering and formatting work without it.
+"""
+import functools
+from typing import Dict, List, Sequence
+
+MODIFIER_ORDER = ("ctrl", "shift", "alt", "cmd")
+MODIFIER_SYMBOLS = {
+    "ctrl": "⌃",
+    "shift": "⇧",
+    "alt": "⌥",
+    "cmd": "⌘",
+}
+SPECIAL_KEY_DISPLAY = {
+    "space": "Space",
+    "enter": "↩",
+    "tab": "⇥",
+    "esc": "⎋",
+}
+
+
+def is_modifier_key_name(key_name: str) -> bool:
+    return key_name in MODIFIER_ORDER
+
+
+def order_shortcut_keys(keys: Sequence[str]) -> List[str]:
+    normalized: List[str] = []
+    seen = set()
+    for key in keys:
+        normalized_key = str(key).strip().lower()
+        if not normalized_key or normalized_key in seen:
+            continue
+        seen.add(normalized_key)
+        normalized.append(normalized_key)
+
+    modifiers = [key for key in MODIFIER_ORDER if key in normalized]
+    non_modifiers = [key for key in normalized if key not in MODIFIER_ORDER]
+    return modifiers + non_modifiers
+
+
+def format_shortcut_display(keys: Sequence[str]) -> str:
+    ordered = order_shortcut_keys(keys)
+    if not ordered:
+        return "None"
+
+    display_parts = []
+    for key in ordered:
+        if key in MODIFIER_SYMBOLS:
+            display_parts.append(MODIFIER_SYMBOLS[key])
+        elif key in SPECIAL_KEY_DISPLAY:
+            display_parts.append(SPECIAL_KEY_DISPLAY[key])
+        else:
+            display_parts.append(key.upper())
+    return "".join(display_parts)
+
+
+@functools.lru_cache(maxsize=None)
+def pynput_keyboard():
+    """`pynput.keyboard`, imported on first use; it pulls in Quartz and the HID bindings."""
+    from pynput import keyboard
+
+    return keyboard
+
+
+@functools.lru_cache(maxsize=None)
+def key_name_map() -> Dict[object, str]:
+    """pynput Key -> stored key name, built once pynput is loaded."""
+    Key = pynput_keyboard().Key
+    return {
+        Key.ctrl: "ctrl", Key.ctrl_l: "ctrl", Key.ctrl_r: "ctrl",
+        Key.shift: "shift", Key.shift_l: "shift", Key.shift_r: "shift",
+        Key.cmd: "cmd", Key.cmd_l: "cmd", Key.cmd_r: "cmd",
+        Key.alt: "alt", Key.alt_l: "alt", Key.alt_r: "alt", Key.alt_gr: "alt",
+        Key.space: "space", Key.enter: "enter", Key.tab: "tab", Key.esc: "esc",
+    }
@@ -0,0 +1,189 @@
+"""Apply the saved profile when a known monitor set is plugged in.
+
+A display topology is the ordered list of (persistent id, resolution) pairs
+that `displayplacer list` reports; its hash is the key. TopologyReactor
+keeps an index from topology hash to the profile that was applied for it,
+falls back to the profile saved for the same display set (ProfileStore's
+fingerprint index), and applies that profile once the burst of change
+notifications has settled.
+
+While macOS settles after the reactor's own re-layout it can briefly report
+a different set of displays, so set changes within `guard_seconds` of an
+application are looked at again when the window ends instead of acting on
+them immediately.
+"""
+import collections
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from rotator.command_runner import LatencyHistogram
+from rotator.display_state import DisplaySnapshot
+from rotator.layout import parse_layout_argument, parse_origin
+from rotator.profiles import DisplayProfile, display_set_key
+from rotator.scheduling import ThreadingScheduler
+
+REACT_APPLIED = "applied"
+REACT_FAILED = "failed"
+REACT_UNCHANGED = "unchanged"
+REACT_GUARDED = "guarded"
+REACT_NO_PROFILE = "no_profile"
+REACT_ALREADY_APPLIED = "already_applied"
+REACT_NO_DISPLAYS = "no_displays"
+REACT_DISABLED = "disabled"
+
+
+def topology_hash(entries: Iterable[Tuple[str, Optional[str]]]) -> str:
+    """Short stable hash of ordered (persistent id, resolution) pairs."""
+    text = "\n".join(f"{persistent_id} {resolution or '?'}" for persistent_id, resolution in entries)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def snapshot_topology(snapshot: DisplaySnapshot) -> str:
+    return topology_hash((record.persistent_id, record.resolution) for record in snapshot.records())
+
+
+def profile_is_applied(profile: DisplayProfile, snapshot: DisplaySnapshot) -> bool:
+    """True when every display already has the profile's resolution, origin and degree."""
+    for argument in profile.layout:
+        fields = parse_layout_argument(argument)
+        for persistent_id in fields["id"].split("+"):
+            record = snapshot.record(persistent_id)
+            if record is None or record.resolution != fields["res"]:
+                return False
+            if record.origin != parse_origin(fields["origin"]) or record.rotation != int(fields["degree"]):
+                return False
+    return True
+
+
+class TopologyReactor:
+    """Turns display-change bursts into at most one profile application.
+
+    Only a change in the set of connected displays triggers anything; a
+    display rotated by hand keeps its set and is left alone. `notice()` is
+    cheap and called for every change notification; it remembers when the
+    burst started, for the hot-plug-to-applied latency. `react()` reads the
+    displays and may apply a profile, so it runs on the controller's action
+    worker. A set change inside the guard window is not dropped: `recheck`
+    is scheduled for the end of the window. `index` maps topology hashes to
+    profile names; `on_learn` receives it whenever it grows so the owner can
+    persist it.
+    """
+
+    def __init__(
+        self,
+        controller,
+        guard_seconds: float = 5.0,
+        enabled: bool = True,
+        index: Optional[Dict[str, str]] = None,
+        on_learn: Optional[Callable[[Dict[str, str]], None]] = None,
+        recheck: Optional[Callable[[], None]] = None,
+        scheduler=None,
+    ):
+        self.controller = controller
+        self.guard_seconds = guard_seconds
+        self.enabled = enabled
+        self.index: Dict[str, str] = dict(index or {})
+        self._on_learn = on_learn
+        self._recheck = recheck
+        self._scheduler = scheduler or ThreadingScheduler()
+        self._lock = threading.Lock()
+        self._detected_at: Optional[float] = None
+        self._last_set_key: Optional[str] = None
+        self._guard_until = 0.0
+        self._recheck_pending = False
+        self.outcomes: "collections.Counter[str]" = collections.Counter()
+        self.latency = LatencyHistogram()
+        self.last_latency: Optional[float] = None
+
+    def prime(self) -> None:
+        """Remember the current display set so the next reaction needs a real change."""
+        snapshot = self.controller.display_cache.get()
+        if snapshot.records():
+            with self._lock:
+                self._last_set_key = display_set_key(record.persistent_id for record in snapshot.records())
+
+    def notice(self) -> None:
+        with self._lock:
+            if self._detected_at is None:
+                self._detected_at = self._scheduler.now()
+
+    def react(self) -> str:
+        outcome = self._react()
+        with self._lock:
+            self.outcomes[outcome] += 1
+        if outcome == REACT_APPLIED:
+            logging.info(f"Display topology reaction: applied {self.last_latency * 1000.0:.0f}ms after the change")
+        elif outcome != REACT_UNCHANGED:
+            logging.info(f"Display topology reaction: {outcome}")
+        return outcome
+
+    def _fire_recheck(self) -> None:
+        with self._lock:
+            self._recheck_pending = False
+        if self._recheck:
+            self._recheck()
+
+    def _react(self) -> str:
+        if not self.enabled:
+            return REACT_DISABLED
+        snapshot = self.controller.display_cache.get(0.0)
+        records = snapshot.records()
+        if not records:
+            return REACT_NO_DISPLAYS
+        set_key = display_set_key(record.persistent_id for record in records)
+        now = self._scheduler.now()
+        with self._lock:
+            if set_key == self._last_set_key:
+                self._detected_at = None
+                return REACT_UNCHANGED
+            if now < self._guard_until:
+                # Probably macOS settling after our own re-layout; look again once the window ends
+                if not self._recheck_pending:
+                    self._recheck_pending = True
+                    self._scheduler.call_later(self._guard_until - now, self._fire_recheck)
+                return REACT_GUARDED
+            self._last_set_key = set_key
+            detected_at, self._detected_at = self._detected_at, None
+        started = detected_at if detected_at is not None else now
+
+        topology = snapshot_topology(snapshot)
+        name = self.index.get(topology)
+        profile = self.controller.profiles.get(name) if name else None
+        if profile is None or profile.key != set_key:
+            # Unknown topology, or the learned profile was since re-saved for other displays
+            profile = self.controller.profiles.match(record.persistent_id for record in records)
+        if profile is None:
+            return REACT_NO_PROFILE
+        if profile_is_applied(profile, snapshot):
+            return REACT_ALREADY_APPLIED
+
+        logging.info(f"Display topology {topology} matches profile '{profile.name}', applying it")
+        applied = self.controller.apply_profile(profile.name)
+        finished = self._scheduler.now()
+        with self._lock:
+            # Notifications from our own re-layout must not start the next hot-plug timing
+            self._detected_at = None
+            self._guard_until = finished + self.guard_seconds
+        if not applied:
+            return REACT_FAILED
+
+        self.last_latency = finished - started
+        self.latency.record(self.last_latency)
+        if self.index.get(topology) != profile.name:
+            self.index[topology] = profile.name
+            if self._on_learn:
+                self._on_learn(dict(self.index))
+        return REACT_APPLIED
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            outcomes = dict(self.outcomes)
+        return {
+            "enabled": self.enabled,
+            "known_topologies": len(self.index),
+            "outcomes": outcomes,
+            "last_latency_ms": None if self.last_latency is None else round(self.last_latency * 1000.0, 1),
+            "latency": self.latency.snapshot(),
+        }
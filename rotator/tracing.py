@@ -0,0 +1,256 @@
+"""Span timings for rotations, kept in a ring buffer.
+
+    with tracer.rotation("set_rotation", target_degree=90) as trace:
+        with tracer.span("snapshot"):
+            ...
+        trace.set(outcome="ok")
+
+Each finished rotation becomes a RotationTrace; `recent()` returns them as
+plain dicts that `to_jsonl` and `to_chrome_trace` turn into JSON lines or
+the Chrome trace event format (chrome://tracing, ui.perfetto.dev). When the
+tracer is disabled, or a span is opened outside a rotation, the context
+managers are a shared no-op object.
+"""
+import collections
+import itertools
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+TraceDict = Dict[str, object]
+
+
+@dataclass
+class Span:
+    name: str
+    # Seconds since the rotation started
+    start: float
+    depth: int
+    duration: float = 0.0
+    attributes: Dict[str, object] = field(default_factory=dict)
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> TraceDict:
+        return {
+            "name": self.name,
+            "start_ms": round(self.start * 1000.0, 3),
+            "duration_ms": round(self.duration * 1000.0, 3),
+            "depth": self.depth,
+            "attributes": self.attributes,
+        }
+
+
+@dataclass
+class RotationTrace:
+    trace_id: int
+    name: str
+    # Wall-clock start, for lining traces up with the debug log
+    started_at: float
+    thread_id: int
+    attributes: Dict[str, object] = field(default_factory=dict)
+    spans: List[Span] = field(default_factory=list)
+    duration: float = 0.0
+    # Tracer clock reading at the start; span offsets are measured from it
+    clock_start: float = field(default=0.0, repr=False)
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> TraceDict:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000.0, 3),
+            "pid": os.getpid(),
+            "thread_id": self.thread_id,
+            "attributes": self.attributes,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+    def summary(self) -> str:
+        phases = ", ".join(
+            f"{span.name} {span.duration * 1000.0:.1f}ms" for span in self.spans if span.depth == 0
+        )
+        outcome = self.attributes.get("outcome", "unknown")
+        return f"{self.name} {outcome} in {self.duration * 1000.0:.1f}ms ({phases or 'no phases'})"
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("_tracer", "_trace", "_span", "_started", "_calls")
+
+    def __init__(self, tracer: "Tracer", trace: RotationTrace, span: Span):
+        self._tracer = tracer
+        self._trace = trace
+        self._span = span
+
+    def __enter__(self) -> Span:
+        self._tracer._local.depth += 1
+        self._calls = self._tracer._subprocess_calls()
+        self._started = self._tracer._clock()
+        self._span.start = self._started - self._trace.clock_start
+        return self._span
+
+    def __exit__(self, exc_type, exc, _traceback) -> bool:
+        span = self._span
+        span.duration = self._tracer._clock() - self._started
+        if self._calls is not None:
+            span.attributes["subprocesses"] = self._tracer._subprocess_calls() - self._calls
+        if exc_type is not None:
+            span.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        self._tracer._local.depth -= 1
+        return False
+
+
+class _ActiveRotation:
+    __slots__ = ("_tracer", "_trace", "_started", "_calls")
+
+    def __init__(self, tracer: "Tracer", trace: RotationTrace):
+        self._tracer = tracer
+        self._trace = trace
+
+    def __enter__(self) -> RotationTrace:
+        local = self._tracer._local
+        local.trace = self._trace
+        local.depth = 0
+        self._calls = self._tracer._subprocess_calls()
+        self._started = self._trace.clock_start = self._tracer._clock()
+        return self._trace
+
+    def __exit__(self, exc_type, exc, _traceback) -> bool:
+        trace = self._trace
+        trace.duration = self._tracer._clock() - self._started
+        if self._calls is not None:
+            trace.attributes["subprocesses"] = self._tracer._subprocess_calls() - self._calls
+        if exc_type is not None:
+            trace.attributes.setdefault("outcome", "error")
+            trace.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        self._tracer._local.trace = None
+        self._tracer._finish(trace)
+        return False
+
+
+class Tracer:
+    """Records the phases of each rotation into a ring buffer of the last `capacity` rotations.
+
+    Traces are per thread: spans opened on a thread that is not inside
+    `rotation()` are ignored, and a `rotation()` nested in another one (a
+    toggle that calls set_rotation) becomes a span of the outer rotation.
+    `subprocess_calls`, when given, is sampled around every span so the
+    trace shows how many displayplacer processes each phase started.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 20,
+        enabled: bool = True,
+        subprocess_calls: Optional[Callable[[], int]] = None,
+        clock: Callable[[], float] = time.perf_counter,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.enabled = enabled
+        self.subprocess_calls = subprocess_calls
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._traces = collections.deque(maxlen=max(1, capacity))
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self.last_trace: Optional[RotationTrace] = None
+
+    def _subprocess_calls(self) -> Optional[int]:
+        return self.subprocess_calls() if self.subprocess_calls else None
+
+    def _current(self) -> Optional[RotationTrace]:
+        return getattr(self._local, "trace", None)
+
+    def rotation(self, name: str, **attributes):
+        if not self.enabled:
+            return NULL_SPAN
+        current = self._current()
+        if current is not None:
+            return self.span(name, **attributes)
+        trace = RotationTrace(
+            trace_id=next(self._ids),
+            name=name,
+            started_at=self._wall_clock(),
+            thread_id=threading.get_ident(),
+            attributes=dict(attributes),
+        )
+        return _ActiveRotation(self, trace)
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return NULL_SPAN
+        trace = self._current()
+        if trace is None:
+            return NULL_SPAN
+        span = Span(name=name, start=0.0, depth=self._local.depth, attributes=dict(attributes))
+        trace.spans.append(span)
+        return _ActiveSpan(self, trace, span)
+
+    def _finish(self, trace: RotationTrace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+            self.last_trace = trace
+
+    def recent(self, count: Optional[int] = None) -> List[TraceDict]:
+        """The last `count` rotations (all buffered ones by default), oldest first."""
+        with self._lock:
+            traces = list(self._traces)
+        if count is not None:
+            traces = traces[-count:] if count > 0 else []
+        return [trace.to_dict() for trace in traces]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+
+def to_jsonl(traces: Sequence[TraceDict]) -> str:
+    return "".join(json.dumps(trace) + "\n" for trace in traces)
+
+
+def to_chrome_trace(traces: Sequence[TraceDict]) -> Dict[str, object]:
+    """Chrome trace event format: one complete ("X") event per rotation and per span."""
+    events = []
+    for trace in traces:
+        origin_us = float(trace["started_at"]) * 1_000_000.0
+        common = {"cat": "rotation", "ph": "X", "pid": trace.get("pid", 0), "tid": trace.get("thread_id", 0)}
+        events.append({
+            **common,
+            "name": trace["name"],
+            "ts": round(origin_us, 1),
+            "dur": round(float(trace["duration_ms"]) * 1000.0, 1),
+            "args": {"trace_id": trace["trace_id"], **trace.get("attributes", {})},
+        })
+        for span in trace.get("spans", []):
+            events.append({
+                **common,
+                "name": span["name"],
+                "ts": round(origin_us + float(span["start_ms"]) * 1000.0, 1),
+                "dur": round(float(span["duration_ms"]) * 1000.0, 1),
+                "args": span.get("attributes", {}),
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
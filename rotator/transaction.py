@@ -0,0 +1,315 @@
+"""Layout changes as transactions: capture, apply, verify, then commit or roll back.
+
+A RotationTransaction captures the full displayplacer restore command once,
+from the snapshot the caller already read. `execute()` tries one or more
+plans (layout argument lists) under a RetryPolicy and verifies each one. If
+a plan fails after moving some displays, they are put back before the next
+plan runs. A transaction that fails altogether is rolled back with the
+captured command, which displayplacer applies in a single call.
+
+A verified transaction is either committed, which runs `on_commit` to
+persist layouts, or held by `await_confirmation()`. A held transaction rolls
+itself back unless it is committed in time; this is the safety revert for
+built-in display rotations. Every transition out of APPLIED happens once,
+whichever of the user, the timeout or a caller gets there first.
+"""
+import dataclasses
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from rotator.countdown import ConfirmationCountdown
+from rotator.display_state import DisplaySnapshot
+from rotator.latency_model import MAX_TIMEOUT, VerifyTiming
+from rotator.scheduling import ThreadingScheduler
+
+TX_OPEN = "open"
+TX_APPLIED = "applied"
+TX_COMMITTED = "committed"
+TX_ROLLING_BACK = "rolling_back"
+TX_ROLLED_BACK = "rolled_back"
+# The rollback itself failed; the displays are in an unknown arrangement
+TX_FAILED = "failed"
+
+# (trace phase, displayplacer layout arguments)
+Plan = Tuple[str, Sequence[str]]
+# verify(timing) -> whether the change became visible in time
+Verify = Callable[[VerifyTiming], bool]
+
+ATTEMPT_CONFIRMED = "confirmed"
+ATTEMPT_UNCONFIRMED = "unconfirmed"
+ATTEMPT_FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How hard a transaction tries before rolling back.
+
+    Each plan gets `attempts` tries. The n-th retry waits
+    backoff * multiplier**(n-1) seconds, capped at `max_backoff` and scaled
+    by a random factor in [1 - jitter, 1 + jitter]. Everything a request
+    does, including a rollback, fits in `deadline` seconds. `verify_timeout`
+    is how long to wait for displays the latency model knows nothing about.
+    """
+
+    attempts: int = 3
+    backoff: float = 0.5
+    multiplier: float = 2.0
+    max_backoff: float = 2.0
+    jitter: float = 0.2
+    deadline: float = 10.0
+    verify_timeout: float = 3.0
+
+    def delay(self, retry: int, rng=random) -> float:
+        delay = min(self.max_backoff, self.backoff * self.multiplier ** max(0, retry - 1))
+        if self.jitter > 0:
+            delay *= rng.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+        return max(0.0, delay)
+
+    @classmethod
+    def from_config(cls, value: object) -> "RetryPolicy":
+        """Policy from the config's "rotation_retry" dict; missing or invalid entries keep the defaults."""
+        if not isinstance(value, dict):
+            return cls()
+        overrides: Dict[str, float] = {}
+        for field in dataclasses.fields(cls):
+            if field.name not in value:
+                continue
+            try:
+                number = float(value[field.name])
+            except (TypeError, ValueError):
+                continue
+            if number >= 0:
+                overrides[field.name] = number
+        if "attempts" in overrides:
+            overrides["attempts"] = max(1, int(overrides["attempts"]))
+        return cls(**overrides)
+
+
+class RotationTransaction:
+    """One layout change against `controller`.
+
+    Uses the controller's apply_layout, display_cache, display_change_signal,
+    latency_model and tracer.
+
+    `snapshot` is the display state before the change; its restore command
+    is the rollback target. `sleep`, `clock`, `rng` and `scheduler` are
+    injectable so tests can run without real waits.
+    """
+
+    def __init__(
+        self,
+        controller,
+        snapshot: DisplaySnapshot,
+        policy: Optional[RetryPolicy] = None,
+        on_commit: Optional[Callable[[], None]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+        rng=random,
+        scheduler=None,
+    ):
+        self.controller = controller
+        self.policy = policy or RetryPolicy()
+        self.pre_state = snapshot.restore_command()
+        self.pre_rotations = {record.persistent_id: record.rotation for record in snapshot.records()}
+        self._on_commit = on_commit
+        self._sleep = sleep
+        self._clock = clock
+        self._rng = rng
+        self._scheduler = scheduler or ThreadingScheduler()
+        self._lock = threading.Lock()
+        # Set by await_confirmation()
+        self.countdown: Optional[ConfirmationCountdown] = None
+        self.state = TX_OPEN
+        # Phase of the plan that took effect, e.g. "saved_layout_apply"
+        self.applied_phase: Optional[str] = None
+        self.attempts = 0
+        self.error = ""
+        # Set by execute() from the latency model of the displays being changed
+        self.displays: Tuple[str, ...] = ()
+        self.timing = VerifyTiming(self.policy.verify_timeout)
+        # Seconds from the last successful apply call returning to the read that confirmed it
+        self.confirm_latency = 0.0
+
+    @property
+    def awaiting_confirmation(self) -> bool:
+        with self._lock:
+            countdown = self.countdown if self.state == TX_APPLIED else None
+        return countdown is not None and countdown.running
+
+    def execute(self, plans: Sequence[Plan], verify: Verify, displays: Sequence[str] = ()) -> bool:
+        """Apply plans in order until one passes `verify(timing)`; True leaves the transaction APPLIED.
+
+        `displays` are the persistent ids whose change `verify` waits for;
+        their latency model sets the timeout and polling in `timing`, and a
+        confirmed change is fed back into it. Verification after an
+        apply that went through but was never confirmed waits twice as long,
+        since that display is slower than the model thought.
+
+        On failure the displays are restored to the captured state if any of
+        them moved, and the transaction ends ROLLED_BACK (or FAILED when even
+        that did not work). Attempts and their verification stop early
+        enough for that rollback to fit in the policy deadline as well.
+        """
+        tracer = self.controller.tracer
+        model = self.controller.latency_model
+        self.displays = tuple(displays)
+        self.timing = model.timing(self.displays, self.policy.verify_timeout)
+        deadline = self._clock() + self.policy.deadline
+        reserve = min(self.timing.timeout, self.policy.deadline / 2.0) if self.pre_state else 0.0
+        retry_deadline = deadline - reserve
+        unconfirmed = 0
+        for index, (phase, layout_args) in enumerate(plans):
+            if index:
+                if self._clock() >= retry_deadline:
+                    break
+                if self._drifted():
+                    # The previous plan moved other displays; start this one from the captured state
+                    self._restore(min(self.timing.timeout, max(0.0, retry_deadline - self._clock())))
+            for attempt in range(1, self.policy.attempts + 1):
+                wait = min(self.timing.timeout * 2 ** unconfirmed, MAX_TIMEOUT, max(0.0, retry_deadline - self._clock()))
+                result = self._attempt(phase, layout_args, attempt, verify, wait)
+                if result == ATTEMPT_CONFIRMED:
+                    if not unconfirmed:
+                        # A confirmation after an unconfirmed apply may belong to either one; skip it (Karn's rule)
+                        model.observe(self.displays, self.confirm_latency)
+                    with self._lock:
+                        self.state = TX_APPLIED
+                        self.applied_phase = phase
+                    return True
+                if result == ATTEMPT_UNCONFIRMED:
+                    unconfirmed += 1
+                if attempt == self.policy.attempts:
+                    break
+                delay = self.policy.delay(attempt, self._rng)
+                if self._clock() + delay >= retry_deadline:
+                    break
+                with tracer.span("retry_backoff") as span:
+                    span.set(delay=round(delay, 3))
+                    self._sleep(delay)
+            logging.warning(f"Layout plan {phase} did not apply: {self.error or 'rotation not visible'}")
+
+        restored = not self._drifted() or self._restore(min(MAX_TIMEOUT, max(0.0, deadline - self._clock())))
+        with self._lock:
+            self.state = TX_ROLLED_BACK if restored else TX_FAILED
+        return False
+
+    def _attempt(self, phase: str, layout_args: Sequence[str], attempt: int, verify: Verify, wait: float) -> str:
+        tracer = self.controller.tracer
+        with tracer.span(phase, attempt=attempt) as span:
+            generation = self.controller.display_change_signal.generation
+            return_code, _, error = self.controller.apply_layout(layout_args)
+            result = ATTEMPT_FAILED
+            if return_code == 0:
+                with tracer.span("wait_for_rotation") as wait_span:
+                    wait_span.set(timeout=round(wait, 3))
+                    applied_at = self._clock()
+                    check_times: List[float] = []
+                    confirmed = verify(
+                        self.timing._replace(
+                            timeout=wait, since_generation=generation, check_times=check_times, clock=self._clock
+                        )
+                    )
+                    # Up to the start of the read that saw the change, so slow reads do not inflate the estimate
+                    self.confirm_latency = (check_times[-1] if check_times else self._clock()) - applied_at
+                result = ATTEMPT_CONFIRMED if confirmed else ATTEMPT_UNCONFIRMED
+            span.set(return_code=return_code, applied=result == ATTEMPT_CONFIRMED)
+        self.attempts += 1
+        self.error = error
+        return result
+
+    def _drifted(self) -> bool:
+        """True when a fresh read no longer matches the captured state."""
+        if not self.pre_state:
+            return False
+        return self.controller.display_cache.get(0.0).restore_command() != self.pre_state
+
+    def _pre_state_visible(self, refresh: bool) -> bool:
+        current = self.controller.display_cache.get(0.0 if refresh else None)
+        for persistent_id, rotation in self.pre_rotations.items():
+            record = current.record(persistent_id)
+            # A display unplugged meanwhile cannot be checked and does not block the rollback
+            if record is not None and record.rotation != rotation:
+                return False
+        return True
+
+    def _restore(self, timeout: float) -> bool:
+        if not self.pre_state:
+            logging.error("Cannot roll back display layout: no restore command was captured")
+            return False
+        signal = self.controller.display_change_signal
+        with self.controller.tracer.span("rollback") as span:
+            generation = signal.generation
+            return_code, _, error = self.controller.apply_layout(self.pre_state)
+            timing = self.timing._replace(timeout=timeout, since_generation=generation)
+            restored = return_code == 0 and timing.wait(self._pre_state_visible, signal)
+            span.set(return_code=return_code, restored=restored)
+        if not restored:
+            logging.error(f"Rolling back display layout failed: {error or 'previous rotation did not come back'}")
+        return restored
+
+    def _leave_applied(self, state: str) -> bool:
+        with self._lock:
+            if self.state != TX_APPLIED:
+                return False
+            self.state = state
+            countdown = self.countdown
+        if countdown:
+            if state == TX_COMMITTED:
+                countdown.confirm()
+            else:
+                countdown.cancel()
+        return True
+
+    def commit(self) -> bool:
+        """Keep the applied layout and run `on_commit`; False if the transaction already ended."""
+        if not self._leave_applied(TX_COMMITTED):
+            return False
+        if self._on_commit:
+            with self.controller.tracer.span("commit"):
+                self._on_commit()
+        return True
+
+    def rollback(self) -> bool:
+        """Restore the captured layout; False if the transaction already ended or the restore failed."""
+        if not self._leave_applied(TX_ROLLING_BACK):
+            return False
+        return self._finish_rollback()
+
+    def _finish_rollback(self) -> bool:
+        restored = self._restore(self.timing.timeout)
+        with self._lock:
+            self.state = TX_ROLLED_BACK if restored else TX_FAILED
+        return restored
+
+    def await_confirmation(
+        self,
+        timeout: float,
+        on_timeout: Optional[Callable[[bool], None]] = None,
+        on_tick: Optional[Callable[[int], None]] = None,
+    ) -> bool:
+        """Hold the applied layout for `timeout` seconds, then roll back unless committed.
+
+        `on_timeout(restored)` runs after an automatic rollback, not after
+        an explicit commit() or rollback(). `on_tick(seconds_left)` runs once
+        a second while the countdown is running.
+        """
+        with self._lock:
+            if self.state != TX_APPLIED or self.countdown is not None:
+                return False
+            self.countdown = ConfirmationCountdown(
+                self._scheduler, timeout, on_expire=lambda: self._confirmation_expired(on_timeout), on_tick=on_tick
+            )
+            self.countdown.start()
+            return True
+
+    def _confirmation_expired(self, on_timeout: Optional[Callable[[bool], None]]) -> None:
+        if not self._leave_applied(TX_ROLLING_BACK):
+            return
+        logging.info("Layout change was not confirmed in time, rolling back")
+        restored = self._finish_rollback()
+        if on_timeout:
+            on_timeout(restored)
@@ -0,0 +1,91 @@
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
+
+UITask = Tuple[object, ...]
+
+
+class MainThreadDispatcher:
+    """Collects UI tasks from any thread and drains them in batches on the main thread.
+
+    `wake` is called at most once per batch, only when the queue goes from
+    empty to non-empty; it must arrange for `drain()` to run on the main
+    thread (performSelectorOnMainThread in the app, `EventWaker` elsewhere).
+    Nothing runs while the queue is idle.
+    """
+
+    def __init__(self, handle: Callable[[UITask], None], wake: Optional[Callable[[], None]] = None):
+        self._handle = handle
+        self._wake = wake or (lambda: None)
+        self._lock = threading.Lock()
+        self._tasks: Deque[UITask] = deque()
+        self._wake_pending = False
+        self.wakeups = 0
+        self.tasks_handled = 0
+        self.largest_batch = 0
+
+    def set_wake(self, wake: Callable[[], None]) -> None:
+        self._wake = wake
+
+    def post(self, task: UITask) -> None:
+        with self._lock:
+            self._tasks.append(task)
+            if self._wake_pending:
+                return
+            self._wake_pending = True
+        self._wake()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._tasks)
+
+    def drain(self) -> int:
+        with self._lock:
+            batch = list(self._tasks)
+            self._tasks.clear()
+            # Tasks posted while this batch runs schedule their own wakeup
+            self._wake_pending = False
+        if not batch:
+            return 0
+        self.wakeups += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for task in batch:
+            try:
+                self._handle(task)
+            except Exception as e:
+                logging.error(f"Error processing UI task {task[0]}: {e}")
+        self.tasks_handled += len(batch)
+        return len(batch)
+
+
+class EventWaker:
+    """Pure-Python wakeup for a MainThreadDispatcher, for headless use and tests.
+
+    The owning thread calls `run_once(timeout)` (or `run_forever()`), which
+    sleeps on an Event until `wake()` is called and then drains the dispatcher
+    on that thread.
+    """
+
+    def __init__(self, dispatcher: MainThreadDispatcher):
+        self.dispatcher = dispatcher
+        self._event = threading.Event()
+        self._stopped = False
+        dispatcher.set_wake(self.wake)
+
+    def wake(self) -> None:
+        self._event.set()
+
+    def run_once(self, timeout: Optional[float] = None) -> int:
+        if not self._event.wait(timeout):
+            return 0
+        self._event.clear()
+        return self.dispatcher.drain()
+
+    def run_forever(self) -> None:
+        while not self._stopped:
+            self.run_once()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._event.set()
@@ -14,7 +14,7 @@ OPTIONS = {
         'CFBundleShortVersionString': '2.4.0',
         'NSHighResolutionCapable': True,
     },
-    'packages': ['rumps', 'pynput'],
+    'packages': ['rumps', 'pynput', 'rotator'],
     'excludes': [
         # Keep excludes minimal to avoid stripping py2app/runtime dependencies.
         'tkinter',
@@ -0,0 +1,27 @@
+from rotator.config_store import ConfigStore
+from rotator.controller import RotationController
+from rotator.scheduling import ManualScheduler
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RecordingController(RotationController):
+    """RotationController over a backend whose config writes wait for an explicit flush."""
+
+    def __init__(self, config_path: str, backend):
+        self.init_rotation(ConfigStore(config_path, scheduler=ManualScheduler()), None, backend)
+        self.notifications = []
+
+    def notify(self, title, subtitle, message=""):
+        self.notifications.append(f"{title}: {subtitle}")
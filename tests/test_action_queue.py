@@ -0,0 +1,134 @@
+import threading
+import unittest
+
+from rotator.action_queue import (
+    SUBMIT_COALESCED,
+    SUBMIT_FULL,
+    SUBMIT_QUEUED,
+    SUBMIT_RATE_LIMITED,
+    ActionQueue,
+    TokenBucket,
+)
+from rotator.controller import action_coalesce_key
+from tests.helpers import FakeClock
+
+
+class BlockingExecutor:
+    """Holds the worker inside the first action until released."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.executed = []
+
+    def __call__(self, action):
+        self.started.set()
+        self.release.wait(5.0)
+        self.executed.append(action)
+        return action != "fails"
+
+
+class TokenBucketTests(unittest.TestCase):
+    def test_refills_at_the_configured_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+
+        self.assertEqual([bucket.take() for _ in range(3)], [True, True, False])
+        clock.now = 0.5
+        self.assertEqual([bucket.take(), bucket.take()], [True, False])
+
+    def test_zero_rate_never_limits(self):
+        bucket = TokenBucket(rate=0.0, burst=1, clock=FakeClock())
+        self.assertTrue(all(bucket.take() for _ in range(100)))
+
+
+class ActionQueueTests(unittest.TestCase):
+    def setUp(self):
+        self.executor = BlockingExecutor()
+        self.clock = FakeClock()
+        self.queue = ActionQueue(self.executor, maxsize=2, coalesce_key=action_coalesce_key, clock=self.clock)
+
+    def tearDown(self):
+        self.executor.release.set()
+        self.queue.close()
+
+    def start_in_flight(self, action="toggle"):
+        self.assertEqual(self.queue.submit(action), SUBMIT_QUEUED)
+        self.assertTrue(self.executor.started.wait(5.0))
+
+    def finish(self):
+        self.executor.release.set()
+        self.assertTrue(self.queue.wait_idle(5.0))
+
+    def test_last_request_during_a_rotation_wins(self):
+        self.start_in_flight()
+
+        self.assertEqual(self.queue.submit("rotate_90"), SUBMIT_QUEUED)
+        self.assertEqual(self.queue.submit("rotate_0"), SUBMIT_COALESCED)
+        self.finish()
+
+        self.assertEqual(self.executor.executed, ["toggle", "rotate_0"])
+        stats = self.queue.stats()
+        self.assertEqual((stats["executed"], stats["coalesced"], stats["dropped"]), (2, 1, 0))
+
+    def test_display_set_requests_queue_separately(self):
+        self.start_in_flight()
+
+        self.queue.submit("toggle_set")
+        self.queue.submit("rotate_270")
+        self.finish()
+
+        self.assertEqual(self.executor.executed, ["toggle", "toggle_set", "rotate_270"])
+
+    def test_hot_plug_check_does_not_replace_a_picked_profile(self):
+        self.start_in_flight()
+
+        self.assertEqual(self.queue.submit("profile:desk"), SUBMIT_QUEUED)
+        self.assertEqual(self.queue.submit("auto_profile"), SUBMIT_QUEUED)
+        self.finish()
+
+        self.assertEqual(self.executor.executed, ["toggle", "profile:desk", "auto_profile"])
+
+    def test_bounded_queue_drops_new_keys(self):
+        queue = ActionQueue(self.executor, maxsize=1, clock=self.clock)
+        self.assertEqual(queue.submit("toggle"), SUBMIT_QUEUED)
+        self.assertTrue(self.executor.started.wait(5.0))
+
+        self.assertEqual(queue.submit("rotate_90"), SUBMIT_QUEUED)
+        self.assertEqual(queue.submit("rotate_0"), SUBMIT_FULL)
+        self.executor.release.set()
+        self.assertTrue(queue.wait_idle(5.0))
+
+        self.assertEqual(self.executor.executed, ["toggle", "rotate_90"])
+        self.assertEqual(queue.stats()["queue_full"], 1)
+        queue.close()
+
+    def test_rate_limit_is_per_action(self):
+        queue = ActionQueue(self.executor, rate=1.0, burst=1, clock=self.clock)
+        self.executor.release.set()
+
+        self.assertEqual(queue.submit("toggle"), SUBMIT_QUEUED)
+        self.assertEqual(queue.submit("toggle"), SUBMIT_RATE_LIMITED)
+        self.assertNotEqual(queue.submit("rotate_0"), SUBMIT_RATE_LIMITED)
+        self.clock.now = 1.0
+        self.assertNotEqual(queue.submit("toggle"), SUBMIT_RATE_LIMITED)
+        self.assertTrue(queue.wait_idle(5.0))
+
+        self.assertEqual(queue.stats()["rate_limited"], 1)
+        self.assertEqual(queue.dropped, 1)
+        queue.close()
+
+    def test_failures_are_counted_and_the_worker_keeps_going(self):
+        self.executor.release.set()
+        self.queue.submit("fails")
+        self.assertTrue(self.queue.wait_idle(5.0))
+        self.queue.submit("toggle")
+        self.assertTrue(self.queue.wait_idle(5.0))
+
+        stats = self.queue.stats()
+        self.assertEqual((stats["executed"], stats["failed"]), (2, 1))
+        self.assertFalse(self.queue.busy())
+
+
+if __name__ == "__main__":
+    unittest.main()
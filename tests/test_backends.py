@@ -0,0 +1,82 @@
+import unittest
+
+from rotator.backends import (
+    SIMULATED_DISPLAYS,
+    DisplayBackend,
+    DisplayplacerBackend,
+    SimulatedBackend,
+    create_display_backend,
+)
+from rotator.layout import record_layout_argument
+from tests.helpers import FakeClock
+
+BUILT_IN, EXTERNAL = (record.persistent_id for record in SIMULATED_DISPLAYS)
+
+
+class SimulatedBackendTests(unittest.TestCase):
+    def test_rotate_swaps_resolution_and_reports_timings(self):
+        backend = SimulatedBackend()
+        changes = []
+        backend.add_change_listener(lambda: changes.append(True))
+
+        self.assertEqual(backend.rotate(EXTERNAL, 90), (0, "", ""))
+
+        record = backend.get_display(EXTERNAL)
+        self.assertEqual((record.rotation, record.resolution), (90, "1440x2560"))
+        self.assertEqual(changes, [True])
+        self.assertEqual(set(backend.stats()), {"get", "list", "apply", "rotate"})
+        self.assertEqual(backend.stats()["apply"]["count"], 1)
+
+    def test_restore_command_round_trips_through_apply(self):
+        backend = SimulatedBackend()
+        restore_command = backend.list_displays().restore_command
+        self.assertEqual(restore_command[1], record_layout_argument(SIMULATED_DISPLAYS[1]))
+
+        backend.rotate(EXTERNAL, 90)
+        backend.apply_layout(restore_command)
+        self.assertEqual(backend.list_displays().displays, SIMULATED_DISPLAYS)
+
+    def test_changes_become_visible_after_the_delay(self):
+        clock = FakeClock()
+        backend = SimulatedBackend(visibility_delay=0.5, clock=clock)
+
+        backend.rotate(EXTERNAL, 90)
+        self.assertEqual(backend.get_display(EXTERNAL).rotation, 0)
+        clock.now = 0.5
+        self.assertEqual(backend.get_display(EXTERNAL).rotation, 90)
+
+    def test_failures_and_unknown_displays_are_reported(self):
+        self.assertEqual(SimulatedBackend(fail_apply=True).rotate(EXTERNAL, 90)[0], 1)
+        self.assertEqual(SimulatedBackend().apply_layout(["id:MISSING degree:90"])[0], 1)
+        self.assertEqual(SimulatedBackend().rotate("MISSING", 90)[0], -1)
+
+
+class CreateDisplayBackendTests(unittest.TestCase):
+    def test_selects_by_name_and_falls_back_to_displayplacer(self):
+        self.assertIsInstance(create_display_backend("simulated"), SimulatedBackend)
+        for name in (None, "displayplacer", "no-such-backend"):
+            backend = create_display_backend(name, displayplacer_path="/usr/bin/false", runner_name="subprocess")
+            self.assertIsInstance(backend, DisplayplacerBackend)
+            backend.close()
+
+    def test_incomplete_backend_cannot_be_created(self):
+        class ReadOnlyBackend(DisplayBackend):
+            def list_displays(self):
+                return None
+
+        with self.assertRaises(TypeError):
+            ReadOnlyBackend()
+
+    def test_coregraphics_without_quartz_uses_displayplacer(self):
+        try:
+            import Quartz  # noqa: F401
+        except ImportError:
+            backend = create_display_backend("coregraphics", displayplacer_path="/usr/bin/false", runner_name="subprocess")
+            self.assertIsInstance(backend, DisplayplacerBackend)
+            backend.close()
+        else:
+            self.skipTest("Quartz is installed")
+
+
+if __name__ == "__main__":
+    unittest.main()
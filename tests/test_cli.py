@@ -0,0 +1,96 @@
+import contextlib
+import io
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from rotator.backends import SIMULATED_DISPLAYS
+from rotator.cli import HeadlessRotator, main
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+FAKE_DISPLAYPLACER = str(ROOT / "benchmarks" / "fake_displayplacer.py")
+EXTERNAL = SIMULATED_DISPLAYS[1].persistent_id
+
+
+class HeadlessCliTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.directory.name, "config.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_import_does_not_load_gui_modules(self):
+        code = (
+            "import sys, rotator.cli; "
+            "print([name for name in ('AppKit', 'Foundation', 'objc', 'rumps', 'pynput') if name in sys.modules])"
+        )
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "[]")
+
+    def test_list_json_reports_connected_displays(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            exit_code = main(["--config", self.config_path, "--displayplacer", FAKE_DISPLAYPLACER, "list", "--json"])
+        self.assertEqual(exit_code, 0)
+        displays = json.loads(stdout.getvalue())["displays"]
+        self.assertEqual(len(displays), 4)
+        self.assertTrue(displays[0]["is_built_in"])
+
+    def test_unknown_display_fails_without_rotating(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            exit_code = main([
+                "--config", self.config_path, "--displayplacer", FAKE_DISPLAYPLACER,
+                "rotate", "--display", "MISSING", "--degree", "90",
+            ])
+        self.assertEqual(exit_code, 1)
+        self.assertIn("Display not found", stderr.getvalue())
+
+    def test_rotate_command_uses_the_configured_backend(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            exit_code = main([
+                "--config", self.config_path, "--backend", "simulated",
+                "rotate", "--display", EXTERNAL, "--degree", "90",
+            ])
+        self.assertEqual(exit_code, 0)
+
+    def test_trace_reports_an_unreachable_app(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            exit_code = main(["trace", "--socket", os.path.join(self.directory.name, "missing.sock")])
+        self.assertEqual(exit_code, 1)
+        self.assertIn("Could not reach the menu bar app", stderr.getvalue())
+
+    def test_rotate_and_toggle_share_the_app_rotation_logic(self):
+        rotator = HeadlessRotator(self.config_path, backend_name="simulated")
+        rotator.target_display_persistent_id = EXTERNAL
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertTrue(rotator.set_rotation(90))
+            self.assertTrue(rotator.toggle(None))
+        rotator.config_store.flush()
+
+        self.assertEqual(rotator.get_display_info(EXTERNAL)["degree"], 0)
+        self.assertEqual(len(rotator.display_backend.applied), 2)
+        with open(self.config_path, encoding="utf-8") as config_file:
+            self.assertEqual(set(json.load(config_file)["layouts"]), {"landscape", "portrait"})
+
+    def test_profile_save_list_and_apply(self):
+        base = ["--config", self.config_path, "--backend", "simulated"]
+        stdout = io.StringIO()
+        with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(stdout):
+            self.assertEqual(main(base + ["profile", "save", "desk"]), 0)
+            self.assertEqual(main(base + ["profile", "list"]), 0)
+            self.assertEqual(main(base + ["profile", "apply"]), 0)
+            self.assertEqual(main(base + ["profile", "apply", "missing"]), 1)
+
+        self.assertTrue(stdout.getvalue().startswith("* desk  "))
+
+
+if __name__ == "__main__":
+    unittest.main()
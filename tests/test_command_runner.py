@@ -0,0 +1,106 @@
+import pathlib
+import sys
+import threading
+import unittest
+
+from rotator.command_runner import (
+    LatencyHistogram,
+    SpawnRunner,
+    SubprocessRunner,
+    WorkerPoolRunner,
+    create_command_runner,
+)
+
+FAKE_DISPLAYPLACER = str(pathlib.Path(__file__).resolve().parents[1] / "benchmarks" / "fake_displayplacer.py")
+
+
+class BlockingLauncher(SubprocessRunner):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def run(self, command, timeout=10.0):
+        self.started.set()
+        self.release.wait()
+        return 0, " ".join(command), ""
+
+
+class LatencyHistogramTests(unittest.TestCase):
+    def test_percentiles_use_bucket_bounds(self):
+        histogram = LatencyHistogram(bounds_ms=(10, 100))
+        for seconds in (0.001, 0.002, 0.05, 0.5):
+            histogram.record(seconds)
+        self.assertEqual(histogram.percentile(0.5), 10)
+        self.assertEqual(histogram.percentile(0.75), 100)
+        self.assertAlmostEqual(histogram.percentile(1.0), 500.0)
+        self.assertEqual(histogram.snapshot()["buckets"], {"<=10ms": 2, "<=100ms": 1, ">100ms": 1})
+
+    def test_percentiles_interpolate_within_one_bucket(self):
+        histogram = LatencyHistogram(bounds_ms=(10, 100))
+        for seconds in (0.02, 0.03, 0.04, 0.05):
+            histogram.record(seconds)
+        self.assertAlmostEqual(histogram.percentile(0.5), 35.0)
+        self.assertAlmostEqual(histogram.percentile(0.95), 48.5)
+        self.assertAlmostEqual(histogram.percentile(0.0), 20.0)
+
+    def test_empty_histogram(self):
+        self.assertIsNone(LatencyHistogram().percentile(0.5))
+
+
+class CommandRunnerTests(unittest.TestCase):
+    def test_spawn_runner_runs_fake_displayplacer(self):
+        runner = SpawnRunner()
+        return_code, output, _ = runner.run([sys.executable, FAKE_DISPLAYPLACER, "list"])
+        self.assertEqual(return_code, 0)
+        self.assertIn("Persistent screen id:", output)
+        self.assertEqual(runner.latency.count, 1)
+
+    def test_spawn_runner_reports_missing_executable(self):
+        return_code, _, error = SpawnRunner().run(["/nonexistent/displayplacer", "list"])
+        self.assertEqual(return_code, -1)
+        self.assertTrue(error)
+
+    def test_pool_runs_commands_and_records_latency(self):
+        runner = WorkerPoolRunner()
+        try:
+            return_code, _, _ = runner.run([sys.executable, FAKE_DISPLAYPLACER, "id:AAA degree:90"])
+            self.assertEqual(return_code, 0)
+            stats = runner.stats()
+            self.assertEqual(stats["latency"]["count"], 1)
+            self.assertEqual(stats["queue_latency"]["count"], 1)
+        finally:
+            runner.close()
+
+    def test_pool_rejects_when_queue_is_full(self):
+        launcher = BlockingLauncher()
+        runner = WorkerPoolRunner(launcher=launcher, max_concurrency=1, max_queue=1)
+        results = []
+        try:
+            first = threading.Thread(target=lambda: results.append(runner.run(["first"])))
+            first.start()
+            launcher.started.wait(1.0)
+            second = threading.Thread(target=lambda: results.append(runner.run(["second"])))
+            second.start()
+            while runner._queue.qsize() < 1:
+                pass
+            self.assertEqual(runner.run(["third"])[0], -1)
+            self.assertEqual(runner.rejected, 1)
+            launcher.release.set()
+            first.join(1.0)
+            second.join(1.0)
+            self.assertEqual(sorted(output for _, output, _ in results), ["first", "second"])
+        finally:
+            launcher.release.set()
+            runner.close()
+
+    def test_unknown_runner_name_falls_back_to_pool(self):
+        runner = create_command_runner("bogus")
+        try:
+            self.assertIsInstance(runner, WorkerPoolRunner)
+        finally:
+            runner.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
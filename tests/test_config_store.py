@@ -0,0 +1,119 @@
+import json
+import os
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from rotator.config_store import ConfigStore
+from rotator.scheduling import ManualScheduler
+
+
+class ConfigStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "config.json")
+        self.scheduler = ManualScheduler()
+        self.clock_time = 0.0
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_store(self, **options):
+        return ConfigStore(self.path, scheduler=self.scheduler, clock=lambda: self.clock_time, **options)
+
+    def read_disk(self):
+        with open(self.path, encoding="utf-8") as config_file:
+            return json.load(config_file)
+
+    def test_writes_are_coalesced_into_one_flush(self):
+        store = self.make_store(flush_delay=0.5)
+        store.set("target_display_id", "AAA")
+        store.set("layouts", {"portrait": ["id:AAA degree:90"]})
+        store.set("layouts", {"portrait": ["id:AAA degree:90"], "landscape": ["id:AAA degree:0"]})
+        self.assertFalse(os.path.exists(self.path))
+        self.scheduler.advance(0.5)
+        self.assertEqual(store.flushes, 1)
+        self.assertEqual(self.read_disk()["layouts"]["landscape"], ["id:AAA degree:0"])
+        self.assertFalse(store.is_dirty())
+
+    def test_unchanged_values_do_not_schedule_writes(self):
+        store = self.make_store()
+        store.set("target_display_id", "AAA")
+        store.flush()
+        store.set("target_display_id", "AAA")
+        self.assertFalse(store.is_dirty())
+        self.assertEqual(self.scheduler.pending(), 0)
+
+    def test_reads_are_served_from_memory_and_copied(self):
+        with open(self.path, "w", encoding="utf-8") as config_file:
+            json.dump({"layouts": {"portrait": ["a"]}}, config_file)
+        store = self.make_store()
+        layouts = store.get("layouts")
+        layouts["portrait"].append("mutated")
+        self.assertEqual(store.get("layouts"), {"portrait": ["a"]})
+        self.assertEqual(store.reloads, 1)
+
+    def test_reloads_when_file_changes_underneath(self):
+        store = self.make_store(check_interval=1.0)
+        store.set("shortcuts", {"toggle": None})
+        store.flush()
+        with open(self.path, "w", encoding="utf-8") as config_file:
+            json.dump({"shortcuts": {"toggle": None}, "target_display_id": "EXTERNAL-EDIT"}, config_file)
+        os.utime(self.path, ns=(1, 1))
+        self.assertIsNone(store.get("target_display_id"))
+        self.clock_time = 2.0
+        self.assertEqual(store.get("target_display_id"), "EXTERNAL-EDIT")
+
+    def test_flush_keeps_external_keys_and_local_changes(self):
+        store = self.make_store()
+        store.set("a", 1)
+        with open(self.path, "w", encoding="utf-8") as config_file:
+            json.dump({"b": 2}, config_file)
+        store.flush()
+        self.assertEqual(self.read_disk(), {"a": 1, "b": 2})
+
+    def test_replace_deletes_missing_keys(self):
+        store = self.make_store()
+        store.update({"a": 1, "b": 2})
+        store.replace({"a": 1})
+        store.flush()
+        self.assertEqual(self.read_disk(), {"a": 1})
+
+    def test_failed_write_leaves_previous_file_intact(self):
+        store = self.make_store()
+        store.set("a", 1)
+        store.flush()
+        store.set("a", object())
+        store.flush()
+        self.assertEqual(self.read_disk(), {"a": 1})
+        self.assertTrue(store.is_dirty())
+        self.assertEqual(os.listdir(self.directory.name), ["config.json"])
+
+    def test_failed_write_is_retried_later(self):
+        store = self.make_store(flush_delay=0.5)
+        store.set("a", 1)
+        with patch("rotator.config_store.os.replace", side_effect=OSError("disk full")):
+            with self.assertLogs(level="ERROR"):
+                store.flush()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(self.scheduler.pending(), 1)
+
+        self.scheduler.advance(0.5)
+
+        self.assertEqual(self.read_disk(), {"a": 1})
+        self.assertFalse(store.is_dirty())
+
+    def test_flush_keeps_the_config_file_mode(self):
+        store = self.make_store()
+        store.set("a", 1)
+        store.flush()
+        os.chmod(self.path, 0o644)
+        store.set("a", 2)
+        store.flush()
+        self.assertEqual(self.read_disk(), {"a": 2})
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o644)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import unittest
+
+from rotator.countdown import (
+    COUNTDOWN_CANCELLED,
+    COUNTDOWN_CONFIRMED,
+    COUNTDOWN_EXPIRED,
+    COUNTDOWN_RUNNING,
+    ConfirmationCountdown,
+)
+from rotator.scheduling import ManualScheduler
+
+
+class ConfirmationCountdownTests(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = ManualScheduler()
+        self.expired = []
+        self.ticks = []
+        self.countdown = ConfirmationCountdown(
+            self.scheduler, 3.0, on_expire=lambda: self.expired.append(True), on_tick=self.ticks.append
+        )
+
+    def test_expires_once_and_ticks_the_seconds_left(self):
+        self.assertTrue(self.countdown.start())
+        self.assertFalse(self.countdown.start())
+        self.assertEqual(self.countdown.state, COUNTDOWN_RUNNING)
+
+        self.scheduler.advance(2.5)
+        self.assertEqual(self.ticks, [2, 1])
+        self.assertAlmostEqual(self.countdown.remaining(), 0.5)
+        self.scheduler.advance(10.0)
+
+        self.assertEqual((self.countdown.state, self.expired, self.ticks), (COUNTDOWN_EXPIRED, [True], [2, 1]))
+        self.assertEqual(self.countdown.remaining(), 0.0)
+        self.assertEqual(self.scheduler.pending(), 0)
+
+    def test_confirm_wins_over_a_later_timeout(self):
+        self.countdown.start()
+        self.scheduler.advance(1.0)
+
+        self.assertTrue(self.countdown.confirm())
+        self.assertFalse(self.countdown.confirm())
+        self.assertFalse(self.countdown.cancel())
+        self.scheduler.advance(10.0)
+
+        self.assertEqual((self.countdown.state, self.expired, self.ticks), (COUNTDOWN_CONFIRMED, [], [2]))
+        self.assertEqual(self.scheduler.pending(), 0)
+
+    def test_nothing_wins_after_the_timeout(self):
+        self.assertFalse(self.countdown.confirm())
+        self.countdown.start()
+        self.scheduler.advance(3.0)
+
+        self.assertFalse(self.countdown.confirm())
+        self.assertFalse(self.countdown.cancel())
+        self.assertEqual((self.countdown.state, self.expired), (COUNTDOWN_EXPIRED, [True]))
+
+    def test_concurrent_transitions_have_one_winner(self):
+        for _ in range(20):
+            scheduler = ManualScheduler()
+            expired = []
+            countdown = ConfirmationCountdown(scheduler, 1.0, on_expire=lambda: expired.append(True))
+            countdown.start()
+            barrier = threading.Barrier(3)
+            wins = []
+
+            def attempt(transition):
+                barrier.wait()
+                wins.append(transition())
+
+            threads = [
+                threading.Thread(target=attempt, args=(countdown.confirm,)),
+                threading.Thread(target=attempt, args=(countdown.cancel,)),
+                threading.Thread(target=attempt, args=(lambda: scheduler.advance(1.0) or bool(expired),)),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(wins.count(True), 1)
+            self.assertIn(countdown.state, (COUNTDOWN_CONFIRMED, COUNTDOWN_CANCELLED, COUNTDOWN_EXPIRED))
+            self.assertEqual(bool(expired), countdown.state == COUNTDOWN_EXPIRED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,264 @@
+import pathlib
+import threading
+import time
+import unittest
+
+from rotator.display_state import (
+    DisplayChangeSignal,
+    DisplayRecord,
+    DisplaySnapshot,
+    DisplaySnapshotCache,
+    parse_displayplacer_list,
+    parse_saved_layout_command,
+    wait_for_display_state,
+)
+
+FIXTURES = pathlib.Path(__file__).resolve().parent / "fixtures"
+
+SAMPLE_LIST_OUTPUT = """Persistent screen id: 37D8832A-2D66-02CA-B9F7-8F30A301B230
+Contextual screen id: 1
+Serial screen id: s4251086178
+Type: MacBook built in screen
+Resolution: 1512x982
+Hertz: 120
+Color Depth: 8
+Scaling: on
+Origin: (0,0) - main display
+Rotation: 0
+Enabled: true
+Resolutions for rotation 0:
+  mode 0: res:1512x982 hz:120 color_depth:8 scaling:on <-- current mode
+
+Persistent screen id: 4A5B6C7D-0000-1111-2222-333344445555
+Contextual screen id: 2
+Serial screen id: s1234567
+Type: 27 inch external screen
+Resolution: 1440x2560
+Hertz: 60
+Color Depth: 8
+Scaling: off
+Origin: (1512,-800)
+Rotation: 90
+Enabled: true
+Resolutions for rotation 90:
+  mode 0: res:1440x2560 hz:60 color_depth:8 <-- current mode
+
+Execute the command below to set your screens to the current arrangement.
+
+displayplacer "id:37D8832A-2D66-02CA-B9F7-8F30A301B230 res:1512x982 hz:120 color_depth:8 enabled:true scaling:on origin:(0,0) degree:0" "id:4A5B6C7D-0000-1111-2222-333344445555 res:1440x2560 hz:60 color_depth:8 enabled:true scaling:off origin:(1512,-800) degree:90"
+"""
+
+
+class DisplaySnapshotTests(unittest.TestCase):
+    def test_displays_flags_built_in_and_external(self):
+        displays = DisplaySnapshot(SAMPLE_LIST_OUTPUT).displays()
+        self.assertEqual(
+            [(d["persistent_id"], d["is_built_in"], d["is_external"], d["degree"]) for d in displays],
+            [
+                ("37D8832A-2D66-02CA-B9F7-8F30A301B230", True, False, "0"),
+                ("4A5B6C7D-0000-1111-2222-333344445555", False, True, "90"),
+            ],
+        )
+
+    def test_display_info_reads_geometry(self):
+        info = DisplaySnapshot(SAMPLE_LIST_OUTPUT).display_info("4A5B6C7D-0000-1111-2222-333344445555")
+        self.assertEqual(info["res"], "1440x2560")
+        self.assertEqual(info["origin"], "(1512,-800)")
+        self.assertEqual(info["degree"], 90)
+        self.assertEqual(info["hertz"], "60")
+        self.assertIsNone(DisplaySnapshot(SAMPLE_LIST_OUTPUT).display_info("FFFF"))
+
+    def test_restore_command_uses_trailing_displayplacer_line(self):
+        restore = DisplaySnapshot(SAMPLE_LIST_OUTPUT).restore_command()
+        self.assertEqual(len(restore), 2)
+        self.assertTrue(restore[1].endswith("degree:90"))
+
+
+class ParseDisplayplacerListTests(unittest.TestCase):
+    def test_returns_typed_records(self):
+        parsed = parse_displayplacer_list(SAMPLE_LIST_OUTPUT)
+        built_in, external = parsed.displays
+        self.assertEqual(
+            built_in,
+            DisplayRecord(
+                persistent_id="37D8832A-2D66-02CA-B9F7-8F30A301B230",
+                name="MacBook built in screen",
+                type="MacBook built in screen",
+                resolution="1512x982",
+                origin=(0, 0),
+                rotation=0,
+                hertz="120",
+                color_depth="8",
+                scaling="on",
+                is_built_in=True,
+                is_external=False,
+                is_main=True,
+            ),
+        )
+        self.assertEqual(external.origin, (1512, -800))
+        self.assertEqual(external.rotation, 90)
+        self.assertTrue(external.is_external)
+
+    def test_captured_fixtures_parse_every_display(self):
+        for display_count in (1, 4, 16):
+            output = (FIXTURES / f"displayplacer_list_{display_count}.txt").read_text(encoding="utf-8")
+            parsed = parse_displayplacer_list(output)
+            self.assertEqual(len(parsed.displays), display_count)
+            self.assertEqual(len(parsed.restore_command), display_count)
+            for record, argument in zip(parsed.displays, parsed.restore_command):
+                self.assertTrue(argument.startswith(f"id:{record.persistent_id} "))
+                self.assertIn(f"degree:{record.rotation}", argument)
+
+    def test_restore_command_matches_shlex_parsing(self):
+        restore_line = SAMPLE_LIST_OUTPUT.strip().splitlines()[-1]
+        self.assertEqual(
+            list(parse_displayplacer_list(SAMPLE_LIST_OUTPUT).restore_command),
+            parse_saved_layout_command(restore_line),
+        )
+
+    def test_empty_output(self):
+        parsed = parse_displayplacer_list("")
+        self.assertEqual(parsed.displays, ())
+        self.assertIsNone(parsed.restore_command)
+
+
+class DisplaySnapshotCacheTests(unittest.TestCase):
+    def test_reuses_snapshot_until_invalidated(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return SAMPLE_LIST_OUTPUT
+
+        cache = DisplaySnapshotCache(fetch)
+        first = cache.get()
+        self.assertIs(cache.get(), first)
+        cache.invalidate()
+        self.assertIsNot(cache.get(), first)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "shared": 0, "invalidations": 1})
+
+    def test_failed_fetch_is_not_cached(self):
+        outputs = [None, SAMPLE_LIST_OUTPUT]
+        cache = DisplaySnapshotCache(lambda: outputs.pop(0))
+        self.assertEqual(cache.get().displays(), [])
+        self.assertEqual(len(cache.get().displays()), 2)
+
+    def test_invalidation_during_fetch_discards_result(self):
+        cache = None
+
+        def fetch():
+            cache.invalidate()
+            return SAMPLE_LIST_OUTPUT
+
+        cache = DisplaySnapshotCache(fetch)
+        cache.get()
+        cache.get()
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    def concurrent_gets(self, max_age):
+        entered, release = threading.Event(), threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            entered.set()
+            release.wait(5.0)
+            return SAMPLE_LIST_OUTPUT
+
+        cache = DisplaySnapshotCache(fetch)
+        results = []
+        first = threading.Thread(target=lambda: results.append(cache.get()))
+        first.start()
+        entered.wait(5.0)
+        second = threading.Thread(target=lambda: results.append(cache.get(max_age)))
+        second.start()
+        release.set()
+        first.join()
+        second.join()
+        return cache, calls, results
+
+    def test_concurrent_misses_share_one_fetch(self):
+        cache, calls, results = self.concurrent_gets(max_age=None)
+        self.assertEqual(len(calls), 1)
+        self.assertIs(results[0], results[1])
+
+    def test_fresh_read_does_not_share_a_fetch_started_before_it(self):
+        cache, calls, results = self.concurrent_gets(max_age=0.0)
+        self.assertEqual(len(calls), 2)
+
+    def test_max_age_forces_refresh(self):
+        cache = DisplaySnapshotCache(lambda: SAMPLE_LIST_OUTPUT)
+        cache.get()
+        cache.get(max_age=-1.0)
+        self.assertEqual(cache.stats()["misses"], 2)
+
+
+
+class WaitForDisplayStateTests(unittest.TestCase):
+    def test_change_notification_wakes_waiter_without_polling(self):
+        signal = DisplayChangeSignal()
+        state = {"rotated": False}
+        checks = []
+
+        def check(refresh):
+            checks.append(refresh)
+            return state["rotated"]
+
+        def fake_notifier():
+            time.sleep(0.05)
+            state["rotated"] = True
+            signal.notify()
+
+        threading.Thread(target=fake_notifier, daemon=True).start()
+        started = time.monotonic()
+        self.assertTrue(wait_for_display_state(check, signal, timeout=5.0, initial_interval=10.0))
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(checks, [False, False])
+
+    def test_falls_back_to_backoff_polling_with_refresh(self):
+        signal = DisplayChangeSignal()
+        checks = []
+
+        def check(refresh):
+            checks.append(refresh)
+            return len(checks) == 3
+
+        self.assertTrue(
+            wait_for_display_state(check, signal, timeout=1.0, initial_interval=0.01, backoff=2.0)
+        )
+        self.assertEqual(checks, [False, True, True])
+
+    def test_initial_delay_skips_the_first_read_unless_a_change_arrived(self):
+        signal = DisplayChangeSignal()
+        checks = []
+
+        def check(refresh):
+            checks.append(refresh)
+            return True
+
+        started = time.monotonic()
+        self.assertTrue(wait_for_display_state(check, signal, timeout=1.0, initial_delay=0.05))
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertEqual(checks, [True])
+
+        # The change notification came before the wait started: no delay, no refresh
+        generation = signal.generation
+        signal.notify()
+        checks.clear()
+        started = time.monotonic()
+        self.assertTrue(
+            wait_for_display_state(check, signal, timeout=1.0, initial_delay=5.0, since_generation=generation)
+        )
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(checks, [False])
+
+    def test_times_out(self):
+        signal = DisplayChangeSignal()
+        self.assertFalse(
+            wait_for_display_state(lambda refresh: False, signal, timeout=0.05, initial_interval=0.01)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
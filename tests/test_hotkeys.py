@@ -0,0 +1,225 @@
+import threading
+import unittest
+
+from benchmarks.bench_hotkeys import load_keystrokes, replay_legacy, replay_matcher, shortcut_set
+from rotator.hotkeys import HotkeyMatcher, HotkeyRegistry
+
+
+class HotkeyMatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.matcher = HotkeyMatcher({"toggle": ("ctrl", "alt", "r"), "rotate_90": ("ctrl", "alt", "9")})
+
+    def press_all(self, *keys):
+        return [self.matcher.press(key) for key in keys]
+
+    def test_fires_once_on_the_completing_press(self):
+        self.assertEqual(self.press_all("ctrl", "alt", "r"), [None, None, "toggle"])
+        # Auto-repeat while held
+        self.assertIsNone(self.matcher.press("r"))
+        self.matcher.release("r")
+        self.assertEqual(self.matcher.press("9"), "rotate_90")
+        self.assertEqual(self.matcher.matches, 2)
+
+    def test_press_order_does_not_matter(self):
+        self.assertEqual(self.press_all("r", "alt", "ctrl"), [None, None, "toggle"])
+
+    def test_keys_outside_every_combo_are_ignored(self):
+        self.assertEqual(self.press_all("ctrl", "shift", "alt", "r"), [None, None, None, "toggle"])
+
+    def test_caps_lock_held_on_does_not_block_shortcuts(self):
+        # pynput on macOS reports Caps Lock as pressed for as long as it is on
+        self.matcher.press("caps_lock")
+        self.assertEqual(self.press_all("ctrl", "alt", "r"), [None, None, "toggle"])
+        self.matcher.release("r")
+        self.assertEqual(self.matcher.press("9"), "rotate_90")
+
+    def test_extra_combo_key_still_needs_an_exact_match(self):
+        matcher = HotkeyMatcher({"toggle": ("ctrl", "alt", "r"), "toggle_set": ("ctrl", "alt", "shift", "r")})
+        self.assertEqual([matcher.press(key) for key in ("ctrl", "alt", "shift", "r")], [None, None, None, "toggle_set"])
+
+    def test_key_renamed_by_shift_between_press_and_release_is_released(self):
+        # "1" pressed, shift pressed, then the same physical key released as "!"
+        self.matcher.press("1", identity=18)
+        self.matcher.press("shift", identity=56)
+        self.matcher.release("!", identity=18)
+        self.matcher.release("shift", identity=56)
+        self.assertEqual(self.press_all("ctrl", "alt", "r"), [None, None, "toggle"])
+
+    def test_combo_key_renamed_between_press_and_release_is_released(self):
+        self.assertEqual(self.press_all("ctrl", "alt"), [None, None])
+        self.assertEqual(self.matcher.press("9", identity=25), "rotate_90")
+        self.matcher.release("(", identity=25)
+        self.assertEqual(self.matcher.press("9", identity=25), "rotate_90")
+
+    def test_reset_forgets_lost_releases(self):
+        self.press_all("ctrl", "x")
+        self.matcher.reset()
+        self.assertEqual(self.press_all("ctrl", "alt", "r"), [None, None, "toggle"])
+
+    def test_recorded_stream_fires_the_same_shortcuts_as_pynput_fan_out(self):
+        events = load_keystrokes()
+        shortcuts = shortcut_set(25)
+
+        fired = replay_matcher(events, shortcuts)
+
+        self.assertEqual(fired, replay_legacy(events, shortcuts))
+        self.assertEqual(set(fired), {"toggle", "rotate_90"})
+
+
+class FakeKeySource:
+    """Stands in for pynput: hands out listeners and replays key names through them."""
+
+    def __init__(self):
+        self.listeners = []
+
+    def start(self, on_press, on_release):
+        listener = FakeListener(on_press, on_release)
+        self.listeners.append(listener)
+        return listener
+
+    @property
+    def current(self):
+        return self.listeners[-1]
+
+    def tap(self, *keys):
+        for key in keys:
+            self.current.on_press(key)
+        for key in reversed(keys):
+            self.current.on_release(key)
+
+
+class FakeKeyCode:
+    """A pynput KeyCode: the character depends on shift, the virtual keycode does not."""
+
+    def __init__(self, char, vk):
+        self.char = char
+        self.vk = vk
+
+
+class FakeListener:
+    def __init__(self, on_press, on_release):
+        self.on_press = on_press
+        self.on_release = on_release
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def stop(self):
+        self.alive = False
+
+
+class HotkeyRegistryTests(unittest.TestCase):
+    def setUp(self):
+        self.source = FakeKeySource()
+        self.fired = []
+        self.registry = HotkeyRegistry(self.source.start, lambda key: key, self.fired.append)
+
+    def test_no_listener_until_there_is_a_shortcut(self):
+        self.registry.update({})
+        self.assertEqual(self.source.listeners, [])
+
+        self.registry.update({"toggle": ["ctrl", "alt", "r"]})
+        self.source.tap("ctrl", "alt", "r")
+
+        self.assertEqual(self.fired, ["toggle"])
+        self.assertEqual(len(self.source.listeners), 1)
+
+    def test_shortcut_changes_swap_the_table_without_restarting(self):
+        self.registry.update({"toggle": ["ctrl", "alt", "r"]})
+        self.registry.update({"rotate_90": ["ctrl", "alt", "9"]})
+        self.source.tap("ctrl", "alt", "r")
+        self.source.tap("ctrl", "alt", "9")
+        self.registry.update({})
+        self.source.tap("ctrl", "alt", "9")
+
+        self.assertEqual(self.fired, ["rotate_90"])
+        stats = self.registry.stats()
+        self.assertEqual(stats["listener_starts"], 1)
+        self.assertEqual(stats["listener_restarts"], 0)
+        self.assertEqual(stats["swaps"], 3)
+        self.assertEqual(stats["events"], 18)
+        self.assertEqual(stats["dispatched"], 1)
+
+    def test_recording_uses_the_same_listener_and_suppresses_shortcuts(self):
+        self.registry.update({"toggle": ["ctrl", "alt", "r"]})
+        recorded = []
+
+        self.assertTrue(self.registry.start_recording("rotate_90", lambda action, keys: recorded.append((action, keys))))
+        self.assertFalse(self.registry.start_recording("toggle", lambda action, keys: None))
+        self.assertEqual(self.registry.recording_action, "rotate_90")
+        self.source.tap("alt", "ctrl", "r")
+
+        self.assertEqual(recorded, [("rotate_90", ["ctrl", "alt", "r"])])
+        self.assertEqual(self.fired, [])
+        self.assertIsNone(self.registry.recording_action)
+        self.assertEqual(len(self.source.listeners), 1)
+        self.source.tap("ctrl", "alt", "r")
+        self.assertEqual(self.fired, ["toggle"])
+
+    def test_modifier_release_keeps_recording_and_esc_cancels(self):
+        recorded = []
+        self.registry.start_recording("toggle", lambda action, keys: recorded.append(keys))
+        self.source.tap("cmd")
+        self.assertEqual(recorded, [])
+
+        self.source.tap("esc")
+
+        self.assertEqual(recorded, [None])
+        self.assertEqual(self.registry.stats()["recordings"], 1)
+
+    def test_shifted_release_of_an_unrelated_key_does_not_block_shortcuts(self):
+        registry = HotkeyRegistry(self.source.start, lambda key: getattr(key, "char", key), self.fired.append)
+        registry.update({"toggle": ["ctrl", "alt", "r"]})
+        one = FakeKeyCode("1", vk=18)
+        shift = FakeKeyCode("shift", vk=56)
+
+        self.source.current.on_press(one)
+        self.source.current.on_press(shift)
+        self.source.current.on_release(FakeKeyCode("!", vk=18))
+        self.source.current.on_release(shift)
+        self.source.tap("ctrl", "alt", "r")
+
+        self.assertEqual(self.fired, ["toggle"])
+
+    def test_dead_listener_is_replaced(self):
+        self.registry.update({"toggle": ["ctrl", "r"]})
+        self.source.current.on_press("ctrl")
+        self.source.current.stop()
+
+        self.registry.update({"toggle": ["ctrl", "r"]})
+        # The release of ctrl went to the dead listener; the new one must not think it is held
+        self.source.tap("r")
+        self.source.tap("ctrl", "r")
+
+        self.assertEqual(self.fired, ["toggle"])
+        self.assertEqual(self.registry.stats()["listener_restarts"], 1)
+
+    def test_swaps_while_events_flow(self):
+        self.registry.update({"toggle": ["ctrl", "r"]})
+        listener = self.source.current
+        done = threading.Event()
+
+        def type_keys():
+            while not done.is_set():
+                listener.on_press("ctrl")
+                listener.on_press("r")
+                listener.on_release("r")
+                listener.on_release("ctrl")
+
+        typist = threading.Thread(target=type_keys)
+        typist.start()
+        try:
+            for index in range(200):
+                self.registry.update({"toggle": ["ctrl", "r"], f"extra_{index}": ["cmd", "x"]})
+        finally:
+            done.set()
+            typist.join()
+
+        self.assertGreater(len(self.fired), 0)
+        self.assertEqual(set(self.fired), {"toggle"})
+        self.assertEqual(len(self.source.listeners), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
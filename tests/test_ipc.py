@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+import socket
+import stat
+import tempfile
+import threading
+import time
+import unittest
+
+from rotator.action_queue import ActionQueue
+from rotator.backends import SimulatedBackend
+from rotator.controller import action_coalesce_key
+from rotator.ipc import ControlClient, ControlServer
+from rotator.logs import RingBufferHandler
+from tests.helpers import RecordingController
+from tests.test_display_state import SAMPLE_LIST_OUTPUT
+
+EXTERNAL = "4A5B6C7D-0000-1111-2222-333344445555"
+
+
+class SimulatedController(RecordingController):
+    def __init__(self, config_path: str):
+        super().__init__(config_path, SimulatedBackend.from_list_output(SAMPLE_LIST_OUTPUT))
+        self.target_display_persistent_id = EXTERNAL
+        self.list_calls = 0
+
+    def _fetch_display_list(self):
+        self.list_calls += 1
+        return super()._fetch_display_list()
+
+
+class ControlServerTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.backend = SimulatedController(os.path.join(self.directory.name, "config.json"))
+        self.socket_path = os.path.join(self.directory.name, "control.sock")
+        self.server = ControlServer(self.backend, self.socket_path)
+        self.assertTrue(self.server.start())
+        self.backend.event_listeners.append(self.server.publish)
+
+    def tearDown(self):
+        self.server.stop()
+        self.backend.action_queue.close()
+        self.backend.config_store.flush()
+        self.directory.cleanup()
+
+    def run_client(self, scenario):
+        async def runner():
+            client = await ControlClient.connect(self.socket_path)
+            try:
+                return await scenario(client)
+            finally:
+                await client.close()
+
+        return asyncio.run(runner())
+
+    def test_status_and_list_come_from_the_snapshot_cache(self):
+        async def scenario(client):
+            cold = await client.request("status")
+            listed = await client.request("list")
+            warm = await client.request("status")
+            await client.request("list")
+            return cold, listed, warm
+
+        cold, listed, warm = self.run_client(scenario)
+
+        self.assertTrue(cold["ok"])
+        self.assertIsNone(cold["displays"])
+        self.assertEqual([display["persistent_id"] for display in listed["displays"]][1], EXTERNAL)
+        self.assertEqual(warm["displays"], listed["displays"])
+        self.assertFalse(warm["busy"])
+        # Only the first list on a cold cache reads the backend
+        self.assertEqual(self.backend.list_calls, 1)
+
+    def test_rotate_goes_through_the_action_path_and_reports_completion(self):
+        async def scenario(client):
+            await client.request("subscribe")
+            response = await client.request("rotate", degree=0)
+            events = [await client.next_event(timeout=5.0), await client.next_event(timeout=5.0)]
+            return response, events
+
+        response, events = self.run_client(scenario)
+
+        self.assertEqual(response, {"ok": True, "action": "rotate_0", "coalesced": False, "id": 2})
+        self.assertEqual([event["event"] for event in events], ["action_started", "action_finished"])
+        self.assertTrue(events[1]["ok"])
+        self.assertEqual(self.backend.get_display_info(EXTERNAL)["degree"], 0)
+
+    def test_traces_return_the_last_rotations(self):
+        self.assertTrue(self.backend.set_rotation(0))
+
+        async def scenario(client):
+            return await client.request("traces", last=1), await client.request("traces", last=-1)
+
+        traces, invalid = self.run_client(scenario)
+
+        self.assertEqual(len(traces["traces"]), 1)
+        self.assertEqual(traces["traces"][0]["attributes"]["target_degree"], 0)
+        self.assertFalse(invalid["ok"])
+
+    def test_logs_come_from_the_ring_buffer_when_enabled(self):
+        async def scenario(client):
+            return await client.request("logs")
+
+        disabled = self.run_client(scenario)
+        self.backend.log_buffer = RingBufferHandler(10)
+        self.backend.log_buffer.handle(logging.makeLogRecord({"msg": "Rotation trace: ok"}))
+        enabled = self.run_client(scenario)
+
+        self.assertFalse(disabled["ok"])
+        self.assertIn("log_ring_buffer", disabled["error"])
+        self.assertEqual(enabled["lines"], ["Rotation trace: ok"])
+
+    def test_requests_during_a_rotation_coalesce_and_rate_limits_reject(self):
+        started = threading.Event()
+        release = threading.Event()
+        executed = []
+
+        def execute(action):
+            started.set()
+            release.wait(5.0)
+            executed.append(action)
+
+        self.backend.action_queue = ActionQueue(
+            execute, rate=1.0, burst=2, coalesce_key=action_coalesce_key, clock=lambda: 0.0
+        )
+
+        async def scenario(client):
+            first = await client.request("rotate", degree=90)
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5.0)
+            return [first] + [await client.request("rotate", degree=degree) for degree in (90, 0, 270, 0, 0)]
+
+        responses = self.run_client(scenario)
+        release.set()
+        self.assertTrue(self.backend.action_queue.wait_idle(5.0))
+
+        self.assertEqual([response["ok"] for response in responses], [True, True, True, True, True, False])
+        self.assertEqual(responses[-1]["error"], "Too many requests for this action")
+        # Everything sent while 90° was running rewrote the one waiting slot
+        self.assertEqual(executed, ["rotate_90", "rotate_0"])
+        self.assertEqual([response.get("coalesced") for response in responses[1:5]], [False, True, True, True])
+
+    def test_invalid_requests_return_errors(self):
+        async def scenario(client):
+            return await client.request("rotate", degree=45), await client.request("launch")
+
+        bad_degree, unknown = self.run_client(scenario)
+
+        self.assertIn("degree", bad_degree["error"])
+        self.assertIn("unknown command", unknown["error"])
+        self.assertEqual(self.server.stats()["errors"], 2)
+
+    def test_socket_is_owner_only(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+
+    def test_subscriber_that_stops_reading_never_blocks_publishing(self):
+        stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stalled.connect(self.socket_path)
+        stalled.sendall(b'{"id": 1, "command": "subscribe"}\n')
+        deadline = time.monotonic() + 5.0
+        while self.server.stats()["subscribers"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        event = {"event": "displays_changed", "padding": "x" * 4096}
+
+        started = time.monotonic()
+        # Far more than the socket buffer and the event queue hold together
+        for _ in range(2000):
+            self.server.publish(event)
+        elapsed = time.monotonic() - started
+        stalled.close()
+
+        self.assertLess(elapsed, 2.0)
+        stats = self.server.stats()
+        self.assertEqual((stats["subscribers"], stats["subscribers_dropped"]), (0, 1))
+
+    def test_second_server_does_not_steal_a_live_socket(self):
+        self.assertFalse(ControlServer(self.backend, self.socket_path).start())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+
+from rotator.backends import SimulatedBackend, simulated_displays
+from rotator.config_store import ConfigStore
+from rotator.controller import RotationController
+from rotator.latency_model import (
+    DEFAULT_POLL_INTERVAL,
+    MIN_TIMEOUT,
+    DisplayLatencyModel,
+    LatencyEstimate,
+    VerifyTiming,
+)
+
+DISPLAYS = simulated_displays(2)
+EXTERNAL = DISPLAYS[1].persistent_id
+
+
+class DisplayLatencyModelTests(unittest.TestCase):
+    def test_estimates_follow_samples_and_drive_the_timing(self):
+        model = DisplayLatencyModel()
+        model.observe(["A"], 1.0)
+        model.observe(["A"], 2.0)
+
+        estimate = model.get("A")
+        self.assertAlmostEqual(estimate.mean, 1.25)
+        self.assertAlmostEqual(estimate.deviation, 0.625)
+        self.assertEqual(estimate.samples, 2)
+
+        timing = model.timing(["A"], default_timeout=3.0)
+        self.assertAlmostEqual(timing.timeout, 1.25 + 4 * 0.625)
+        self.assertAlmostEqual(timing.first_check, 1.25 * 0.75)
+        self.assertAlmostEqual(timing.poll_interval, 0.25)
+
+    def test_unknown_displays_keep_the_plain_timing(self):
+        model = DisplayLatencyModel({"A": LatencyEstimate(0.01, 0.0)})
+        self.assertEqual(model.timing(["B"], 3.0), VerifyTiming(3.0))
+        # One unknown display in the change and nothing can be assumed about when to look
+        self.assertEqual(model.timing(["A", "B"], 3.0), VerifyTiming(3.0, 0.0, DEFAULT_POLL_INTERVAL))
+        self.assertEqual(model.timing(["A"], 3.0).timeout, MIN_TIMEOUT)
+
+    def test_only_noticeable_changes_are_reported(self):
+        reports = []
+        model = DisplayLatencyModel(on_change=reports.append)
+        for _ in range(20):
+            model.observe(["A"], 1.0)
+        settled = len(reports)
+        # Reported while the deviation decays, then steady samples stop rewriting the config
+        self.assertLess(settled, 10)
+        model.observe(["A"], 1.02)
+        self.assertEqual(len(reports), settled)
+        model.observe(["A"], 3.0)
+        self.assertEqual(len(reports), settled + 1)
+        self.assertEqual(reports[-1]["A"]["samples"], 22)
+
+    def test_config_round_trip_skips_malformed_entries(self):
+        model = DisplayLatencyModel.from_config({
+            "A": {"mean": 0.4, "deviation": 0.1, "samples": 3},
+            "B": {"mean": "slow"},
+            "C": "fast",
+        })
+        self.assertEqual(model.to_config(), {"A": {"mean": 0.4, "deviation": 0.1, "samples": 3}})
+        self.assertEqual(DisplayLatencyModel.from_config(None).to_config(), {})
+
+
+class AdaptiveVerificationTests(unittest.TestCase):
+    def rotate(self, config):
+        with tempfile.TemporaryDirectory() as directory:
+            config_path = os.path.join(directory, "config.json")
+            with open(config_path, "w", encoding="utf-8") as config_file:
+                json.dump(config, config_file)
+            backend = SimulatedBackend(DISPLAYS, visibility_delay=0.3)
+            controller = RotationController()
+            controller.notify = lambda title, subtitle, message="": None
+            controller.init_rotation(ConfigStore(config_path), None, backend)
+            controller.target_display_persistent_id = EXTERNAL
+            try:
+                self.assertTrue(controller.set_rotation(90))
+                controller.config_store.flush()
+                with open(config_path, encoding="utf-8") as config_file:
+                    saved = json.load(config_file)
+            finally:
+                controller.action_queue.close()
+        return backend, saved
+
+    def test_known_slow_display_is_not_reapplied(self):
+        retry = {"verify_timeout": 0.1, "backoff": 0.01, "jitter": 0}
+        backend, saved = self.rotate({"rotation_retry": retry})
+        # With nothing learned the short default timeout gives up on the first apply too early,
+        # and the late confirmation cannot be attributed to either apply, so it is not learned
+        self.assertGreater(len(backend.applied), 1)
+        self.assertNotIn("display_latency", saved)
+
+        learned = {EXTERNAL: {"mean": 0.3, "deviation": 0.05, "samples": 10}}
+        backend, _ = self.rotate({"rotation_retry": retry, "display_latency": learned})
+        self.assertEqual(len(backend.applied), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
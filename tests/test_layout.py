@@ -0,0 +1,95 @@
+import pathlib
+import unittest
+
+from rotator.display_state import DisplaySnapshot
+from rotator.layout import (
+    DisplayRect,
+    build_batch_rotation_args,
+    extract_display_degree_from_layout_args,
+    parse_layout_argument,
+    recalculate_origins,
+)
+
+FIXTURES = pathlib.Path(__file__).resolve().parent / "fixtures"
+
+BUILT_IN = "6B3216FD-AEEB-9757-29FA-E923D5A4FD12"
+LEFT = "ABFE228F-219E-9CB0-EB53-F16947CCF25E"
+MIDDLE = "4D8DBC74-2547-70F5-8904-DBA41ECCCC3F"
+RIGHT = "626E53A1-3043-B026-C48B-BF33FEFF9243"
+
+
+def wall_snapshot() -> DisplaySnapshot:
+    return DisplaySnapshot((FIXTURES / "displayplacer_list_4.txt").read_text())
+
+
+def fields_by_id(layout_args):
+    return {fields["id"]: fields for fields in map(parse_layout_argument, layout_args)}
+
+
+def rects_overlap(a, b) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+class BatchRotationArgsTests(unittest.TestCase):
+    def test_rotates_several_displays_in_one_argument_list(self):
+        layout_args = build_batch_rotation_args(wall_snapshot(), {LEFT: 90, MIDDLE: 90, RIGHT: 270})
+        fields = fields_by_id(layout_args)
+
+        self.assertEqual(len(layout_args), 4)
+        self.assertEqual([fields[pid]["degree"] for pid in (BUILT_IN, LEFT, MIDDLE, RIGHT)], ["0", "90", "90", "270"])
+        self.assertEqual([fields[pid]["res"] for pid in (LEFT, MIDDLE, RIGHT)], ["1440x2560"] * 3)
+        # Untouched displays keep every other field of their current mode
+        self.assertEqual(fields[BUILT_IN]["scaling"], "on")
+        self.assertEqual(fields[BUILT_IN]["origin"], "(0,0)")
+
+    def test_recomputed_origins_do_not_overlap(self):
+        layout_args = build_batch_rotation_args(wall_snapshot(), {LEFT: 90, MIDDLE: 90})
+        fields = fields_by_id(layout_args)
+        self.assertEqual(
+            [fields[pid]["origin"] for pid in (BUILT_IN, LEFT, MIDDLE, RIGHT)],
+            ["(0,0)", "(1512,-200)", "(2952,-200)", "(4392,-200)"],
+        )
+
+        rects = []
+        for display_fields in fields.values():
+            x, y = (int(value) for value in display_fields["origin"].strip("()").split(","))
+            width, height = (int(value) for value in display_fields["res"].split("x"))
+            rects.append((x, y, width, height))
+        for index, rect in enumerate(rects):
+            for other in rects[index + 1:]:
+                self.assertFalse(rects_overlap(rect, other), (rect, other))
+
+    def test_same_orientation_keeps_resolution(self):
+        layout_args = build_batch_rotation_args(wall_snapshot(), {LEFT: 180})
+        fields = fields_by_id(layout_args)
+        self.assertEqual(fields[LEFT]["res"], "2560x1440")
+        self.assertEqual(fields[RIGHT]["origin"], "(6632,-200)")
+        self.assertEqual(extract_display_degree_from_layout_args(layout_args, LEFT), 180)
+
+    def test_disconnected_target_returns_none(self):
+        self.assertIsNone(build_batch_rotation_args(wall_snapshot(), {"MISSING": 90}))
+        self.assertIsNone(build_batch_rotation_args(DisplaySnapshot(""), {LEFT: 90}))
+
+
+class RecalculateOriginsTests(unittest.TestCase):
+    def test_taller_display_pushes_displays_below_it(self):
+        rects = [
+            DisplayRect("top", 0, 0, 1920, 1080, is_main=True),
+            DisplayRect("below", 0, 1080, 1920, 1080),
+        ]
+        origins = recalculate_origins(rects, {"top": (1080, 1920)})
+        self.assertEqual(origins, {"top": (0, 0), "below": (0, 1920)})
+
+    def test_display_left_of_main_keeps_its_inner_edge(self):
+        rects = [
+            DisplayRect("left", -2560, 0, 2560, 1440),
+            DisplayRect("main", 0, 0, 1512, 982, is_main=True),
+        ]
+        origins = recalculate_origins(rects, {"left": (1440, 2560)})
+        self.assertEqual(origins["main"], (0, 0))
+        # The left display keeps its edge against the main display
+        self.assertEqual(origins["left"], (-1440, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import io
+import logging
+import os
+import tempfile
+import threading
+import unittest
+
+from rotator.logs import logging_options, setup_logging
+
+
+class ThreadRecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def emit(self, record):
+        self.threads.append(threading.current_thread().name)
+
+
+class LoggingPipelineTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.directory.name, "debug.log")
+        self.logger = logging.getLogger(f"screen_rotator.test.{self.id()}")
+        self.logger.propagate = False
+
+    def tearDown(self):
+        for handler in list(self.logger.handlers):
+            pipeline = getattr(handler, "pipeline", None)
+            if pipeline:
+                pipeline.stop()
+        self.directory.cleanup()
+
+    def test_records_reach_file_stream_and_ring_buffer_after_stop(self):
+        stream = io.StringIO()
+        pipeline = setup_logging(self.log_file, ring_buffer_size=2, stream=stream, logger=self.logger)
+
+        for index in range(3):
+            self.logger.info(f"rotation step {index}")
+        pipeline.stop()
+
+        with open(self.log_file, encoding="utf-8") as log_file:
+            self.assertEqual(len(log_file.read().splitlines()), 3)
+        self.assertIn("INFO - rotation step 2", stream.getvalue())
+        self.assertEqual([line.rsplit(" - ", 1)[1] for line in pipeline.ring_buffer.lines()], ["rotation step 1", "rotation step 2"])
+        self.assertEqual(len(pipeline.ring_buffer.lines(1)), 1)
+
+    def test_file_is_rotated_at_the_size_cap(self):
+        pipeline = setup_logging(self.log_file, max_bytes=200, backup_count=2, stream=None, logger=self.logger)
+        for index in range(40):
+            self.logger.info(f"line {index:03d} " + "x" * 40)
+        pipeline.stop()
+
+        self.assertTrue(os.path.exists(self.log_file + ".1"))
+        self.assertTrue(os.path.exists(self.log_file + ".2"))
+        self.assertFalse(os.path.exists(self.log_file + ".3"))
+        self.assertLessEqual(os.path.getsize(self.log_file), 200)
+
+    def test_handlers_run_on_the_listener_thread(self):
+        pipeline = setup_logging(None, stream=None, logger=self.logger)
+        recorder = ThreadRecordingHandler()
+        pipeline.listener.handlers = (recorder,)
+
+        self.logger.warning("from the caller")
+        pipeline.stop()
+
+        self.assertEqual(len(recorder.threads), 1)
+        self.assertNotEqual(recorder.threads[0], threading.current_thread().name)
+
+    def test_level_filters_and_setup_replaces_the_previous_pipeline(self):
+        first = setup_logging(None, stream=None, ring_buffer_size=5, logger=self.logger)
+        second = setup_logging(None, level="WARNING", stream=None, ring_buffer_size=5, logger=self.logger)
+
+        self.logger.info("hidden")
+        self.logger.warning("shown")
+        second.stop()
+
+        self.assertEqual(len(self.logger.handlers), 0)
+        self.assertEqual(first.ring_buffer.lines(), [])
+        self.assertEqual([line.rsplit(" - ", 1)[1] for line in second.ring_buffer.lines()], ["shown"])
+
+    def test_options_from_config_fall_back_on_bad_values(self):
+        options = logging_options({"log_level": "verbose", "log_max_bytes": "big", "log_ring_buffer": 100})
+        self.assertEqual(options["level"], "INFO")
+        self.assertEqual(options["max_bytes"], 1_000_000)
+        self.assertEqual(options["ring_buffer_size"], 100)
+        self.assertEqual(logging_options({"log_level": "debug", "log_ring_buffer": 50})["level"], "DEBUG")
+        self.assertEqual(logging_options({"log_ring_buffer": 50})["ring_buffer_size"], 50)
+
+    def test_log_file_option_expands_the_home_directory(self):
+        options = logging_options({"log_file": "~/Library/Logs/rotator.log"})
+        self.assertEqual(options["log_file"], os.path.join(os.path.expanduser("~"), "Library/Logs/rotator.log"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+import dataclasses
+import queue
+import threading
+import unittest
+
+from rotator.menu_model import (
+    ACTION_LABELS,
+    DisplayMenuState,
+    MenuRefreshPipeline,
+    MenuRenderer,
+    MenuState,
+    build_menu_entries,
+)
+
+
+class FakeMenuItem:
+    """Records every mutation the renderer makes, like a stubbed rumps.MenuItem."""
+
+    def __init__(self, log, title, callback=None):
+        self.log = log
+        self._title = title
+        self._state = 0
+        self.callback = callback
+        self.children = []
+
+    @property
+    def title(self):
+        return self._title
+
+    @title.setter
+    def title(self, value):
+        self.log.append(("title", value))
+        self._title = value
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        self.log.append(("state", self._title, value))
+        self._state = value
+
+    def set_callback(self, callback):
+        self.log.append(("callback", self._title))
+        self.callback = callback
+
+    def add(self, item):
+        self.children.append(item)
+
+    def clear(self):
+        self.log.append(("clear", self._title))
+        self.children = []
+
+
+def make_state(degrees=("0", "90"), target="AAA", launch=False, revert=False):
+    displays = tuple(
+        DisplayMenuState(persistent_id=pid, name=f"Screen {pid}", is_external=True, degree=degree)
+        for pid, degree in zip(("AAA", "BBB"), degrees)
+    )
+    return MenuState(
+        shortcut_displays=tuple((action_id, "None") for action_id, _, _ in ACTION_LABELS),
+        displays=displays,
+        target_display_id=target,
+        launch_at_login=launch,
+        revert_pending=revert,
+    )
+
+
+class MenuRendererTests(unittest.TestCase):
+    def setUp(self):
+        self.log = []
+        self.menu = FakeMenuItem(self.log, "root")
+        self.renderer = MenuRenderer(
+            self.menu,
+            make_item=lambda title, callback: FakeMenuItem(self.log, title, callback),
+            make_separator=lambda: "separator",
+            make_callback=lambda action: action,
+        )
+
+    def display_items(self):
+        return next(item for item in self.menu.children if getattr(item, "title", None) == "Target Display").children
+
+    def test_first_render_builds_everything(self):
+        mutations = self.renderer.render(build_menu_entries(make_state()))
+        self.assertGreater(mutations, 10)
+        self.assertEqual([item.title for item in self.display_items()], ["Screen AAA (External) [0°]", "Screen BBB (External) [90°]"])
+        self.assertEqual(self.display_items()[0].callback, ("select_target", "AAA"))
+
+    def test_unchanged_state_touches_nothing(self):
+        self.renderer.render(build_menu_entries(make_state()))
+        del self.log[:]
+        self.assertEqual(self.renderer.render(build_menu_entries(make_state())), 0)
+        self.assertEqual(self.log, [])
+
+    def test_degree_change_only_retitles_that_display(self):
+        self.renderer.render(build_menu_entries(make_state()))
+        del self.log[:]
+        self.assertEqual(self.renderer.render(build_menu_entries(make_state(degrees=("0", "0")))), 1)
+        self.assertEqual(self.log, [("title", "Screen BBB (External) [0°]")])
+
+    def test_target_change_flips_two_states(self):
+        self.renderer.render(build_menu_entries(make_state()))
+        del self.log[:]
+        self.assertEqual(self.renderer.render(build_menu_entries(make_state(target="BBB"))), 2)
+        self.assertEqual(
+            self.log,
+            [("state", "Screen AAA (External) [0°]", 0), ("state", "Screen BBB (External) [90°]", 1)],
+        )
+
+    def test_structure_change_rebuilds_level(self):
+        self.renderer.render(build_menu_entries(make_state()))
+        del self.log[:]
+        self.renderer.render(build_menu_entries(make_state(revert=True)))
+        self.assertEqual(self.log[0], ("clear", "root"))
+        self.assertEqual(self.menu.children[0].title, "Keep Rotation")
+        del self.log[:]
+        self.assertEqual(self.renderer.render(build_menu_entries(make_state(revert=True))), 0)
+
+    def test_revert_countdown_only_retitles_keep_rotation(self):
+        self.renderer.render(build_menu_entries(dataclasses.replace(make_state(revert=True), revert_remaining=15)))
+        self.assertEqual(self.menu.children[0].title, "Keep Rotation (15s)")
+        del self.log[:]
+        state = dataclasses.replace(make_state(revert=True), revert_remaining=14)
+        self.assertEqual(self.renderer.render(build_menu_entries(state)), 1)
+        self.assertEqual(self.log, [("title", "Keep Rotation (14s)")])
+
+    def test_identical_monitors_get_distinct_titles(self):
+        displays = tuple(
+            DisplayMenuState(persistent_id=persistent_id, name="27 inch external screen", is_external=True, degree="0")
+            for persistent_id in ("5157A7ED-0000-0000-0000-000000000002", "5157A7ED-0000-0000-0000-000000000003")
+        )
+        state = dataclasses.replace(make_state(), displays=displays)
+        entries = {entry.key: entry for entry in build_menu_entries(state)}
+
+        self.assertEqual(
+            [entry.title for entry in entries["display_set"].children],
+            ["27 inch external screen #0002", "27 inch external screen #0003"],
+        )
+        self.assertEqual(
+            [entry.title for entry in entries["displays"].children],
+            ["27 inch external screen #0002 (External) [0°]", "27 inch external screen #0003 (External) [0°]"],
+        )
+
+    def test_profiles_submenu_marks_the_profile_for_the_connected_displays(self):
+        state = dataclasses.replace(make_state(), profiles=("desk", "travel"), current_profile="desk")
+        entries = build_menu_entries(state)
+        profiles = next(entry for entry in entries if entry.key == "profiles").children
+
+        self.assertEqual([entry.state for entry in profiles[:2]], [1, 0])
+        self.assertEqual(profiles[1].action, ("apply_profile", "travel"))
+        self.assertEqual(profiles[-1].action, ("save_profile",))
+
+
+class MenuRefreshPipelineTests(unittest.TestCase):
+    def test_gather_runs_off_main_thread_and_main_thread_only_renders(self):
+        main_thread = threading.get_ident()
+        command_threads = []
+        ui_queue = queue.Queue()
+
+        def run_command(command):
+            command_threads.append(threading.get_ident())
+            return 0, "", ""
+
+        def gather():
+            run_command(["displayplacer", "list"])
+            run_command(["launchctl", "list", "com.screenrotator.app"])
+            return make_state()
+
+        pipeline = MenuRefreshPipeline(gather, post=lambda state, requested_at: ui_queue.put((state, requested_at)))
+        log = []
+        renderer = MenuRenderer(
+            FakeMenuItem(log, "root"),
+            make_item=lambda title, callback: FakeMenuItem(log, title, callback),
+            make_separator=lambda: "separator",
+            make_callback=lambda action: action,
+        )
+
+        pipeline.request()
+        state, requested_at = ui_queue.get(timeout=2.0)
+        calls_before_render = len(command_threads)
+        renderer.render(build_menu_entries(state))
+        pipeline.rendered(requested_at)
+
+        self.assertEqual(len(command_threads), calls_before_render)
+        self.assertEqual(len(command_threads), 2)
+        self.assertNotIn(main_thread, command_threads)
+        self.assertEqual(pipeline.render_latency.count, 1)
+
+    def test_requests_during_gather_collapse_into_one_follow_up(self):
+        release = threading.Event()
+        started = threading.Event()
+        ui_queue = queue.Queue()
+
+        def gather():
+            started.set()
+            release.wait(2.0)
+            return make_state()
+
+        pipeline = MenuRefreshPipeline(gather, post=lambda state, requested_at: ui_queue.put(state))
+        pipeline.request()
+        started.wait(2.0)
+        for _ in range(5):
+            pipeline.request()
+        release.set()
+        ui_queue.get(timeout=2.0)
+        ui_queue.get(timeout=2.0)
+        self.assertTrue(ui_queue.empty())
+        self.assertEqual(pipeline.requests, 6)
+        self.assertEqual(pipeline.gathers, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
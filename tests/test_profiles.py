@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+
+from rotator.backends import SIMULATED_DISPLAYS, SimulatedBackend, simulated_displays
+from rotator.profiles import DisplayProfile, ProfileStore, display_set_key, validate_profile_layout
+from rotator.transaction import RetryPolicy
+from tests.helpers import RecordingController
+
+BUILT_IN = SIMULATED_DISPLAYS[0].persistent_id
+EXTERNAL = SIMULATED_DISPLAYS[1].persistent_id
+DESK = [
+    f"id:{BUILT_IN} res:1512x982 origin:(0,0) degree:0",
+    f"id:{EXTERNAL} res:1440x2560 origin:(1512,0) degree:90",
+]
+
+
+class RecordingBackend(SimulatedBackend):
+    """SimulatedBackend that remembers the order of list and apply calls."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def list_displays(self):
+        self.calls.append("list")
+        return super().list_displays()
+
+    def apply_layout(self, layout_args):
+        self.calls.append("apply")
+        return super().apply_layout(layout_args)
+
+
+class ProfileModelTests(unittest.TestCase):
+    def test_validation_requires_complete_arguments_and_a_main_display(self):
+        self.assertEqual(validate_profile_layout(DESK)[0], tuple(sorted([BUILT_IN, EXTERNAL])))
+        self.assertIsNone(validate_profile_layout([f"id:{EXTERNAL} degree:90"]))
+        self.assertIsNone(validate_profile_layout([f"id:{EXTERNAL} res:1440x2560 origin:(1512,0) degree:90"]))
+        self.assertIsNone(validate_profile_layout([DESK[0], DESK[0]]))
+        self.assertIsNone(validate_profile_layout([f"id:{BUILT_IN} res:1512x982 origin:(0,0) degree:45"]))
+
+    def test_lookup_ignores_display_order_and_prefers_the_latest_profile(self):
+        store = ProfileStore([DisplayProfile.from_layout("desk", DESK)])
+        self.assertEqual(store.match([EXTERNAL, BUILT_IN]).name, "desk")
+        self.assertIsNone(store.match([EXTERNAL]))
+
+        store.add(DisplayProfile.from_layout("desk portrait", DESK))
+        self.assertEqual(store.match([BUILT_IN, EXTERNAL]).name, "desk portrait")
+        store.remove("desk portrait")
+        self.assertEqual(store.match([BUILT_IN, EXTERNAL]).name, "desk")
+        self.assertEqual(display_set_key([EXTERNAL, BUILT_IN, EXTERNAL]), f"{BUILT_IN}+{EXTERNAL}")
+
+    def test_config_round_trip_skips_invalid_entries(self):
+        config = ProfileStore([DisplayProfile.from_layout("desk", DESK)]).to_config()
+        config["broken"] = {"layout": ["id:X degree:90"]}
+        config["garbage"] = "nope"
+
+        store = ProfileStore.from_config(config)
+
+        self.assertEqual(store.names(), ["desk"])
+        self.assertEqual(store.get("desk").degrees(), {BUILT_IN: 0, EXTERNAL: 90})
+
+
+class ProfileControllerTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.directory.name, "config.json")
+        self.backend = RecordingBackend(simulated_displays(2))
+        self.controller = RecordingController(self.config_path, self.backend)
+
+    def tearDown(self):
+        self.controller.config_store.flush()
+        self.directory.cleanup()
+
+    def test_saved_profile_applies_with_one_call_and_no_list_first_when_cached(self):
+        self.controller.target_display_persistent_id = EXTERNAL
+        self.assertTrue(self.controller.set_rotation(90))
+        profile = self.controller.save_profile("desk")
+        self.assertTrue(self.controller.set_rotation(0))
+        # The rollback target comes from the snapshot the last verification cached
+        self.backend.calls.clear()
+
+        self.assertTrue(self.controller.apply_profile("desk"))
+
+        self.assertEqual(self.backend.calls[0], "apply")
+        self.assertEqual(self.backend.calls.count("apply"), 1)
+        self.assertEqual(self.backend.applied[-1], list(profile.layout))
+        self.assertEqual(self.controller.get_display_info(EXTERNAL)["degree"], 90)
+        self.assertEqual(self.controller.tracer.last_trace.name, "apply_profile")
+
+    def test_profiles_persist_and_match_the_connected_displays(self):
+        self.controller.save_profile("desk")
+        self.controller.config_store.flush()
+
+        reloaded = RecordingController(self.config_path, RecordingBackend(simulated_displays(2)))
+
+        self.assertEqual(reloaded.profile_for_connected_displays().name, "desk")
+        self.assertTrue(reloaded.delete_profile("desk"))
+        self.assertFalse(reloaded.delete_profile("desk"))
+        self.assertIsNone(reloaded.profile_for_connected_displays())
+
+    def test_unknown_profile_or_failed_apply_reports_an_error(self):
+        self.assertFalse(self.controller.apply_profile("missing"))
+        self.controller.save_profile("desk")
+        self.controller.retry_policy = RetryPolicy(attempts=2, backoff=0.01, jitter=0.0)
+        self.backend.fail_next_applies = 1
+        self.assertTrue(self.controller.apply_profile("desk"))
+
+        self.backend.fail_apply = True
+        self.assertFalse(self.controller.apply_profile("desk"))
+        self.assertEqual(self.controller.notifications[-1], "Failed: Could not apply profile desk")
+
+    def test_profile_actions_go_through_the_action_queue(self):
+        self.controller.save_profile("desk")
+
+        self.assertTrue(self.controller.execute_shortcut_action("profile:desk"))
+        self.assertFalse(self.controller.execute_shortcut_action("profile:"))
+        self.assertTrue(self.controller.action_queue.wait_idle(5.0))
+
+        self.assertEqual(self.controller.action_queue.stats()["executed"], 1)
+        self.controller.action_queue.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
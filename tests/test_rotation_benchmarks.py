@@ -0,0 +1,46 @@
+import unittest
+
+from benchmarks.bench_rotation import SCENARIOS, find_regressions, load_baseline, run_suite
+from rotator.backends import SimulatedBackend, simulated_displays
+from rotator.display_state import parse_displayplacer_list
+
+
+class RotationBenchmarkTests(unittest.TestCase):
+    def test_simulated_scenarios_stay_within_baseline_counts(self):
+        results = run_suite(modes=("simulated",))
+
+        self.assertEqual(set(results["simulated"]), set(SCENARIOS))
+        # Wall time is only enforced by `bench_rotation.py --check` on the benchmark machine
+        self.assertEqual(find_regressions(results, load_baseline(), wall_factor=None), [])
+
+    def test_fake_displayplacer_remembers_layout_changes(self):
+        results = run_suite(modes=("displayplacer",), scenarios=("rotate",))
+
+        self.assertEqual(find_regressions(results, load_baseline(), wall_factor=None), [])
+        self.assertEqual(results["displayplacer"]["rotate"]["forks"], 3)
+
+    def test_regressions_report_extra_forks_and_slow_runs(self):
+        baseline = {"displayplacer": {"rotate": {"ok": True, "forks": 3, "lists": 2, "applies": 1, "config_writes": 1, "wall_ms": 100.0}}}
+        results = {"displayplacer": {"rotate": {"ok": True, "forks": 4, "lists": 3, "applies": 1, "config_writes": 1, "wall_ms": 200.0}}}
+
+        regressions = find_regressions(results, baseline, wall_factor=1.5, wall_slack_ms=25.0)
+
+        self.assertEqual(len(regressions), 3)
+        self.assertIn("forks 4 > baseline 3", regressions[0])
+        self.assertIn("wall 200.0ms", regressions[2])
+
+
+class SimulatedDisplaysTests(unittest.TestCase):
+    def test_list_output_round_trips_through_the_parser(self):
+        backend = SimulatedBackend(simulated_displays(5), fail_next_applies=1)
+
+        self.assertEqual(parse_displayplacer_list(backend.list_output()), backend.list_displays())
+        self.assertEqual(len(backend.list_displays().displays), 5)
+
+        layout = [f"id:{simulated_displays(5)[2].persistent_id} degree:90"]
+        self.assertEqual(backend.apply_layout(layout)[0], 1)
+        self.assertEqual(backend.apply_layout(layout)[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from rotator.scheduling import Debouncer, ManualScheduler
+
+
+class ManualSchedulerTests(unittest.TestCase):
+    def test_runs_due_callbacks_in_order(self):
+        scheduler = ManualScheduler()
+        calls = []
+        scheduler.call_later(2.0, lambda: calls.append(("b", scheduler.now())))
+        scheduler.call_later(1.0, lambda: calls.append(("a", scheduler.now())))
+        cancelled = scheduler.call_later(1.5, lambda: calls.append(("x", scheduler.now())))
+        cancelled.cancel()
+        scheduler.advance(5.0)
+        self.assertEqual(calls, [("a", 1.0), ("b", 2.0)])
+        self.assertEqual(scheduler.now(), 5.0)
+
+
+class DebouncerTests(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = ManualScheduler()
+        self.calls = []
+        self.debouncer = Debouncer(
+            lambda: self.calls.append(self.scheduler.now()),
+            self.scheduler,
+            delay=0.25,
+            max_wait=1.0,
+        )
+
+    def test_burst_collapses_into_one_trailing_call(self):
+        for _ in range(5):
+            self.debouncer.trigger()
+            self.scheduler.advance(0.1)
+        self.assertEqual(self.calls, [])
+        self.scheduler.advance(0.2)
+        self.assertEqual(self.calls, [0.65])
+        self.assertEqual(self.debouncer.stats(), {"triggers": 5, "calls": 1})
+
+    def test_max_wait_bounds_continuous_stream(self):
+        for _ in range(30):
+            self.debouncer.trigger()
+            self.scheduler.advance(0.1)
+        # Each burst is capped at max_wait after its first trigger (0.0 and 1.1)
+        self.assertEqual(len(self.calls), 2)
+        self.assertAlmostEqual(self.calls[0], 1.0)
+        self.assertAlmostEqual(self.calls[1], 2.1)
+
+    def test_flush_runs_pending_call_once(self):
+        self.debouncer.trigger()
+        self.debouncer.flush()
+        self.scheduler.advance(1.0)
+        self.assertEqual(self.calls, [0.0])
+
+    def test_idle_flush_does_nothing(self):
+        self.debouncer.flush()
+        self.assertEqual(self.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
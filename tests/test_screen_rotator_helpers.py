@@ -1,10 +1,69 @@
+import dataclasses
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import types
 import unittest
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import patch
 
+import rotator
 import screen_rotator
+from rotator.backends import SIMULATED_DISPLAYS, SimulatedBackend
+from rotator.config_store import ConfigStore
+from rotator.controller import RotationController
+from rotator.menu_model import MenuRefreshPipeline, MenuRenderer
+from tests.test_menu_model import FakeMenuItem, make_state
+
+# The helpers import anywhere; the app classes need pyobjc and rumps (macOS)
+requires_app = unittest.skipUnless(
+    importlib.util.find_spec("AppKit") and importlib.util.find_spec("rumps"),
+    "menu bar app needs AppKit and rumps",
+)
+
+
+def forbidden(what):
+    def fail(*args, **kwargs):
+        raise AssertionError(f"main thread {what}")
+
+    return fail
+
+
+def load_app_with_stub_frameworks():
+    """rotator.app imported against minimal AppKit/Foundation/objc/rumps modules.
+
+    Enough to exercise the main-thread menu code on any OS; nothing here
+    talks to a real window server.
+    """
+
+    class NSObject:
+        @classmethod
+        def alloc(cls):
+            return cls()
+
+        def init(self):
+            return self
+
+    stubs = {name: types.ModuleType(name) for name in ("AppKit", "Foundation", "objc", "rumps")}
+    stubs["Foundation"].NSObject = NSObject
+    stubs["objc"].python_method = lambda function: function
+    stubs["objc"].super = super
+    stubs["rumps"].App = type("App", (), {})
+    had_app = hasattr(rotator, "app")
+    with patch.dict(sys.modules, stubs):
+        sys.modules.pop("rotator.app", None)
+        module = importlib.import_module("rotator.app")
+    # Later imports must not find the stubbed module through the package attribute
+    if not had_app:
+        del rotator.app
+    return module
 
 
 class ScreenRotatorHelperTests(unittest.TestCase):
+    @requires_app
     def test_status_item_title_is_visible_ascii(self):
         self.assertEqual(screen_rotator.STATUS_ITEM_TITLE, "SR")
 
@@ -62,27 +121,53 @@ class ScreenRotatorHelperTests(unittest.TestCase):
         self.assertFalse(screen_rotator.degree_matches_target_rotation(90, 0))
 
     def test_set_rotation_ignores_stale_saved_layout_and_falls_back(self):
-        class DummyApp:
-            target_display_persistent_id = "BBB"
-
-        app = DummyApp()
-        app.get_display_info = MagicMock(return_value={"degree": 90, "res": "1080x1920"})
-        app.save_current_layout = MagicMock()
-        app.load_saved_layout = MagicMock(return_value=["id:BBB res:1080x1920 degree:90"])
-        app.run_displayplacer = MagicMock(return_value=(0, "", ""))
-        app.wait_for_rotation = MagicMock(return_value=True)
-
-        with patch.object(screen_rotator.rumps, "notification"), patch.object(
-            screen_rotator.rumps, "alert"
-        ):
-            screen_rotator.ScreenRotatorApp.set_rotation(app, 0)
-
-        self.assertEqual(app.load_saved_layout.call_args[0][0], "landscape")
-        self.assertEqual(app.run_displayplacer.call_count, 1)
-        fallback_args = app.run_displayplacer.call_args[0][0]
+        external = dataclasses.replace(SIMULATED_DISPLAYS[1], resolution="1440x2560", rotation=90)
+        backend = SimulatedBackend((SIMULATED_DISPLAYS[0], external))
+        with tempfile.TemporaryDirectory() as directory:
+            config_path = os.path.join(directory, "config.json")
+            with open(config_path, "w", encoding="utf-8") as config_file:
+                # Saved while the external display was portrait, so it does not turn it to 0°
+                json.dump({"layouts": {"landscape": [f"id:{external.persistent_id} res:1440x2560 degree:90"]}}, config_file)
+            app = RotationController()
+            app.init_rotation(ConfigStore(config_path), None, backend)
+            app.target_display_persistent_id = external.persistent_id
+
+            self.assertTrue(app.set_rotation(0))
+            app.config_store.flush()
+            app.action_queue.close()
+
+        self.assertEqual(len(backend.applied), 1)
+        fallback_args = backend.applied[0]
         self.assertEqual(len(fallback_args), 1)
         self.assertIn("degree:0", fallback_args[0])
+        phases = [span["name"] for span in app.tracer.recent()[-1]["spans"]]
+        self.assertEqual(phases[:3], ["snapshot", "built_in_check", "layout_load"])
+
+    def test_apply_menu_state_never_runs_commands(self):
+        app_module = load_app_with_stub_frameworks()
+        log = []
+        root = FakeMenuItem(log, "root")
+        app = object.__new__(app_module.ScreenRotatorApp)
+        app.hotkeys = SimpleNamespace(recording_action=None)
+        app.menu_renderer = MenuRenderer(
+            root,
+            make_item=lambda title, callback: FakeMenuItem(log, title, callback),
+            make_separator=lambda: "separator",
+            make_callback=lambda action: action,
+        )
+        app.menu_refresher = MenuRefreshPipeline(gather=forbidden("gathered menu state"), post=forbidden("posted"))
+        app.run_command = forbidden("ran a command")
+        app.apply_layout = forbidden("applied a layout")
+        app.display_backend = SimpleNamespace(list_displays=forbidden("read displays"))
+        state = dataclasses.replace(make_state(revert=True), revert_remaining=15)
+
+        with patch("subprocess.Popen", side_effect=AssertionError("main thread spawned a process")):
+            app.apply_menu_state(state, 0.0)
+            app.apply_revert_tick(14)
 
+        self.assertEqual(root.children[0].title, "Keep Rotation (14s)")
+        self.assertIn("Target Display", [getattr(item, "title", None) for item in root.children])
+        self.assertEqual(app.menu_refresher.render_latency.count, 1)
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+
+from rotator.shortcuts import format_shortcut_display, is_modifier_key_name, order_shortcut_keys
+
+
+class ShortcutKeyTests(unittest.TestCase):
+    def test_order_puts_modifiers_first_and_drops_duplicates(self):
+        self.assertEqual(order_shortcut_keys(["R", "shift", "ctrl", "shift", " "]), ["ctrl", "shift", "r"])
+
+    def test_display_uses_symbols(self):
+        self.assertEqual(format_shortcut_display(["r", "cmd"]), "⌘R")
+        self.assertEqual(format_shortcut_display(["space", "ctrl"]), "⌃Space")
+        self.assertEqual(format_shortcut_display([]), "None")
+
+    def test_modifier_names(self):
+        self.assertTrue(is_modifier_key_name("alt"))
+        self.assertFalse(is_modifier_key_name("r"))
+
+
+if __name__ == "__main__":
+    unittest.main()
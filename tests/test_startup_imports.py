@@ -0,0 +1,31 @@
+import unittest
+
+from benchmarks.bench_startup import import_times
+
+PLATFORM_MODULES = ("AppKit", "Foundation", "objc", "Quartz", "rumps", "pynput")
+# About three times the ~80 ms measured on a warm Linux runner; importing AppKit alone exceeds it
+HELPERS_IMPORT_BUDGET_US = 250_000
+
+
+class StartupImportTests(unittest.TestCase):
+    def assert_no_platform_modules(self, times):
+        loaded = [name for name in times if name.split(".")[0] in PLATFORM_MODULES]
+        self.assertEqual(loaded, [])
+
+    def test_screen_rotator_helpers_import_without_platform_frameworks(self):
+        times = import_times("screen_rotator")
+
+        self.assert_no_platform_modules(times)
+        self.assertLess(times["screen_rotator"], HELPERS_IMPORT_BUDGET_US)
+        self.assertNotIn("rotator.app", times)
+
+    def test_pure_layers_import_without_platform_frameworks(self):
+        for module in ("rotator.shortcuts", "rotator.layout", "rotator.config_store", "rotator.display_state"):
+            with self.subTest(module=module):
+                times = import_times(module)
+                self.assert_no_platform_modules(times)
+                self.assertIn(module, times)
+
+
+if __name__ == "__main__":
+    unittest.main()
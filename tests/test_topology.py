@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+
+from rotator.backends import SimulatedBackend, simulated_displays
+from rotator.display_state import DisplaySnapshot
+from rotator.scheduling import ManualScheduler
+from rotator.topology import (
+    REACT_ALREADY_APPLIED,
+    REACT_APPLIED,
+    REACT_GUARDED,
+    REACT_NO_PROFILE,
+    REACT_UNCHANGED,
+    TopologyReactor,
+    snapshot_topology,
+)
+from tests.helpers import RecordingController
+
+LAPTOP = simulated_displays(1)
+DOCK = simulated_displays(3)
+SIDE_MONITOR = DOCK[2].persistent_id
+
+
+class TopologyReactorTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.backend = SimulatedBackend(DOCK)
+        self.controller = RecordingController(os.path.join(self.directory.name, "config.json"), self.backend)
+        self.scheduler = ManualScheduler()
+        self.rechecks = []
+        self.reactor = TopologyReactor(
+            self.controller,
+            guard_seconds=5.0,
+            on_learn=lambda index: self.controller.config_store.set("profile_topologies", index),
+            recheck=lambda: self.rechecks.append(self.reactor.react()),
+            scheduler=self.scheduler,
+        )
+        self.controller.topology_reactor = self.reactor
+
+        # The side monitor lives in portrait at the desk
+        self.controller.target_display_persistent_id = SIDE_MONITOR
+        self.assertTrue(self.controller.set_rotation(90))
+        self.controller.save_profile("desk")
+        self.desk_displays = self.backend.list_displays().displays
+        self.backend.set_displays(LAPTOP)
+        self.reactor.prime()
+
+    def tearDown(self):
+        self.controller.action_queue.close()
+        self.directory.cleanup()
+
+    def dock(self, settle_seconds=0.0):
+        self.backend.set_displays(DOCK)
+        self.scheduler.advance(settle_seconds)
+        return self.reactor.react()
+
+    def side_monitor_degree(self):
+        return self.controller.get_display_info(SIDE_MONITOR, max_age=0.0)["degree"]
+
+    def test_docking_applies_the_profile_for_that_display_set(self):
+        applies = len(self.backend.applied)
+        docked_topology = snapshot_topology(DisplaySnapshot.from_display_list(SimulatedBackend(DOCK).list_displays()))
+
+        self.assertEqual(self.dock(settle_seconds=0.3), REACT_APPLIED)
+
+        self.assertEqual(self.side_monitor_degree(), 90)
+        self.assertEqual(len(self.backend.applied), applies + 1)
+        self.assertAlmostEqual(self.reactor.last_latency, 0.3)
+        self.assertEqual(self.reactor.stats()["latency"]["count"], 1)
+        self.assertEqual(self.reactor.index, {docked_topology: "desk"})
+        self.assertEqual(self.controller.config_store.get("profile_topologies"), {docked_topology: "desk"})
+
+    def test_own_relayout_and_manual_rotation_do_not_reapply(self):
+        self.dock()
+        applies = len(self.backend.applied)
+
+        self.assertEqual(self.reactor.react(), REACT_UNCHANGED)
+        self.assertTrue(self.controller.set_rotation(0))
+        self.scheduler.advance(10.0)
+        self.assertEqual(self.reactor.react(), REACT_UNCHANGED)
+
+        self.assertEqual(self.side_monitor_degree(), 0)
+        self.assertEqual(len(self.backend.applied), applies + 1)
+
+    def test_set_changes_inside_the_guard_window_are_rechecked_later(self):
+        self.dock()
+        # macOS briefly drops a monitor while it reconfigures
+        self.backend.set_displays(LAPTOP)
+        self.assertEqual(self.reactor.react(), REACT_GUARDED)
+        self.assertEqual(self.reactor.react(), REACT_GUARDED)
+        self.backend.set_displays(self.desk_displays)
+
+        self.scheduler.advance(5.0)
+
+        self.assertEqual(self.rechecks, [REACT_UNCHANGED])
+        self.backend.set_displays(LAPTOP)
+        self.assertEqual(self.reactor.react(), REACT_NO_PROFILE)
+
+    def test_unknown_sets_and_matching_layouts_are_left_alone(self):
+        self.assertEqual(self.reactor.react(), REACT_UNCHANGED)
+        self.backend.set_displays(simulated_displays(2))
+        self.assertEqual(self.reactor.react(), REACT_NO_PROFILE)
+        applies = len(self.backend.applied)
+
+        self.backend.set_displays(self.desk_displays)
+
+        self.assertEqual(self.reactor.react(), REACT_ALREADY_APPLIED)
+        self.assertEqual(len(self.backend.applied), applies)
+
+    def test_settled_display_changes_queue_one_auto_profile_action(self):
+        self.backend.set_displays(DOCK)
+
+        self.controller.displays_changed()
+        self.assertTrue(self.controller.action_queue.wait_idle(5.0))
+
+        self.assertEqual(self.side_monitor_degree(), 90)
+        self.assertEqual(self.reactor.outcomes[REACT_APPLIED], 1)
+        self.assertEqual(self.controller.control_status()["auto_profile"]["outcomes"], {REACT_APPLIED: 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
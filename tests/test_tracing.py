@@ -0,0 +1,123 @@
+import json
+import os
+import tempfile
+import unittest
+
+from rotator.backends import SIMULATED_DISPLAYS, SimulatedBackend
+from rotator.config_store import ConfigStore
+from rotator.controller import RotationController
+from rotator.tracing import NULL_SPAN, Tracer, to_chrome_trace, to_jsonl
+from tests.helpers import FakeClock
+
+
+class TracerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(100.0)
+        self.calls = 0
+        self.tracer = Tracer(
+            capacity=2,
+            subprocess_calls=lambda: self.calls,
+            clock=self.clock,
+            wall_clock=lambda: 1_700_000_000.0,
+        )
+
+    def test_spans_record_offsets_durations_and_subprocesses(self):
+        with self.tracer.rotation("set_rotation", target_degree=90) as trace:
+            with self.tracer.span("snapshot"):
+                self.clock.now += 0.040
+                self.calls += 1
+            with self.tracer.span("apply", attempt=1) as span:
+                self.clock.now += 0.010
+                with self.tracer.span("wait_for_rotation"):
+                    self.clock.now += 0.200
+                    self.calls += 2
+                span.set(applied=True)
+            trace.set(outcome="ok")
+
+        recorded = self.tracer.recent()[0]
+        self.assertEqual(recorded["duration_ms"], 250.0)
+        self.assertEqual(recorded["attributes"], {"target_degree": 90, "outcome": "ok", "subprocesses": 3})
+        snapshot, apply, wait = recorded["spans"]
+        self.assertEqual((snapshot["start_ms"], snapshot["duration_ms"], snapshot["depth"]), (0.0, 40.0, 0))
+        self.assertEqual(apply["attributes"], {"attempt": 1, "applied": True, "subprocesses": 2})
+        self.assertEqual((wait["start_ms"], wait["depth"]), (50.0, 1))
+        self.assertIn("set_rotation ok in 250.0ms (snapshot 40.0ms, apply 210.0ms)", self.tracer.last_trace.summary())
+
+    def test_ring_buffer_keeps_the_last_rotations(self):
+        for degree in (0, 90, 270):
+            with self.tracer.rotation("set_rotation", target_degree=degree):
+                pass
+        self.assertEqual([trace["attributes"]["target_degree"] for trace in self.tracer.recent()], [90, 270])
+        self.assertEqual(len(self.tracer.recent(1)), 1)
+        self.assertEqual(self.tracer.recent(0), [])
+
+    def test_nested_rotation_becomes_a_span_and_stray_spans_are_ignored(self):
+        self.assertIs(self.tracer.span("outside"), NULL_SPAN)
+        with self.tracer.rotation("toggle"):
+            with self.tracer.rotation("set_rotation"):
+                pass
+        traces = self.tracer.recent()
+        self.assertEqual(len(traces), 1)
+        self.assertEqual([span["name"] for span in traces[0]["spans"]], ["set_rotation"])
+
+    def test_disabled_tracer_records_nothing(self):
+        self.tracer.enabled = False
+        with self.tracer.rotation("set_rotation") as trace:
+            with self.tracer.span("snapshot") as span:
+                span.set(ignored=True)
+            trace.set(outcome="ok")
+        self.assertIs(trace, NULL_SPAN)
+        self.assertEqual(self.tracer.recent(), [])
+
+    def test_exports(self):
+        with self.tracer.rotation("set_rotation"):
+            with self.tracer.span("snapshot"):
+                self.clock.now += 0.001
+        traces = self.tracer.recent()
+
+        self.assertEqual(json.loads(to_jsonl(traces).splitlines()[0])["name"], "set_rotation")
+        events = to_chrome_trace(traces)["traceEvents"]
+        self.assertEqual([event["name"] for event in events], ["set_rotation", "snapshot"])
+        self.assertEqual(events[1]["ph"], "X")
+        self.assertEqual(events[1]["ts"], 1_700_000_000.0 * 1_000_000)
+        self.assertEqual(events[1]["dur"], 1000.0)
+
+
+class RotationTracingTests(unittest.TestCase):
+    def test_set_rotation_records_each_phase(self):
+        with tempfile.TemporaryDirectory() as directory:
+            controller = RotationController()
+            controller.init_rotation(ConfigStore(os.path.join(directory, "config.json")), None, SimulatedBackend())
+            controller.target_display_persistent_id = SIMULATED_DISPLAYS[1].persistent_id
+            controller.display_backend.fail_next_applies = 1
+
+            self.assertTrue(controller.set_rotation(90))
+            controller.config_store.flush()
+
+        trace = controller.control_traces(1)[0]
+        self.assertEqual(trace["attributes"]["outcome"], "ok")
+        self.assertEqual(
+            [(span["name"], span["attributes"].get("attempt")) for span in trace["spans"]],
+            [
+                ("snapshot", None), ("built_in_check", None), ("layout_load", None),
+                ("apply", 1), ("retry_backoff", None), ("apply", 2), ("wait_for_rotation", None),
+                ("commit", None), ("notify", None),
+            ],
+        )
+
+    def test_zero_capacity_disables_tracing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config_path = os.path.join(directory, "config.json")
+            with open(config_path, "w", encoding="utf-8") as config_file:
+                json.dump({"rotation_trace_capacity": 0}, config_file)
+            controller = RotationController()
+            controller.init_rotation(ConfigStore(config_path), None, SimulatedBackend())
+            controller.target_display_persistent_id = SIMULATED_DISPLAYS[1].persistent_id
+
+            self.assertTrue(controller.set_rotation(90))
+            controller.config_store.flush()
+        self.assertEqual(controller.control_traces(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import os
+import random
+import tempfile
+import unittest
+
+from rotator.backends import SimulatedBackend, simulated_displays
+from rotator.scheduling import ManualScheduler
+from rotator.transaction import (
+    TX_APPLIED,
+    TX_COMMITTED,
+    TX_ROLLED_BACK,
+    RetryPolicy,
+    RotationTransaction,
+)
+from tests.helpers import FakeClock, RecordingController
+
+DISPLAYS = simulated_displays(3)
+BUILT_IN = DISPLAYS[0].persistent_id
+EXTERNAL = DISPLAYS[1].persistent_id
+SIDE = DISPLAYS[2].persistent_id
+FAST = RetryPolicy(attempts=3, backoff=0.5, jitter=0.0, verify_timeout=0.05)
+
+
+def portrait_arg(persistent_id: str) -> str:
+    return f"id:{persistent_id} res:1440x2560 origin:(1512,0) degree:90"
+
+
+class RetryPolicyTests(unittest.TestCase):
+    def test_backoff_grows_to_the_cap_and_jitter_stays_in_bounds(self):
+        policy = RetryPolicy(backoff=0.5, multiplier=2.0, max_backoff=1.5, jitter=0.0)
+        self.assertEqual([policy.delay(retry) for retry in (1, 2, 3)], [0.5, 1.0, 1.5])
+
+        jittered = RetryPolicy(backoff=1.0, jitter=0.2)
+        delays = [jittered.delay(1, random.Random(seed)) for seed in range(50)]
+        self.assertTrue(all(0.8 <= delay <= 1.2 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+    def test_from_config_keeps_defaults_for_missing_or_invalid_values(self):
+        policy = RetryPolicy.from_config({"attempts": 5, "backoff": "0.25", "deadline": -1, "jitter": "lots"})
+        self.assertEqual(policy, RetryPolicy(attempts=5, backoff=0.25))
+        self.assertEqual(RetryPolicy.from_config({"attempts": 0}).attempts, 1)
+        self.assertEqual(RetryPolicy.from_config(None), RetryPolicy())
+
+
+class RotationTransactionTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.backend = SimulatedBackend(DISPLAYS)
+        self.controller = RecordingController(os.path.join(self.directory.name, "config.json"), self.backend)
+        self.clock = FakeClock()
+        self.scheduler = ManualScheduler()
+        self.commits = []
+
+    def tearDown(self):
+        self.controller.action_queue.close()
+        self.directory.cleanup()
+
+    def begin(self, policy=FAST):
+        return RotationTransaction(
+            self.controller,
+            self.controller.display_cache.get(),
+            policy,
+            on_commit=lambda: self.commits.append(True),
+            sleep=self.clock.sleep,
+            clock=self.clock,
+            scheduler=self.scheduler,
+        )
+
+    def rotation(self, persistent_id):
+        return self.controller.get_display_info(persistent_id, max_age=0.0)["degree"]
+
+    def verify(self, persistent_id, degree):
+        return lambda timing: self.rotation(persistent_id) == degree
+
+    def test_retries_with_backoff_then_commits_once(self):
+        self.backend.fail_next_applies = 2
+        transaction = self.begin()
+
+        self.assertTrue(transaction.execute([("apply", [portrait_arg(EXTERNAL)])], self.verify(EXTERNAL, 90)))
+        self.assertEqual(self.clock.sleeps, [0.5, 1.0])
+        self.assertEqual(transaction.state, TX_APPLIED)
+        self.assertEqual(transaction.attempts, 3)
+
+        self.assertTrue(transaction.commit())
+        self.assertFalse(transaction.commit())
+        self.assertFalse(transaction.rollback())
+        self.assertEqual((transaction.state, self.commits), (TX_COMMITTED, [True]))
+
+    def test_confirmation_latency_is_measured_on_the_transaction_clock(self):
+        self.clock.now = 100.0
+
+        def verify(timing):
+            self.clock.now += 0.3
+            return timing.wait(lambda refresh: self.rotation(EXTERNAL) == 90, self.controller.display_change_signal)
+
+        transaction = self.begin()
+        self.assertTrue(transaction.execute([("apply", [portrait_arg(EXTERNAL)])], verify, [EXTERNAL]))
+
+        self.assertAlmostEqual(transaction.confirm_latency, 0.3)
+        self.assertAlmostEqual(self.controller.latency_model.get(EXTERNAL).mean, 0.3)
+
+    def test_partially_applied_plan_is_undone_before_the_fallback(self):
+        original = self.controller.display_cache.get().restore_command()
+        # The "saved layout" turns the side monitor but leaves the target display alone
+        saved_layout = [portrait_arg(SIDE)]
+        fallback = [portrait_arg(EXTERNAL)]
+        transaction = self.begin(RetryPolicy(attempts=1, verify_timeout=0.05))
+
+        plans = [("saved_layout_apply", saved_layout), ("apply", fallback)]
+        self.assertTrue(transaction.execute(plans, self.verify(EXTERNAL, 90)))
+
+        self.assertEqual(self.backend.applied, [saved_layout, original, fallback])
+        self.assertEqual(transaction.applied_phase, "apply")
+        self.assertEqual(self.rotation(SIDE), 0)
+
+    def test_failure_rolls_back_to_the_captured_state(self):
+        original = self.controller.display_cache.get().restore_command()
+        transaction = self.begin()
+
+        self.assertFalse(transaction.execute([("apply", [portrait_arg(SIDE)])], self.verify(EXTERNAL, 90)))
+
+        self.assertEqual(transaction.state, TX_ROLLED_BACK)
+        self.assertEqual(self.backend.applied[-1], original)
+        self.assertEqual(self.controller.display_cache.get(0.0).restore_command(), original)
+        self.assertEqual(self.commits, [])
+
+    def test_deadline_stops_retrying(self):
+        self.backend.fail_apply = True
+        policy = RetryPolicy(attempts=10, backoff=1.0, multiplier=1.0, jitter=0.0, deadline=3.5, verify_timeout=0.5)
+        transaction = self.begin(policy)
+
+        self.assertFalse(transaction.execute([("apply", [portrait_arg(EXTERNAL)])], self.verify(EXTERNAL, 90)))
+        self.assertEqual(transaction.attempts, 3)
+        self.assertEqual(self.clock.sleeps, [1.0, 1.0])
+
+    def test_unconfirmed_change_rolls_back_when_the_countdown_ends(self):
+        transaction = self.begin()
+        self.assertTrue(transaction.execute([("apply", [portrait_arg(EXTERNAL)])], self.verify(EXTERNAL, 90)))
+        timeouts = []
+
+        self.assertTrue(transaction.await_confirmation(15.0, on_timeout=timeouts.append))
+        self.assertTrue(transaction.awaiting_confirmation)
+        self.scheduler.advance(14.9)
+        self.assertEqual(self.rotation(EXTERNAL), 90)
+        self.scheduler.advance(0.1)
+
+        self.assertEqual((transaction.state, timeouts), (TX_ROLLED_BACK, [True]))
+        self.assertEqual(self.rotation(EXTERNAL), 0)
+        self.assertFalse(transaction.commit())
+        self.assertEqual(self.commits, [])
+
+    def test_confirmation_cancels_the_countdown(self):
+        transaction = self.begin()
+        self.assertTrue(transaction.execute([("apply", [portrait_arg(EXTERNAL)])], self.verify(EXTERNAL, 90)))
+        timeouts = []
+        transaction.await_confirmation(15.0, on_timeout=timeouts.append)
+
+        self.assertTrue(transaction.commit())
+        self.scheduler.advance(30.0)
+
+        self.assertEqual((transaction.state, timeouts, self.commits), (TX_COMMITTED, [], [True]))
+        self.assertEqual(self.rotation(EXTERNAL), 90)
+
+
+class BuiltInRotationTests(unittest.TestCase):
+    def test_rolled_back_built_in_rotation_saves_no_layouts(self):
+        class ConfirmingController(RecordingController):
+            def _start_revert_countdown(self, transaction, previous_degree, target_degree):
+                self.pending_transaction = transaction
+
+        with tempfile.TemporaryDirectory() as directory:
+            backend = SimulatedBackend(DISPLAYS)
+            controller = ConfirmingController(os.path.join(directory, "config.json"), backend)
+            controller.target_display_persistent_id = BUILT_IN
+            self.assertTrue(controller.set_rotation(90))
+
+            self.assertTrue(controller.pending_transaction.rollback())
+            self.assertEqual(controller.get_display_info(BUILT_IN, max_age=0.0)["degree"], 0)
+            self.assertEqual(controller.config_store.get("layouts", {}), {})
+            controller.action_queue.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
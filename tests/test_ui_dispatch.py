@@ -0,0 +1,75 @@
+import threading
+import unittest
+
+from rotator.ui_dispatch import EventWaker, MainThreadDispatcher
+
+
+class MainThreadDispatcherTests(unittest.TestCase):
+    def test_wakes_once_per_batch_and_drains_everything(self):
+        handled = []
+        wakes = []
+        dispatcher = MainThreadDispatcher(handled.append, wake=lambda: wakes.append(1))
+
+        dispatcher.post(("notification", "a"))
+        dispatcher.post(("notification", "b"))
+        dispatcher.post(("render_menu",))
+        self.assertEqual(len(wakes), 1)
+        self.assertEqual(handled, [])
+
+        self.assertEqual(dispatcher.drain(), 3)
+        self.assertEqual([task[0] for task in handled], ["notification", "notification", "render_menu"])
+
+        dispatcher.post(("alert",))
+        self.assertEqual(len(wakes), 2)
+
+    def test_idle_drain_is_a_no_op(self):
+        dispatcher = MainThreadDispatcher(lambda task: None)
+        self.assertEqual(dispatcher.drain(), 0)
+        self.assertEqual(dispatcher.wakeups, 0)
+
+    def test_task_posted_during_drain_schedules_new_wake(self):
+        wakes = []
+        dispatcher = None
+
+        def handle(task):
+            if task[0] == "first":
+                dispatcher.post(("second",))
+
+        dispatcher = MainThreadDispatcher(handle, wake=lambda: wakes.append(1))
+        dispatcher.post(("first",))
+        dispatcher.drain()
+        self.assertEqual(len(wakes), 2)
+        self.assertEqual(dispatcher.pending(), 1)
+
+    def test_failing_task_does_not_stop_batch(self):
+        handled = []
+
+        def handle(task):
+            if task[0] == "bad":
+                raise RuntimeError("boom")
+            handled.append(task)
+
+        dispatcher = MainThreadDispatcher(handle)
+        dispatcher.post(("bad",))
+        dispatcher.post(("good",))
+        dispatcher.drain()
+        self.assertEqual(handled, [("good",)])
+
+
+class EventWakerTests(unittest.TestCase):
+    def test_drains_on_owner_thread_when_work_arrives(self):
+        owner = threading.get_ident()
+        handled_on = []
+        dispatcher = MainThreadDispatcher(lambda task: handled_on.append(threading.get_ident()))
+        waker = EventWaker(dispatcher)
+
+        self.assertEqual(waker.run_once(timeout=0.01), 0)
+        producer = threading.Thread(target=lambda: dispatcher.post(("notification",)))
+        producer.start()
+        producer.join()
+        self.assertEqual(waker.run_once(timeout=1.0), 1)
+        self.assertEqual(handled_on, [owner])
+
+
+if __name__ == "__main__":
+    unittest.main()